@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Capture/encode pipeline benchmark
+Replays a corpus of recorded slide images through the stages of the live
+mirroring pipeline (resize, encode, hash, base64, json) and prints time per stage
+and output bytes for every combination of resize filter, quality, scale and
+encoder, so defaults can be picked from data instead of by eye. Quality is PSNR
+against a LANCZOS resize of the same frame - of the resize alone (resize_psnr_db)
+and of the decoded encoder output (psnr_db), which is what the phone shows.
+
+Record a corpus of your own slides first (PNG, lossless):
+    python bench_capture_pipeline.py --record corpus/ --frames 20 --interval 2
+Then benchmark it:
+    python bench_capture_pipeline.py --corpus corpus/
+Without --corpus the synthetic test slides are used.
+"""
+
+import io
+import os
+import math
+import json
+import time
+import base64
+import hashlib
+import argparse
+import itertools
+import statistics
+
+from PIL import Image, ImageChops, ImageStat
+
+from capture_backends import SyntheticCaptureBackend, create_capture_backend
+from image_encoders import PillowJPEGEncoder, TurboJPEGEncoder, WebPEncoder, PalettePNGEncoder
+from image_scaler import RESIZE_FILTERS, ImageScaler
+from message_codec import JSON_CODEC
+
+# Quality reference for every PSNR - the filter the pipeline used before, never a candidate itself
+REFERENCE_FILTER = 'lanczos'
+
+
+# name -> encoder factory; unavailable encoders (no libjpeg-turbo) are skipped
+ENCODERS = {
+    'jpeg': lambda: PillowJPEGEncoder(optimize=False),
+    'jpeg-opt': lambda: PillowJPEGEncoder(optimize=True),  # Pillow default of the pipeline
+    'jpeg-prog': lambda: PillowJPEGEncoder(optimize=False, progressive=True),
+    'turbojpeg': lambda: TurboJPEGEncoder(fast_dct=True),
+    'turbojpeg-accurate': lambda: TurboJPEGEncoder(fast_dct=False),
+    'turbojpeg-444': lambda: TurboJPEGEncoder(subsampling='4:4:4'),
+    'webp': lambda: WebPEncoder(),
+    'webp-lossless': lambda: WebPEncoder(lossless=True),
+    'png': lambda: PalettePNGEncoder(),
+}
+
+
+def create_encoders(names):
+    """Instantiate the requested encoders, skipping the ones not available here"""
+    encoders = {}
+    for name in names:
+        try:
+            encoders[name] = ENCODERS[name]()
+        except Exception as e:
+            print(f"⏭️  {name}: unavailable ({e})")
+    return encoders
+
+
+def load_corpus(path, size):
+    """Slides from a folder of images, or the synthetic test deck"""
+    backend = SyntheticCaptureBackend(source=path, size=size, frames_per_slide=None)
+    corpus = []
+    for index in range(backend.slide_count):
+        backend.show_slide(index)
+        corpus.append(backend.grab())
+    return corpus
+
+
+def record_corpus(path, frames, interval, backend_name):
+    """Grab frames from the real screen and save them as PNG for later replay"""
+    os.makedirs(path, exist_ok=True)
+    backend = create_capture_backend(backend_name)
+    try:
+        for index in range(frames):
+            image = backend.grab()
+            target = os.path.join(path, f"slide_{index:03d}.png")
+            image.save(target)
+            print(f"📸 {target} ({image.width}x{image.height})")
+            if index + 1 < frames:
+                time.sleep(interval)
+    finally:
+        backend.close()
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - start) * 1000.0
+
+
+def median_timed(repeat, func, *args):
+    """Run func repeat times and return (result, median ms)"""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        result, elapsed_ms = timed(func, *args)
+        samples.append(elapsed_ms)
+    return result, statistics.median(samples)
+
+
+def psnr(reference, image):
+    """Peak signal-to-noise ratio in dB (capped at 99 for identical images)"""
+    stat = ImageStat.Stat(ImageChops.difference(reference, image))
+    mse = sum(stat.sum2) / (len(stat.sum2) * image.width * image.height)
+    return 99.0 if mse == 0 else min(99.0, 10 * math.log10(255 ** 2 / mse))
+
+
+def decode(image_data):
+    """Encoded frame back to RGB, as the phone would display it"""
+    return Image.open(io.BytesIO(image_data)).convert('RGB')
+
+
+def create_scalers(names):
+    """One ImageScaler per filter, skipping the ones not available here (numpy-box without NumPy)"""
+    scalers = {}
+    for name in names:
+        try:
+            scalers[name] = ImageScaler(name)
+        except Exception as e:
+            print(f"⏭️  {name}: unavailable ({e})")
+    return scalers
+
+
+def build_message(image_data, image_format):
+    """base64 data URL, as sent in the JSON slide_update fallback"""
+    image_base64 = base64.b64encode(image_data).decode('utf-8')
+    return f"data:image/{image_format};base64,{image_base64}"
+
+
+def bench(corpus, scalers, qualities, scales, encoders, repeat):
+    """Return one result row per (filter, scale, quality, encoder)"""
+    rows = []
+    references = {}  # (image index, scale) -> RGB LANCZOS resize every output is compared against
+    for (filter_name, scaler), scale in itertools.product(scalers.items(), scales):
+        # Resize once per image for this filter/scale; every encoder/quality reuses it
+        resized = []
+        resize_ms = []
+        resize_psnr = []
+        for index, image in enumerate(corpus):
+            scaled, elapsed_ms = median_timed(repeat, scaler.scale, image, scale)
+            reference = references.get((index, scale))
+            if reference is None:
+                reference = image.resize(scaled.size, Image.Resampling.LANCZOS).convert('RGB')
+                references[(index, scale)] = reference
+            resized.append((reference, scaled))
+            resize_ms.append(elapsed_ms)
+            resize_psnr.append(psnr(reference, scaled.convert('RGB')))
+
+        for quality, (encoder_name, encoder) in itertools.product(qualities, encoders.items()):
+            stages = {'resize': resize_ms, 'encode': [], 'hash': [], 'base64': [], 'json': []}
+            image_bytes = []
+            json_bytes = []
+            output_psnr = []
+            for reference, scaled in resized:
+                image_data, elapsed_ms = median_timed(repeat, encoder.encode, scaled, quality)
+                stages['encode'].append(elapsed_ms)
+                output_psnr.append(psnr(reference, decode(image_data)))
+                _, elapsed_ms = median_timed(repeat, lambda data: hashlib.md5(data).hexdigest(), image_data)
+                stages['hash'].append(elapsed_ms)
+                data_url, elapsed_ms = median_timed(repeat, build_message, image_data, encoder.image_format)
+                stages['base64'].append(elapsed_ms)
+                message = {'type': 'slide_update', 'has_image': True, 'image_data': data_url}
+                payload, elapsed_ms = median_timed(repeat, JSON_CODEC.encode, message)
+                stages['json'].append(elapsed_ms)
+                image_bytes.append(len(image_data))
+                json_bytes.append(len(payload))
+
+            row = {
+                'filter': filter_name,
+                'scale': scale,
+                'quality': quality,
+                'encoder': encoder_name,
+                'resize_psnr_db': round(statistics.mean(resize_psnr), 1),
+                'psnr_db': round(statistics.mean(output_psnr), 1),
+                'bytes': int(statistics.mean(image_bytes)),
+                'json_bytes': int(statistics.mean(json_bytes)),
+            }
+            for stage, samples in stages.items():
+                row[f'{stage}_ms'] = round(statistics.mean(samples), 2)
+            row['total_ms'] = round(sum(row[f'{stage}_ms'] for stage in stages), 2)
+            rows.append(row)
+    return rows
+
+
+def print_resize_report(rows):
+    """Quality vs time of each resize filter (one line per filter and scale)"""
+    seen = set()
+    print(f"{'filter':>10}{'scale':>7}{'resize_ms':>11}{'resize_psnr_db':>16}")
+    print("-" * 44)
+    for row in sorted(rows, key=lambda row: (row['scale'], row['resize_ms'])):
+        key = (row['filter'], row['scale'])
+        if key in seen:
+            continue
+        seen.add(key)
+        print(f"{row['filter']:>10}{row['scale']:>7.2f}{row['resize_ms']:>11.2f}{row['resize_psnr_db']:>16.1f}")
+    print()
+
+
+def print_budget_pick(rows, budget_ms, psnr_floor):
+    """Cheapest option per scale (total ms, then bytes) that fits the frame budget and the PSNR floor
+
+    The reference filter is left out - it scores best by definition, not because it looks better.
+    """
+    print(f"Picks exclude {REFERENCE_FILTER} (the quality reference); output PSNR must be >= {psnr_floor:.0f} dB")
+    for scale in sorted({row['scale'] for row in rows}):
+        within = [
+            row for row in rows
+            if row['scale'] == scale and row['filter'] != REFERENCE_FILTER
+            and row['total_ms'] <= budget_ms and row['psnr_db'] >= psnr_floor
+        ]
+        if not within:
+            print(f"⚠️  {scale:.2f}x: nothing fits the {budget_ms:.0f} ms frame budget at {psnr_floor:.0f} dB")
+            continue
+        best = min(within, key=lambda row: (row['total_ms'], row['bytes']))
+        print(
+            f"✅ {scale:.2f}x within {budget_ms:.0f} ms: {best['filter']} + {best['encoder']} q{best['quality']} "
+            f"({best['total_ms']:.1f} ms, {best['psnr_db']:.1f} dB, {best['bytes']} bytes)"
+        )
+
+
+def print_table(rows):
+    columns = [
+        ('filter', 10, ''), ('scale', 6, '.2f'), ('quality', 8, ''), ('encoder', 20, ''),
+        ('resize_ms', 10, '.2f'), ('psnr_db', 8, '.1f'), ('encode_ms', 10, '.2f'), ('hash_ms', 8, '.2f'), ('base64_ms', 10, '.2f'),
+        ('json_ms', 8, '.2f'), ('total_ms', 9, '.2f'), ('bytes', 9, ''), ('json_bytes', 11, ''),
+    ]
+    print("".join(f"{name:>{width}}" for name, width, _ in columns))
+    print("-" * sum(width for _, width, _ in columns))
+    for row in rows:
+        print("".join(f"{row[name]:>{width}{fmt}}" for name, width, fmt in columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the slide capture/encode pipeline on a slide corpus")
+    parser.add_argument('--corpus', help="Folder of recorded slide images (default: synthetic slides)")
+    parser.add_argument('--size', nargs=2, type=int, default=[1920, 1080], metavar=('W', 'H'),
+                        help="Size of the synthetic slides")
+    parser.add_argument('--filters', nargs='+', default=['lanczos', 'bilinear', 'box', 'reduce', 'numpy-box'],
+                        choices=list(RESIZE_FILTERS))
+    parser.add_argument('--qualities', nargs='+', type=int, default=[50, 60, 70, 80])
+    parser.add_argument('--scales', nargs='+', type=float, default=[0.4, 0.6, 0.8])
+    parser.add_argument('--encoders', nargs='+', default=['jpeg', 'jpeg-opt', 'turbojpeg'], choices=list(ENCODERS))
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per measurement (median is kept)")
+    parser.add_argument('--sort', choices=['total_ms', 'bytes', 'encode_ms', 'resize_ms'],
+                        help="Sort rows by this column")
+    parser.add_argument('--budget-ms', type=float, default=100.0,
+                        help="Frame budget for resize..json - the cheapest fitting option per scale is printed")
+    parser.add_argument('--psnr-floor', type=float, default=35.0,
+                        help="Lowest output PSNR (dB, decoded frame vs LANCZOS) a pick may have")
+    parser.add_argument('--json', help="Also write the rows to this file")
+    parser.add_argument('--record', metavar='DIR', help="Record a corpus from the screen into DIR and exit")
+    parser.add_argument('--frames', type=int, default=10, help="Frames to record")
+    parser.add_argument('--interval', type=float, default=2.0, help="Seconds between recorded frames")
+    parser.add_argument('--backend', default='auto', help="Capture backend for --record")
+    args = parser.parse_args()
+
+    if args.record:
+        record_corpus(args.record, args.frames, args.interval, args.backend)
+        return
+
+    corpus = load_corpus(args.corpus, tuple(args.size))
+    width, height = corpus[0].size
+    print(f"🧪 Capture pipeline benchmark - {len(corpus)} slides, {width}x{height}, median of {args.repeat} runs")
+    print("Times are mean ms per frame; bytes are the encoded image and the JSON slide_update.")
+    print("=" * 127)
+
+    scalers = create_scalers(args.filters)
+    encoders = create_encoders(args.encoders)
+    rows = bench(corpus, scalers, args.qualities, args.scales, encoders, args.repeat)
+    print_resize_report(rows)
+    if args.sort:
+        rows.sort(key=lambda row: row[args.sort])
+    print_table(rows)
+    print()
+    print_budget_pick(rows, args.budget_ms, args.psnr_floor)
+
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump({'slides': len(corpus), 'size': [width, height], 'rows': rows}, output, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
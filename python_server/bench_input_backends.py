@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Input backend microbenchmark
+Measures per-call injection latency of every available input backend.
+Only harmless events are injected: Shift presses and pointer moves between two
+points in the middle of the screen - nothing types into the focused window.
+"""
+
+import time
+import argparse
+import statistics
+
+from input_backends import INPUT_BACKENDS, create_input_backend
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def bench_call(call, iterations):
+    """Time iterations calls and return the samples in microseconds"""
+    samples = []
+    for index in range(iterations):
+        start = time.perf_counter()
+        call(index)
+        samples.append((time.perf_counter() - start) * 1_000_000.0)
+    return samples
+
+
+def bench_backend(name, iterations):
+    """Return {call: samples} for one backend, or None if it is unavailable here"""
+    try:
+        backend = create_input_backend(name)
+    except Exception as e:
+        print(f"⏭️  {name}: unavailable ({e})")
+        return None
+
+    width, height = backend.screen_size()
+    points = [(width // 2 - 50, height // 2), (width // 2 + 50, height // 2)]
+    try:
+        return {
+            'press': bench_call(lambda index: backend.press('shift'), iterations),
+            'move_to': bench_call(lambda index: backend.move_to(*points[index % 2]), iterations),
+        }
+    finally:
+        backend.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-call input injection latency")
+    parser.add_argument('--backends', nargs='+', default=list(INPUT_BACKENDS), choices=list(INPUT_BACKENDS))
+    parser.add_argument('--iterations', type=int, default=500)
+    args = parser.parse_args()
+
+    print("⌨️  Input backend microbenchmark")
+    print("=" * 72)
+    print(f"{'backend':<12}{'call':<10}{'mean us':>10}{'p50 us':>10}{'p95 us':>10}{'p99 us':>10}{'max us':>10}")
+    print("-" * 72)
+    for name in args.backends:
+        results = bench_backend(name, args.iterations)
+        if results is None:
+            continue
+        for call, samples in results.items():
+            print(
+                f"{name:<12}{call:<10}{statistics.mean(samples):>10.1f}{percentile(samples, 0.5):>10.1f}"
+                f"{percentile(samples, 0.95):>10.1f}{percentile(samples, 0.99):>10.1f}{max(samples):>10.1f}"
+            )
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Headless load benchmark for the WebSocket server
+Starts SlideControllerServer in a child process with the null input backend and
+synthetic capture, drives N simulated phones (heartbeats, navigation, 60 Hz
+laser_pointer_move) and reports throughput, latency percentiles, CPU and memory.
+Runs offline - no display, PowerPoint or network needed.
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import asyncio
+import argparse
+import statistics
+import subprocess
+
+import websockets
+
+BENCH_SLIDE_COUNT = 5
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def describe(samples):
+    """count/mean/p50/p95/p99/max in ms"""
+    if not samples:
+        return {'count': 0}
+    return {
+        'count': len(samples),
+        'mean_ms': round(statistics.mean(samples), 2),
+        'p50_ms': round(percentile(samples, 0.50), 2),
+        'p95_ms': round(percentile(samples, 0.95), 2),
+        'p99_ms': round(percentile(samples, 0.99), 2),
+        'max_ms': round(max(samples), 2),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Server side (child process)
+# ---------------------------------------------------------------------------
+
+def run_server(port, width, height):
+    """Run the real server with input wired to a synthetic slide deck"""
+    from capture_backends import SyntheticCaptureBackend
+    from input_backends import NullInputBackend
+    from slide_controller_server import SlideControllerServer
+
+    deck = SyntheticCaptureBackend(size=(width, height), frames_per_slide=None)
+
+    class DeckInputBackend(NullInputBackend):
+        """Null input whose keys and pointer change the synthetic screen, like a real slideshow"""
+
+        def _press(self, key):
+            super()._press(key)
+            if key == 'right':
+                deck.show_slide(deck.slide_index + 1)
+            elif key == 'left':
+                deck.show_slide(deck.slide_index - 1)
+
+        def _move_to(self, x, y):
+            super()._move_to(x, y)
+            deck.set_pointer((x, y))
+
+    server = SlideControllerServer(
+        host='127.0.0.1', port=port,
+        input_backend=DeckInputBackend(screen_size=(width, height)),
+        capture_backend=deck,
+    )
+    try:
+        asyncio.run(server.start_server())
+    except KeyboardInterrupt:
+        pass
+
+
+def read_process_usage(pid):
+    """(cpu seconds, rss MB, peak rss MB) of a process from /proc (Linux)"""
+    with open(f'/proc/{pid}/stat') as stat_file:
+        fields = stat_file.read().rsplit(')', 1)[1].split()
+    ticks = os.sysconf('SC_CLK_TCK')
+    cpu_seconds = (int(fields[11]) + int(fields[12])) / ticks  # utime + stime
+
+    rss_mb = peak_mb = 0.0
+    with open(f'/proc/{pid}/status') as status_file:
+        for line in status_file:
+            if line.startswith('VmRSS:'):
+                rss_mb = int(line.split()[1]) / 1024.0
+            elif line.startswith('VmHWM:'):
+                peak_mb = int(line.split()[1]) / 1024.0
+    return cpu_seconds, rss_mb, peak_mb
+
+
+# ---------------------------------------------------------------------------
+# Simulated phones
+# ---------------------------------------------------------------------------
+
+class PhoneStats:
+    def __init__(self):
+        self.sent = 0
+        self.received = 0
+        self.bytes_received = 0
+        self.frames = 0
+        self.command_rtt_ms = []  # Command -> response with the echoed timestamp
+        self.heartbeat_rtt_ms = []  # Heartbeat -> pong
+        self.swipe_to_frame_ms = []  # Navigation sent -> first frame received after it
+
+
+class SimulatedPhone:
+    """One phone: viewer (heartbeats, receives frames) or presenter (also navigation and pointer)"""
+
+    def __init__(self, index, url, args, presenter):
+        self.index = index
+        self.url = url
+        self.args = args
+        self.presenter = presenter
+        self.stats = PhoneStats()
+        self._pending = {}  # echoed timestamp -> (kind, perf_counter when sent)
+        self._awaiting_frame = None  # perf_counter of the last navigation not yet followed by a frame
+        self._sequence = index * 10_000_000
+
+    def _next_id(self):
+        self._sequence += 1
+        return self._sequence
+
+    async def _send(self, websocket, message):
+        await websocket.send(json.dumps(message))
+        self.stats.sent += 1
+
+    async def _send_tracked(self, websocket, kind, message):
+        message_id = self._next_id()
+        message['timestamp'] = message_id
+        self._pending[message_id] = (kind, time.perf_counter())
+        await self._send(websocket, message)
+
+    def _on_message(self, message):
+        now = time.perf_counter()
+        self.stats.received += 1
+        self.stats.bytes_received += len(message)
+
+        if isinstance(message, bytes):
+            is_frame = True
+            data = None
+        else:
+            data = json.loads(message)
+            is_frame = data.get('type') in ('slide_update', 'slide_delta')
+
+        if is_frame:
+            self.stats.frames += 1
+            if self._awaiting_frame is not None:
+                self.stats.swipe_to_frame_ms.append((now - self._awaiting_frame) * 1000.0)
+                self._awaiting_frame = None
+            return
+
+        pending = self._pending.pop(data.get('timestamp'), None) if data else None
+        if pending is not None:
+            kind, sent_at = pending
+            samples = self.stats.heartbeat_rtt_ms if kind == 'heartbeat' else self.stats.command_rtt_ms
+            samples.append((now - sent_at) * 1000.0)
+
+    async def _receive(self, websocket):
+        async for message in websocket:
+            self._on_message(message)
+
+    async def _heartbeats(self, websocket):
+        while True:
+            await asyncio.sleep(self.args.heartbeat_interval)
+            await self._send_tracked(websocket, 'heartbeat', {'type': 'heartbeat'})
+
+    async def _navigation(self, websocket):
+        direction = 'next'
+        step = 0
+        while True:
+            await asyncio.sleep(self.args.nav_interval)
+            # Walk forward through the deck and back again
+            step += 1
+            if step % BENCH_SLIDE_COUNT == 0:
+                direction = 'previous' if direction == 'next' else 'next'
+            self._awaiting_frame = time.perf_counter()
+            await self._send_tracked(websocket, 'command', {'command': direction, 'heartbeat': False})
+
+    async def _pointer(self, websocket):
+        """Pointer gestures at pointer_hz, pointer_duty of the time"""
+        interval = 1.0 / self.args.pointer_hz
+        gesture_moves = max(1, int(self.args.pointer_hz * self.args.gesture_seconds))
+        pause = self.args.gesture_seconds * (1.0 / self.args.pointer_duty - 1.0) if self.args.pointer_duty > 0 else None
+        if pause is None:
+            return
+        while True:
+            for move in range(gesture_moves):
+                x_percent = 20 + 60 * move / gesture_moves
+                await self._send(websocket, {
+                    'command': 'laser_pointer_move',
+                    'params': {'x_percent': x_percent, 'y_percent': 50},
+                })
+                await asyncio.sleep(interval)
+            await asyncio.sleep(pause)
+
+    async def run(self, start_presentation):
+        async with websockets.connect(self.url, max_size=None) as websocket:
+            if self.args.binary or self.args.delta:
+                await self._send(websocket, {
+                    'type': 'client_hello', 'binary_frames': self.args.binary, 'delta_frames': self.args.delta,
+                })
+            tasks = [asyncio.create_task(self._receive(websocket)), asyncio.create_task(self._heartbeats(websocket))]
+            if start_presentation:
+                await self._send_tracked(websocket, 'command', {'command': 'start_presentation', 'heartbeat': False})
+            if self.presenter:
+                tasks.append(asyncio.create_task(self._navigation(websocket)))
+                tasks.append(asyncio.create_task(self._pointer(websocket)))
+            try:
+                await asyncio.sleep(self.args.duration)
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+
+async def fetch_server_stats(url):
+    async with websockets.connect(url, max_size=None) as websocket:
+        await websocket.send(json.dumps({'command': 'stats'}))
+        while True:
+            data = json.loads(await asyncio.wait_for(websocket.recv(), timeout=5.0))
+            if data.get('type') == 'stats':
+                return data
+
+
+async def drive_phones(args, url):
+    phones = [SimulatedPhone(index, url, args, index < args.presenters) for index in range(args.phones)]
+    await asyncio.gather(*(phone.run(start_presentation=index == 0) for index, phone in enumerate(phones)))
+    return phones
+
+
+def wait_for_port(port, timeout=15.0):
+    async def probe():
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                async with websockets.connect(f'ws://127.0.0.1:{port}'):
+                    return True
+            except OSError:
+                await asyncio.sleep(0.1)
+        return False
+    return asyncio.run(probe())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless load benchmark for the slide controller server")
+    parser.add_argument('--phones', type=int, default=5, help="Simulated phones")
+    parser.add_argument('--presenters', type=int, default=1, help="Phones that navigate and use the laser pointer")
+    parser.add_argument('--duration', type=float, default=20.0, help="Seconds of load")
+    parser.add_argument('--nav-interval', type=float, default=2.0, help="Seconds between next/previous per presenter")
+    parser.add_argument('--pointer-hz', type=float, default=60.0, help="laser_pointer_move rate during a gesture")
+    parser.add_argument('--gesture-seconds', type=float, default=2.0, help="Length of one pointer gesture")
+    parser.add_argument('--pointer-duty', type=float, default=0.5, help="Fraction of time spent pointing (0 = never)")
+    parser.add_argument('--heartbeat-interval', type=float, default=5.0, help="Seconds between heartbeats per phone")
+    parser.add_argument('--binary', action='store_true', help="Phones negotiate binary frames")
+    parser.add_argument('--delta', action='store_true', help="Phones negotiate delta frames")
+    parser.add_argument('--size', default='1920x1080', help="Synthetic screen size")
+    parser.add_argument('--port', type=int, default=8790)
+    parser.add_argument('--server-log', default=os.devnull, help="File for the server's log output")
+    parser.add_argument('--json', help="Also write the results to this file")
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    width, height = (int(value) for value in args.size.lower().split('x'))
+    if args.serve:
+        run_server(args.port, width, height)
+        return
+
+    url = f'ws://127.0.0.1:{args.port}'
+    with open(args.server_log, 'w') as server_log:
+        server = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), '--serve', '--port', str(args.port), '--size', args.size],
+            stdout=server_log, stderr=subprocess.STDOUT, cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        try:
+            if not wait_for_port(args.port):
+                raise RuntimeError("Server did not start listening")
+            cpu_before, _, _ = read_process_usage(server.pid)
+            started = time.perf_counter()
+            phones = asyncio.run(drive_phones(args, url))
+            elapsed = time.perf_counter() - started
+            cpu_after, rss_mb, peak_mb = read_process_usage(server.pid)
+            server_stats = asyncio.run(fetch_server_stats(url))
+        finally:
+            server.send_signal(signal.SIGINT)
+            try:
+                server.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    sent = sum(phone.stats.sent for phone in phones)
+    received = sum(phone.stats.received for phone in phones)
+    received_bytes = sum(phone.stats.bytes_received for phone in phones)
+    frames = sum(phone.stats.frames for phone in phones)
+    results = {
+        'config': {key: value for key, value in vars(args).items() if key not in ('serve', 'json', 'server_log')},
+        'throughput': {
+            'messages_sent_per_s': round(sent / elapsed, 1),
+            'messages_received_per_s': round(received / elapsed, 1),
+            'frames_per_s_per_phone': round(frames / elapsed / len(phones), 2),
+            'received_kb_per_s': round(received_bytes / elapsed / 1024.0, 1),
+        },
+        'latency': {
+            'command_rtt': describe([sample for phone in phones for sample in phone.stats.command_rtt_ms]),
+            'heartbeat_rtt': describe([sample for phone in phones for sample in phone.stats.heartbeat_rtt_ms]),
+            'swipe_to_frame': describe([sample for phone in phones for sample in phone.stats.swipe_to_frame_ms]),
+        },
+        'server': {
+            'cpu_percent': round(100.0 * (cpu_after - cpu_before) / elapsed, 1),
+            'rss_mb': round(rss_mb, 1),
+            'peak_rss_mb': round(peak_mb, 1),
+            'latency_trace': server_stats['latency'],
+            'pointer': server_stats['pointer'],
+        },
+    }
+
+    print("📊 Server load benchmark")
+    print("=" * 60)
+    print(f"Phones: {args.phones} ({args.presenters} presenting) for {elapsed:.1f}s, "
+          f"binary={args.binary} delta={args.delta}")
+    for name, value in results['throughput'].items():
+        print(f"  {name:<28}{value:>12}")
+    print("-" * 60)
+    print(f"  {'latency (ms)':<18}{'n':>6}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    for name, summary in results['latency'].items():
+        if summary['count']:
+            print(f"  {name:<18}{summary['count']:>6}{summary['p50_ms']:>9.1f}{summary['p95_ms']:>9.1f}"
+                  f"{summary['p99_ms']:>9.1f}{summary['max_ms']:>9.1f}")
+    print("-" * 60)
+    print(f"  server CPU {results['server']['cpu_percent']}% of one core, "
+          f"RSS {results['server']['rss_mb']} MB (peak {results['server']['peak_rss_mb']} MB)")
+    pointer = results['server']['pointer']
+    print(f"  pointer moves received {pointer['received']}, applied {pointer['applied']}")
+    print("=" * 60)
+
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump(results, output, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the server
+Starts slide_controller_server.py (or a built executable) over and over and reports
+the time from process launch until its WebSocket port accepts connections. Runs
+offline with the null input backend and synthetic capture by default.
+
+    python bench_startup.py --runs 10
+    python bench_startup.py --command "dist/PresenterPro Server.exe"
+    python bench_startup.py --profile-imports   # Also print the server's import report
+"""
+
+import os
+import sys
+import json
+import time
+import shlex
+import signal
+import socket
+import argparse
+import statistics
+import subprocess
+
+
+def wait_for_listening(port, process, started, timeout):
+    """ms from started until 127.0.0.1:port accepts a TCP connection, or None on timeout/exit"""
+    while time.perf_counter() - started < timeout:
+        if process.poll() is not None:
+            return None
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.05):
+                return (time.perf_counter() - started) * 1000.0
+        except OSError:
+            time.sleep(0.005)
+    return None
+
+
+def stop(process):
+    process.send_signal(signal.SIGINT)
+    try:
+        process.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def run_once(command, port, timeout, log_path):
+    """Launch the server once and return ms to a listening socket (None if it never listened)"""
+    with open(log_path, 'w') as server_log:
+        started = time.perf_counter()  # Process creation is part of the cold start
+        process = subprocess.Popen(
+            command + ['--port', str(port)],
+            stdout=server_log, stderr=subprocess.STDOUT, cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        try:
+            return wait_for_listening(port, process, started, timeout)
+        finally:
+            stop(process)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure time from launch to a listening server socket")
+    parser.add_argument('--command', help="Server command line (default: this Python running slide_controller_server.py)")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--port', type=int, default=8791)
+    parser.add_argument('--timeout', type=float, default=30.0, help="Seconds to wait for one start")
+    parser.add_argument('--input-backend', default='null')
+    parser.add_argument('--capture-backend', default='synthetic')
+    parser.add_argument('--profile-imports', action='store_true', help="Print the server's import report of the last run")
+    parser.add_argument('--server-log', default='startup_bench_server.log', help="File for the server's log output")
+    parser.add_argument('--json', help="Also write the results to this file")
+    args = parser.parse_args()
+
+    if args.command:
+        command = shlex.split(args.command, posix=os.name != 'nt')
+    else:
+        command = [sys.executable, 'slide_controller_server.py']
+    command += ['--input-backend', args.input_backend, '--capture-backend', args.capture_backend]
+    if args.profile_imports:
+        command.append('--profile-imports')
+
+    print(f"🚀 Startup benchmark - {' '.join(command)}")
+    print("=" * 60)
+    samples = []
+    for run in range(args.runs):
+        elapsed_ms = run_once(command, args.port, args.timeout, args.server_log)
+        if elapsed_ms is None:
+            print(f"❌ Run {run + 1}: server did not listen within {args.timeout:.0f}s - see {args.server_log}")
+            return 1
+        samples.append(elapsed_ms)
+        print(f"  run {run + 1:>2}: {elapsed_ms:>8.1f} ms")
+    print("-" * 60)
+    results = {
+        'command': command,
+        'runs': len(samples),
+        'first_ms': round(samples[0], 1),  # Cold file cache, usually the slowest
+        'median_ms': round(statistics.median(samples), 1),
+        'min_ms': round(min(samples), 1),
+        'max_ms': round(max(samples), 1),
+    }
+    print(f"  time to listening socket: median {results['median_ms']} ms, "
+          f"min {results['min_ms']} ms, max {results['max_ms']} ms (first run {results['first_ms']} ms)")
+
+    if args.profile_imports:
+        print()
+        with open(args.server_log) as server_log:
+            for line in server_log:
+                if 'startup_profiler' in line:
+                    print(line.rstrip())
+
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump(results, output, indent=2)
+        print(f"Results written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Fan-out Broadcaster for Slide Controller Server
+Serializes each message once per codec and gives every connection its own bounded
+send queue and writer task, so one slow phone never stalls the other viewers.
+"""
+
+import time
+import asyncio
+import logging
+from collections import deque
+from websockets.exceptions import ConnectionClosed
+
+from message_codec import JSON_CODEC
+
+logger = logging.getLogger(__name__)
+
+# Message classes and their drop policy
+MESSAGE_FRAME = 'frame'    # Latest-wins: a newer frame replaces one still waiting in the queue
+MESSAGE_KEYFRAME = 'keyframe'  # Supersedes queued keyframes and deltas, and goes to the tail so newer deltas follow it
+MESSAGE_STATUS = 'status'  # Never dropped
+MESSAGE_ACK = 'ack'        # Never dropped
+MESSAGE_POINTER_ACK = 'pointer_ack'  # Latest-wins: a batched pointer ack only matters until the next one
+
+LATEST_WINS_CLASSES = (MESSAGE_FRAME, MESSAGE_KEYFRAME, MESSAGE_POINTER_ACK)
+
+
+class ClientChannel:
+    """Per-connection send queue drained by its own writer task"""
+
+    def __init__(self, websocket, max_backlog=256, on_sent=None):
+        self.websocket = websocket
+        self.max_backlog = max_backlog  # Never-drop messages allowed to pile up before we give up on the client
+        self.on_sent = on_sent  # Called with (tag, sent_at) after a tagged message is written
+        self.codec = JSON_CODEC  # Wire encoding agreed in client_hello
+        self.closed = False
+        self._queue = deque()  # [message_class, payload, enqueued_at, tag]
+        self._latest = {}  # message_class -> queued entry that a newer message may replace
+        self._wakeup = asyncio.Event()
+        self._writer_task = None
+
+        # Counters
+        self.messages_sent = 0
+        self.messages_dropped = 0
+        self.max_queue_depth = 0
+        self.last_send_ms = 0.0
+        self.total_send_ms = 0.0
+        self.max_send_ms = 0.0
+
+    @property
+    def queue_depth(self):
+        return len(self._queue)
+
+    def start(self):
+        """Start the writer task (needs a running event loop)"""
+        self._writer_task = asyncio.create_task(self._writer())
+
+    def enqueue(self, payload, message_class, tag=None):
+        """Queue an already serialized payload - never blocks"""
+        if self.closed:
+            return False
+
+        now = time.perf_counter()
+        if message_class == MESSAGE_KEYFRAME:
+            # Queued deltas are built on an older keyframe - sent after this one they would be
+            # pasted onto the wrong base. The new keyframe is a newer full picture, so drop them
+            stale = [self._latest.pop(cls) for cls in (MESSAGE_KEYFRAME, MESSAGE_FRAME) if cls in self._latest]
+            if stale:
+                self._queue = deque(queued for queued in self._queue if all(queued is not old for old in stale))
+                self.messages_dropped += len(stale)
+        elif message_class in LATEST_WINS_CLASSES:
+            entry = self._latest.get(message_class)
+            if entry is not None:
+                # Older frame has not been sent yet - replace it in place
+                entry[1] = payload
+                entry[2] = now
+                entry[3] = tag
+                self.messages_dropped += 1
+                return True
+
+        entry = [message_class, payload, now, tag]
+        self._queue.append(entry)
+        if message_class in LATEST_WINS_CLASSES:
+            self._latest[message_class] = entry
+
+        depth = len(self._queue)
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+        if depth > self.max_backlog:
+            # Status and acks may not be dropped, so a client this far behind is disconnected instead
+            logger.warning(f"📱 Client {self.websocket.remote_address} is {depth} messages behind - disconnecting")
+            self.close()
+            asyncio.create_task(self.websocket.close(code=1013, reason='Client too slow'))
+            return False
+
+        self._wakeup.set()
+        return True
+
+    async def _writer(self):
+        """Send queued messages in order, one client at a time"""
+        try:
+            while not self.closed:
+                if not self._queue:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+
+                entry = self._queue.popleft()
+                message_class, payload, enqueued_at, tag = entry
+                if self._latest.get(message_class) is entry:
+                    del self._latest[message_class]
+
+                await self.websocket.send(payload)
+
+                # Latency covers time spent queued plus the send itself
+                elapsed_ms = (time.perf_counter() - enqueued_at) * 1000.0
+                self.messages_sent += 1
+                self.last_send_ms = elapsed_ms
+                self.total_send_ms += elapsed_ms
+                self.max_send_ms = max(self.max_send_ms, elapsed_ms)
+                if tag is not None and self.on_sent is not None:
+                    self.on_sent(tag, time.perf_counter())
+        except ConnectionClosed:
+            logger.debug(f"📱 Writer stopped - client {self.websocket.remote_address} disconnected")
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"❌ Error sending to client {self.websocket.remote_address}: {e}")
+        finally:
+            self.closed = True
+            self._queue.clear()
+            self._latest.clear()
+
+    def close(self):
+        """Stop the writer and discard anything still queued"""
+        self.closed = True
+        self._wakeup.set()
+        if self._writer_task is not None and self._writer_task is not asyncio.current_task():
+            self._writer_task.cancel()
+
+    def get_stats(self):
+        """Return queue depth, drops and send latency for this client"""
+        sent = self.messages_sent
+        return {
+            'codec': self.codec.name,
+            'queue_depth': self.queue_depth,
+            'max_queue_depth': self.max_queue_depth,
+            'sent': sent,
+            'dropped': self.messages_dropped,
+            'last_send_ms': round(self.last_send_ms, 2),
+            'avg_send_ms': round(self.total_send_ms / sent, 2) if sent else 0.0,
+            'max_send_ms': round(self.max_send_ms, 2),
+        }
+
+
+class Broadcaster:
+    """Encode-once fan-out to every registered connection"""
+
+    def __init__(self, max_backlog=256):
+        self.max_backlog = max_backlog
+        self.channels = {}  # websocket -> ClientChannel
+        self.on_sent = None  # Optional (tag, sent_at) callback, e.g. latency tracing of frame ids
+
+    def register(self, websocket):
+        """Create the send queue and writer task for a new connection"""
+        channel = ClientChannel(websocket, max_backlog=self.max_backlog, on_sent=self._message_sent)
+        channel.start()
+        self.channels[websocket] = channel
+        return channel
+
+    def unregister(self, websocket):
+        """Stop the writer task for a closed connection"""
+        channel = self.channels.pop(websocket, None)
+        if channel is not None:
+            channel.close()
+
+    def _message_sent(self, tag, sent_at):
+        if self.on_sent is not None:
+            self.on_sent(tag, sent_at)
+
+    def set_codec(self, websocket, codec):
+        """Encode everything queued from now on with codec (messages already queued keep theirs)"""
+        channel = self.channels.get(websocket)
+        if channel is not None:
+            channel.codec = codec
+
+    def codec_for(self, websocket):
+        channel = self.channels.get(websocket)
+        return channel.codec if channel is not None else JSON_CODEC
+
+    def send(self, websocket, message, message_class=MESSAGE_ACK, tag=None):
+        """Queue a message for one client (tag is handed to on_sent once it is written)"""
+        channel = self.channels.get(websocket)
+        if channel is None:
+            return False
+        if not isinstance(message, (str, bytes)):
+            message = channel.codec.encode(message)
+        return channel.enqueue(message, message_class, tag)
+
+    def publish(self, message, message_class=MESSAGE_STATUS, exclude=None, clients=None):
+        """Serialize once per codec and queue the same payload for every client (or the given subset)"""
+        targets = self.channels if clients is None else clients
+        if not targets:
+            return 0
+
+        payloads = {}  # codec name -> encoded message
+        queued = 0
+        for websocket in list(targets):
+            if websocket is exclude:
+                continue
+            channel = self.channels.get(websocket)
+            if channel is None:
+                continue
+            payload = message
+            if not isinstance(message, (str, bytes)):
+                payload = payloads.get(channel.codec.name)
+                if payload is None:
+                    payload = payloads[channel.codec.name] = channel.codec.encode(message)
+            if channel.enqueue(payload, message_class):
+                queued += 1
+        return queued
+
+    def get_stats(self):
+        """Return per-client counters keyed by remote address"""
+        return {
+            str(websocket.remote_address): channel.get_stats()
+            for websocket, channel in self.channels.items()
+        }
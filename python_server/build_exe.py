@@ -23,7 +23,24 @@ def build_exe():
         '--windowed',  # No console window
         '--icon=NONE',  # No icon (you can add one later)
         f'--add-data={os.path.join(current_dir, "slide_controller_server.py")};.',  # Include server module
+        f'--add-data={os.path.join(current_dir, "server_thread.py")};.',  # Include GUI server thread
         f'--add-data={os.path.join(current_dir, "slide_capture_extension.py")};.',  # Include capture extension
+        f'--add-data={os.path.join(current_dir, "capture_backends.py")};.',  # Include capture backends
+        f'--add-data={os.path.join(current_dir, "image_encoders.py")};.',  # Include image encoders
+        f'--add-data={os.path.join(current_dir, "image_scaler.py")};.',  # Include resize stage
+        f'--add-data={os.path.join(current_dir, "frame_protocol.py")};.',  # Include binary frame protocol
+        f'--add-data={os.path.join(current_dir, "broadcaster.py")};.',  # Include per-client broadcaster
+        f'--add-data={os.path.join(current_dir, "message_codec.py")};.',  # Include JSON/MessagePack codecs
+        f'--add-data={os.path.join(current_dir, "rate_control.py")};.',  # Include adaptive rate control
+        f'--add-data={os.path.join(current_dir, "capture_scheduler.py")};.',  # Include capture scheduler
+        f'--add-data={os.path.join(current_dir, "slide_cache.py")};.',  # Include slide frame cache
+        f'--add-data={os.path.join(current_dir, "pointer_input.py")};.',  # Include pointer move coalescing
+        f'--add-data={os.path.join(current_dir, "command_registry.py")};.',  # Include command schema
+        f'--add-data={os.path.join(current_dir, "input_worker.py")};.',  # Include input injection worker
+        f'--add-data={os.path.join(current_dir, "input_backends.py")};.',  # Include native input backends
+        f'--add-data={os.path.join(current_dir, "latency_tracer.py")};.',  # Include latency tracing
+        f'--add-data={os.path.join(current_dir, "startup_profiler.py")};.',  # Include import-time profiling
+        f'--add-data={os.path.join(current_dir, "server_logging.py")};.',  # Include queued logging setup
         '--hidden-import=customtkinter',
         '--hidden-import=qrcode',
         '--hidden-import=PIL',
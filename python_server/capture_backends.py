@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Capture Backends for Slide Capture Extension
+Pluggable screen grabbers used by the live slide mirroring pipeline.
+"""
+
+import os
+import time
+import logging
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.webp')
+
+
+def clamp_region(region, bounds):
+    """Intersect (left, top, right, bottom) with bounds - None if nothing is left"""
+    if bounds is None:
+        return region
+    left, top = max(region[0], bounds[0]), max(region[1], bounds[1])
+    right, bottom = min(region[2], bounds[2]), min(region[3], bounds[3])
+    if right <= left or bottom <= top:
+        return None
+    return (left, top, right, bottom)
+
+
+class CaptureBackend:
+    """Base class for screen capture backends - subclasses implement _grab()"""
+
+    name = 'base'
+
+    def __init__(self):
+        self.frames_grabbed = 0
+        self.last_grab_ms = 0.0
+        self.total_grab_ms = 0.0
+        self.max_grab_ms = 0.0
+        self.last_size = None
+
+    def _grab(self, region):
+        """Grab one frame (region in desktop pixels, or None for the default area) as a PIL RGB image"""
+        raise NotImplementedError
+
+    def grab(self, region=None):
+        """Grab one frame - only region = (left, top, right, bottom) if given - and record how long it took"""
+        if region is not None:
+            region = clamp_region(region, self.desktop_bounds())
+        start = time.perf_counter()
+        image = self._grab(region)
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+
+        self.frames_grabbed += 1
+        self.last_grab_ms = elapsed_ms
+        self.total_grab_ms += elapsed_ms
+        self.max_grab_ms = max(self.max_grab_ms, elapsed_ms)
+        self.last_size = image.size
+        return image
+
+    def desktop_bounds(self):
+        """(left, top, right, bottom) of the whole desktop, or None when the backend cannot tell"""
+        return None
+
+    def set_monitor(self, index):
+        """Grab one monitor by default (0 = all monitors, 1.. = physical monitors)"""
+        logger.warning(f"⚠️ {self.name} capture cannot select monitors - grabbing the whole screen")
+
+    def get_stats(self):
+        """Return per-frame grab timing for this backend"""
+        average = self.total_grab_ms / self.frames_grabbed if self.frames_grabbed else 0.0
+        return {
+            'backend': self.name,
+            'frames': self.frames_grabbed,
+            'last_grab_ms': round(self.last_grab_ms, 2),
+            'avg_grab_ms': round(average, 2),
+            'max_grab_ms': round(self.max_grab_ms, 2),
+            'last_size': self.last_size,
+        }
+
+    def close(self):
+        """Release any handles held by the backend"""
+        pass
+
+
+class PILCaptureBackend(CaptureBackend):
+    """Legacy backend - PIL.ImageGrab, opens a new grab context every frame"""
+
+    name = 'pil'
+
+    def __init__(self):
+        super().__init__()
+        from PIL import ImageGrab
+        self._image_grab = ImageGrab
+
+    def _grab(self, region):
+        if region is None:
+            return self._image_grab.grab()
+        # all_screens: bbox is in virtual desktop coordinates, like the other backends
+        return self._image_grab.grab(bbox=region, all_screens=True)
+
+
+class MSSCaptureBackend(CaptureBackend):
+    """mss backend - keeps one grabber handle open and reuses it for every frame"""
+
+    name = 'mss'
+
+    def __init__(self, monitor_index=0):
+        super().__init__()
+        import mss
+        self._mss = mss
+        self.monitor_index = monitor_index
+        self.monitor = None
+        self._sct = None
+
+    def _open(self):
+        """Open the grabber handle on first use - mss handles belong to the thread that made them"""
+        # One handle for the whole session (DC / XImage / CGImage reused between frames)
+        self._sct = self._mss.mss()
+        # Monitor 0 is the full virtual desktop, 1..n are the physical monitors
+        self._select_monitor()
+
+    def desktop_bounds(self):
+        if self._sct is None:
+            self._open()
+        desktop = self._sct.monitors[0]
+        return (desktop['left'], desktop['top'], desktop['left'] + desktop['width'], desktop['top'] + desktop['height'])
+
+    def set_monitor(self, index):
+        self.monitor_index = index
+        if self._sct is not None:
+            self._select_monitor()
+
+    def _select_monitor(self):
+        monitors = self._sct.monitors
+        if not 0 <= self.monitor_index < len(monitors):
+            logger.warning(f"⚠️ Monitor {self.monitor_index} not found ({len(monitors) - 1} monitors) - grabbing all")
+            self.monitor_index = 0
+        self.monitor = monitors[self.monitor_index]
+
+    def _grab(self, region):
+        if self._sct is None:
+            self._open()
+        if region is None:
+            area = self.monitor
+        else:
+            left, top, right, bottom = region
+            area = {'left': left, 'top': top, 'width': right - left, 'height': bottom - top}
+        shot = self._sct.grab(area)
+        # Decode straight from the BGRA buffer mss already holds - skips mss's slow .rgb conversion
+        image = Image.frombuffer('RGB', shot.size, shot.bgra, 'raw', 'BGRX', 0, 1)
+        image.bgrx = shot.bgra  # Raw buffer for encoders that take BGRX directly (not kept by resize/crop)
+        return image
+
+    def close(self):
+        if self._sct is None:
+            return
+        try:
+            self._sct.close()
+        except Exception as e:
+            logger.debug(f"mss close failed: {e}")
+        self._sct = None
+
+
+class SyntheticCaptureBackend(CaptureBackend):
+    """Headless backend - replays image files from a folder or generates test slides"""
+
+    name = 'synthetic'
+
+    def __init__(self, source=None, size=(1920, 1080), frames_per_slide=10, laser_dot=False):
+        super().__init__()
+        self.size = size
+        # None: slides only change through show_slide() (driven by injected input in benchmarks)
+        self.frames_per_slide = None if frames_per_slide is None else max(1, frames_per_slide)
+        self.laser_dot = laser_dot  # Draw a moving red dot, like a laser pointer over a static slide
+        self.slide_index = 0
+        self.pointer = None  # (x, y) of an injected laser pointer, drawn as a red dot
+        self._frame_index = 0
+        self._slides = self._load_slides(source) if source else self._generate_slides(size)
+        logger.info(f"🧪 Synthetic capture backend ready with {len(self._slides)} slides")
+
+    def _load_slides(self, source):
+        """Load every image in a folder (sorted by name) to replay as recorded slides"""
+        if os.path.isdir(source):
+            paths = sorted(
+                os.path.join(source, name) for name in os.listdir(source)
+                if name.lower().endswith(IMAGE_EXTENSIONS)
+            )
+        else:
+            paths = [source]
+
+        slides = []
+        for path in paths:
+            with Image.open(path) as image:
+                slides.append(image.convert('RGB'))
+
+        if not slides:
+            raise ValueError(f"No slide images found in {source}")
+        return slides
+
+    def _generate_slides(self, size, count=5):
+        """Draw simple text-like slides so the pipeline has realistic flat content"""
+        from PIL import ImageDraw
+        width, height = size
+        slides = []
+        for index in range(count):
+            image = Image.new('RGB', size, (250, 250, 250))
+            draw = ImageDraw.Draw(image)
+            draw.rectangle([0, 0, width, height // 6], fill=(30, 41, 59))
+            draw.text((width // 20, height // 16), f"Slide {index + 1}", fill=(255, 255, 255))
+            line_height = height // 14
+            for line in range(6):
+                top = height // 4 + line * line_height
+                right = width // 10 + (width * (50 + 7 * ((index + line) % 5))) // 100
+                draw.rectangle([width // 10, top, right, top + line_height // 3], fill=(71, 85, 105))
+            slides.append(image)
+        return slides
+
+    @property
+    def slide_count(self):
+        return len(self._slides)
+
+    def show_slide(self, index):
+        """Switch to a slide (clamped to the deck), like a presenter pressing next/previous"""
+        self.slide_index = max(0, min(index, len(self._slides) - 1))
+
+    def set_pointer(self, position):
+        """Draw a laser dot at (x, y) on the next grabs, or remove it with None"""
+        self.pointer = position
+
+    def desktop_bounds(self):
+        width, height = self._slides[self.slide_index].size
+        return (0, 0, width, height)
+
+    def set_monitor(self, index):
+        pass  # One synthetic "monitor" - the whole slide
+
+    def _grab(self, region):
+        if self.frames_per_slide is not None:
+            self.slide_index = (self._frame_index // self.frames_per_slide) % len(self._slides)
+        slide = self._slides[self.slide_index]
+        self._frame_index += 1
+        # Return a copy so callers can mutate/resize freely, just like a real grab
+        image = slide.copy()
+        dot = self.pointer
+        if self.laser_dot and dot is None:
+            width, height = image.size
+            dot = ((self._frame_index * 37) % width, height // 2 + (self._frame_index * 23) % (height // 3))
+        if dot is not None:
+            from PIL import ImageDraw
+            x, y = dot
+            ImageDraw.Draw(image).ellipse([x - 8, y - 8, x + 8, y + 8], fill=(255, 0, 0))
+        if region is not None:
+            image = image.crop(region)
+        return image
+
+
+CAPTURE_BACKENDS = {
+    'pil': PILCaptureBackend,
+    'mss': MSSCaptureBackend,
+    'synthetic': SyntheticCaptureBackend,
+}
+
+
+def create_capture_backend(name='auto', **options):
+    """Create a capture backend by name ('auto' prefers mss and falls back to PIL)"""
+    if name == 'auto':
+        try:
+            return MSSCaptureBackend(**options)
+        except Exception as e:
+            logger.warning(f"⚠️ mss capture unavailable ({e}) - falling back to PIL.ImageGrab")
+            return PILCaptureBackend()
+
+    if name not in CAPTURE_BACKENDS:
+        raise ValueError(f"Unknown capture backend: {name} (choose from {', '.join(CAPTURE_BACKENDS)})")
+    return CAPTURE_BACKENDS[name](**options)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Change-triggered Capture Scheduler for Live Slide Streaming
+Captures in a short burst right after an input event (to catch slide transitions
+and animations), at the client frame rate while the pointer is moving, and only
+at a slow idle poll when nothing is happening.
+"""
+
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Capture points after an input event, in ms - transitions/animations usually settle by 400 ms
+DEFAULT_BURST_OFFSETS_MS = (0, 50, 150, 400)
+DEFAULT_IDLE_INTERVAL = 2.0  # Seconds between captures when nothing happens
+DEFAULT_ACTIVE_HOLD = 1.5  # Seconds to keep the full frame rate after pointer activity
+
+MODE_BURST = 'burst'
+MODE_ACTIVE = 'active'
+MODE_IDLE = 'idle'
+
+
+class CaptureScheduler:
+    """Decides when the streaming loop captures next and wakes it up on input"""
+
+    def __init__(self, burst_offsets_ms=DEFAULT_BURST_OFFSETS_MS, idle_interval=DEFAULT_IDLE_INTERVAL,
+                 active_hold=DEFAULT_ACTIVE_HOLD):
+        self.burst_offsets = [offset / 1000.0 for offset in sorted(burst_offsets_ms)]
+        self.idle_interval = idle_interval
+        self.active_hold = active_hold
+
+        self._burst_times = []  # Loop times of the burst captures still to come
+        self._active_until = 0.0
+        self._wakeup = None  # Created lazily so the scheduler can be built outside a running loop
+
+        # Counters
+        self.triggers = 0
+        self.captures = {MODE_BURST: 0, MODE_ACTIVE: 0, MODE_IDLE: 0}
+
+    def start(self):
+        """Reset for a new streaming session (the wakeup event belongs to the current loop)"""
+        self._burst_times = []
+        self._active_until = 0.0
+        self._wakeup = asyncio.Event()
+
+    def _now(self):
+        return asyncio.get_running_loop().time()
+
+    def _get_wakeup(self):
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        return self._wakeup
+
+    def trigger(self, reason='input'):
+        """Input event (slide change, keystroke, click) - start a capture burst now"""
+        now = self._now()
+        self._burst_times = [now + offset for offset in self.burst_offsets]
+        self._active_until = max(self._active_until, self._burst_times[-1] if self._burst_times else now)
+        self.triggers += 1
+        logger.debug("⚡ Capture burst triggered by %s", reason)
+        self._get_wakeup().set()
+
+    def note_activity(self):
+        """Ongoing activity without a discrete change (pointer moves) - keep the active frame rate"""
+        now = self._now()
+        was_idle = now >= self._active_until and not self._burst_times
+        self._active_until = now + self.active_hold
+        if was_idle:
+            # Leave the idle poll right away instead of after up to idle_interval
+            self._get_wakeup().set()
+
+    def mode(self, now):
+        """Current scheduling mode"""
+        if self._burst_times:
+            return MODE_BURST
+        if now < self._active_until:
+            return MODE_ACTIVE
+        return MODE_IDLE
+
+    def next_delay(self, now, active_delay):
+        """Seconds until the next capture; active_delay is the client frame interval"""
+        if self._burst_times:
+            return max(0.0, self._burst_times[0] - now)
+        if now < self._active_until:
+            return active_delay
+        return self.idle_interval
+
+    def burst_due(self, now):
+        """Consume the burst points that are due - True when this tick is part of a burst"""
+        due = False
+        while self._burst_times and self._burst_times[0] <= now + 0.001:
+            self._burst_times.pop(0)
+            due = True
+        return due
+
+    def record_capture(self, mode):
+        self.captures[mode] += 1
+
+    def wake(self):
+        """Cut the current wait short (e.g. when streaming stops)"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def wait(self, delay):
+        """Sleep for delay seconds, or until an input event arrives"""
+        wakeup = self._get_wakeup()
+        wakeup.clear()
+        if delay <= 0:
+            return
+        try:
+            await asyncio.wait_for(wakeup.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+
+    def get_stats(self):
+        return {
+            'triggers': self.triggers,
+            'burst_captures': self.captures[MODE_BURST],
+            'active_captures': self.captures[MODE_ACTIVE],
+            'idle_captures': self.captures[MODE_IDLE],
+            'idle_interval': self.idle_interval,
+        }
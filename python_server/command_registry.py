@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Command Registry for Slide Controller Server
+Every phone command with its handler, typed parameters and injection priority,
+built once at startup. A lookup is one dict access; unknown commands and bad
+parameters are rejected before any work is queued, and every command is counted.
+"""
+
+import math
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CommandError(ValueError):
+    """Unknown command or invalid parameters - sent back to the client as an error response"""
+
+
+class Param:
+    """One typed parameter - converted to kind, numbers clamped to [minimum, maximum]"""
+
+    def __init__(self, name, kind, default=None, minimum=None, maximum=None, max_length=None):
+        self.name = name
+        self.kind = kind
+        self.default = default
+        self.minimum = minimum
+        self.maximum = maximum
+        self.max_length = max_length
+
+    def parse(self, params):
+        value = params.get(self.name, self.default) if params else self.default
+        if value is None:
+            if self.default is None:
+                raise CommandError(f"Missing parameter: {self.name}")
+            value = self.default
+
+        if self.kind is str:
+            if not isinstance(value, str) or not value:
+                raise CommandError(f"{self.name} must be a non-empty string")
+            if self.max_length is not None and len(value) > self.max_length:
+                raise CommandError(f"{self.name} is longer than {self.max_length} characters")
+            return value
+
+        # Numbers - JSON booleans are ints in Python, but never a valid coordinate
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise CommandError(f"{self.name} must be a number")
+        value = self.kind(value)
+        if isinstance(value, float) and not math.isfinite(value):
+            raise CommandError(f"{self.name} must be finite")
+        if self.minimum is not None and value < self.minimum:
+            value = self.minimum
+        if self.maximum is not None and value > self.maximum:
+            value = self.maximum
+        return value
+
+
+class Command:
+    """A registered command - handler, parameter schema, how it runs and its counters"""
+
+    def __init__(self, name, handler, params=(), run_async=False, priority=None):
+        self.name = name
+        self.handler = handler
+        self.params = tuple(params)
+        self.run_async = run_async  # Coroutine on the loop, else run on the input injection thread
+        self.priority = priority
+        self.calls = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def parse(self, params):
+        """Handler arguments in schema order"""
+        if params is not None and not isinstance(params, dict):
+            raise CommandError("params must be an object")
+        return tuple(param.parse(params) for param in self.params)
+
+    def record(self, started, ok=True):
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        self.calls += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        if not ok:
+            self.errors += 1
+
+    def get_stats(self):
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'avg_ms': round(self.total_ms / self.calls, 2) if self.calls else 0.0,
+            'max_ms': round(self.max_ms, 2),
+        }
+
+
+class CommandRegistry:
+    """Command name (or alias) -> Command"""
+
+    def __init__(self):
+        self.commands = {}
+        self.unknown = 0
+        self.invalid = 0
+
+    def register(self, name, handler, params=(), run_async=False, priority=None, aliases=()):
+        command = Command(name, handler, params, run_async, priority)
+        for key in (name,) + tuple(aliases):
+            if key in self.commands:
+                raise ValueError(f"Command already registered: {key}")
+            self.commands[key] = command
+        return command
+
+    def get(self, name):
+        return self.commands.get(name)
+
+    def resolve(self, name, params=None):
+        """(Command, handler args) for a message - raises CommandError for unknown names or bad params"""
+        command = self.commands.get(name)
+        if command is None:
+            self.unknown += 1
+            raise CommandError(f"Unknown command: {name}")
+        try:
+            return command, command.parse(params)
+        except CommandError:
+            self.invalid += 1
+            raise
+
+    def get_stats(self):
+        """Per-command call counts and run time, plus rejected messages"""
+        commands = {}
+        for command in self.commands.values():
+            if command.calls:
+                commands[command.name] = command.get_stats()
+        return {'commands': commands, 'unknown': self.unknown, 'invalid': self.invalid}
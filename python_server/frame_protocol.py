@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Binary Frame Protocol for Slide Mirroring
+Raw image bytes behind a small fixed header, sent as a binary WebSocket frame
+instead of a base64 data URL inside JSON.
+
+Header layout (network byte order, 26 bytes):
+    magic         2s   b'PP'
+    version       B    FRAME_PROTOCOL_VERSION
+    kind          B    FRAME_KIND_* (what follows the header)
+    format        B    IMAGE_FORMAT_CODES value
+    quality       B    encoder quality 1-100
+    frame_id      I    increasing frame counter
+    slide_number  i    current slide, -1 when unknown
+    timestamp     d    server wall clock (seconds since epoch)
+    scale         f    capture scale relative to the grabbed area
+
+Delta frames (kind FRAME_KIND_DELTA) carry only the tiles that differ from the
+keyframe named by base_frame_id. Deltas are cumulative against that keyframe,
+so a client that misses one (latest-wins queues) loses nothing - it redraws the
+keyframe and pastes the tiles of the newest delta. After the header:
+    base_frame_id I, tile_count H, then per tile: x H, y H, w H, h H, length I, bytes
+"""
+
+import struct
+
+FRAME_MAGIC = b'PP'
+FRAME_PROTOCOL_VERSION = 1
+
+FRAME_KIND_FULL = 1
+FRAME_KIND_DELTA = 2
+
+IMAGE_FORMAT_CODES = {
+    'jpeg': 1,
+    'webp': 2,  # Lossy or lossless
+    'png': 3,  # Quantized palette
+}
+IMAGE_FORMAT_NAMES = {code: name for name, code in IMAGE_FORMAT_CODES.items()}
+
+FRAME_HEADER = struct.Struct('!2sBBBBIidf')
+DELTA_HEADER = struct.Struct('!IH')
+TILE_HEADER = struct.Struct('!HHHHI')
+
+
+def pack_frame(payload, frame_id, timestamp, scale, quality, image_format='jpeg',
+               slide_number=None, kind=FRAME_KIND_FULL):
+    """Build a binary frame: fixed header followed by the raw image bytes"""
+    header = FRAME_HEADER.pack(
+        FRAME_MAGIC,
+        FRAME_PROTOCOL_VERSION,
+        kind,
+        IMAGE_FORMAT_CODES[image_format],
+        int(quality),
+        frame_id & 0xFFFFFFFF,
+        -1 if slide_number is None else int(slide_number),
+        timestamp,
+        scale,
+    )
+    return header + payload
+
+
+def pack_delta_frame(tiles, frame_id, base_frame_id, timestamp, scale, quality,
+                     image_format='jpeg', slide_number=None):
+    """Build a binary delta frame from (x, y, w, h, image_bytes) tiles"""
+    parts = [DELTA_HEADER.pack(base_frame_id & 0xFFFFFFFF, len(tiles))]
+    for x, y, w, h, image_data in tiles:
+        parts.append(TILE_HEADER.pack(x, y, w, h, len(image_data)))
+        parts.append(image_data)
+    return pack_frame(
+        b''.join(parts), frame_id, timestamp, scale, quality,
+        image_format=image_format, slide_number=slide_number, kind=FRAME_KIND_DELTA,
+    )
+
+
+def unpack_delta_payload(payload):
+    """Split a delta payload into (base_frame_id, [(x, y, w, h, image_bytes), ...])"""
+    base_frame_id, tile_count = DELTA_HEADER.unpack_from(payload)
+    offset = DELTA_HEADER.size
+    tiles = []
+    for _ in range(tile_count):
+        x, y, w, h, length = TILE_HEADER.unpack_from(payload, offset)
+        offset += TILE_HEADER.size
+        tiles.append((x, y, w, h, bytes(payload[offset:offset + length])))
+        offset += length
+    return base_frame_id, tiles
+
+
+def unpack_frame(data):
+    """Split a binary frame into its header fields and payload (used by test clients)"""
+    if len(data) < FRAME_HEADER.size:
+        raise ValueError("Frame shorter than header")
+
+    magic, version, kind, format_code, quality, frame_id, slide_number, timestamp, scale = \
+        FRAME_HEADER.unpack_from(data)
+    if magic != FRAME_MAGIC:
+        raise ValueError(f"Bad frame magic: {magic!r}")
+    if version != FRAME_PROTOCOL_VERSION:
+        raise ValueError(f"Unsupported frame protocol version: {version}")
+
+    header = {
+        'kind': kind,
+        'image_format': IMAGE_FORMAT_NAMES.get(format_code, 'unknown'),
+        'image_quality': quality,
+        'frame_id': frame_id,
+        'slide_number': None if slide_number < 0 else slide_number,
+        'timestamp': timestamp,
+        'image_scale': scale,
+    }
+    return header, memoryview(data)[FRAME_HEADER.size:]
+
+
+def get_capabilities():
+    """Capabilities advertised in the welcome message"""
+    return {
+        'binary_frames': True,
+        'delta_frames': True,
+        'frame_protocol_version': FRAME_PROTOCOL_VERSION,
+        'frame_header_bytes': FRAME_HEADER.size,
+        'image_formats': list(IMAGE_FORMAT_CODES),
+    }
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Image Encoders for Slide Capture Extension
+Pluggable encoders used by the live slide mirroring pipeline: JPEG through
+libjpeg-turbo (PyTurboJPEG) when it is installed or Pillow otherwise, plus WebP
+and palette PNG for flat, text-heavy slides.
+"""
+
+import io
+import time
+import logging
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Chroma subsampling names shared by every encoder
+SUBSAMPLING_MODES = ('4:4:4', '4:2:2', '4:2:0')
+
+# Output modes of the capture pipeline -> wire format each one produces
+IMAGE_MODES = {
+    'auto': None,  # Per frame: palette PNG (or WebP) for flat slides, JPEG for photos
+    'jpeg': 'jpeg',
+    'webp': 'webp',
+    'webp-lossless': 'webp',
+    'png': 'png',
+}
+
+
+class ImageEncoder:
+    """Base class for image encoders - subclasses implement _encode()"""
+
+    name = 'base'
+    image_format = 'jpeg'
+
+    def __init__(self):
+        self.images_encoded = 0
+        self.last_encode_ms = 0.0
+        self.total_encode_ms = 0.0
+        self.max_encode_ms = 0.0
+        self.last_size = None
+
+    def _encode(self, image, quality):
+        """Encode a PIL image and return the compressed bytes"""
+        raise NotImplementedError
+
+    def encode(self, image, quality):
+        """Encode one image and record how long the encode took"""
+        start = time.perf_counter()
+        data = self._encode(image, quality)
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+
+        self.images_encoded += 1
+        self.last_encode_ms = elapsed_ms
+        self.total_encode_ms += elapsed_ms
+        self.max_encode_ms = max(self.max_encode_ms, elapsed_ms)
+        self.last_size = image.size
+        return data
+
+    def get_stats(self):
+        """Return per-image encode timing for this encoder"""
+        average = self.total_encode_ms / self.images_encoded if self.images_encoded else 0.0
+        return {
+            'encoder': self.name,
+            'images': self.images_encoded,
+            'last_encode_ms': round(self.last_encode_ms, 2),
+            'avg_encode_ms': round(average, 2),
+            'max_encode_ms': round(self.max_encode_ms, 2),
+        }
+
+
+class PillowJPEGEncoder(ImageEncoder):
+    """Pillow's libjpeg - optimize=True adds a second Huffman pass over every image"""
+
+    name = 'pillow'
+
+    def __init__(self, subsampling='4:2:0', optimize=True, progressive=False):
+        super().__init__()
+        if subsampling not in SUBSAMPLING_MODES:
+            raise ValueError(f"Unknown subsampling: {subsampling} (choose from {', '.join(SUBSAMPLING_MODES)})")
+        self.subsampling = subsampling
+        self.optimize = optimize
+        self.progressive = progressive
+
+    def _encode(self, image, quality):
+        buffer = io.BytesIO()
+        image.save(
+            buffer, format='JPEG', quality=quality, subsampling=self.subsampling,
+            optimize=self.optimize, progressive=self.progressive,
+        )
+        return buffer.getvalue()
+
+
+class TurboJPEGEncoder(ImageEncoder):
+    """libjpeg-turbo via PyTurboJPEG - SIMD encode straight from the grab buffer when it is unscaled"""
+
+    name = 'turbojpeg'
+
+    def __init__(self, subsampling='4:2:0', fast_dct=True, lib_path=None):
+        super().__init__()
+        import numpy
+        import turbojpeg
+        if subsampling not in SUBSAMPLING_MODES:
+            raise ValueError(f"Unknown subsampling: {subsampling} (choose from {', '.join(SUBSAMPLING_MODES)})")
+        self._numpy = numpy
+        self._turbojpeg = turbojpeg
+        self._jpeg = turbojpeg.TurboJPEG(lib_path)  # Raises if libjpeg-turbo itself is missing
+        self.subsampling = subsampling
+        self.fast_dct = fast_dct  # Integer DCT - faster, differences are invisible at streaming qualities
+        self._subsample = {
+            '4:4:4': turbojpeg.TJSAMP_444,
+            '4:2:2': turbojpeg.TJSAMP_422,
+            '4:2:0': turbojpeg.TJSAMP_420,
+        }[subsampling]
+        self._flags = turbojpeg.TJFLAG_FASTDCT if fast_dct else 0
+        self.raw_buffer_encodes = 0
+
+    def _pixels(self, image):
+        """(array, pixel format) - the backend's BGRX buffer as-is when the image was not scaled"""
+        width, height = image.size
+        raw = getattr(image, 'bgrx', None)
+        if raw is not None and len(raw) == width * height * 4:
+            self.raw_buffer_encodes += 1
+            return self._numpy.frombuffer(raw, dtype=self._numpy.uint8).reshape(height, width, 4), self._turbojpeg.TJPF_BGRX
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        return self._numpy.asarray(image), self._turbojpeg.TJPF_RGB
+
+    def _encode(self, image, quality):
+        pixels, pixel_format = self._pixels(image)
+        return self._jpeg.encode(
+            pixels, quality=quality, pixel_format=pixel_format,
+            jpeg_subsample=self._subsample, flags=self._flags,
+        )
+
+    def get_stats(self):
+        stats = super().get_stats()
+        stats['raw_buffer_encodes'] = self.raw_buffer_encodes
+        return stats
+
+
+class WebPEncoder(ImageEncoder):
+    """Pillow's libwebp - lossy keeps flat colors and text edges cleaner than JPEG at the same size"""
+
+    name = 'webp'
+    image_format = 'webp'
+
+    def __init__(self, lossless=False, method=0):
+        super().__init__()
+        self.lossless = lossless
+        self.method = method  # 0 = fastest, 6 = smallest
+        if lossless:
+            self.name = 'webp-lossless'
+
+    def _encode(self, image, quality):
+        buffer = io.BytesIO()
+        # For lossless, quality is compression effort - keep it at the fast end
+        image.save(
+            buffer, format='WEBP', quality=0 if self.lossless else quality,
+            lossless=self.lossless, method=self.method,
+        )
+        return buffer.getvalue()
+
+
+class PalettePNGEncoder(ImageEncoder):
+    """Quantized palette PNG - sharp text and small files for slides with few colors"""
+
+    name = 'png'
+    image_format = 'png'
+
+    def __init__(self, colors=256, compress_level=1):
+        super().__init__()
+        self.colors = colors
+        self.compress_level = compress_level  # zlib level - 1 is several times faster than 6 at nearly the same size
+
+    def _encode(self, image, quality):
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        palette = image.quantize(self.colors, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+        buffer = io.BytesIO()
+        palette.save(buffer, format='PNG', compress_level=self.compress_level)
+        return buffer.getvalue()
+
+
+def estimate_colors(image, limit, sample_width=160):
+    """Distinct colors in a nearest-neighbour sample of the image, or None if there are more than limit"""
+    factor = max(1, image.width // sample_width)
+    if factor > 1:
+        # Nearest keeps real pixel colors - filtering would invent blends and inflate the count
+        image = image.resize((image.width // factor, image.height // factor), Image.Resampling.NEAREST)
+    colors = image.getcolors(limit)
+    return None if colors is None else len(colors)
+
+
+def choose_image_mode(mode, accepted_formats, color_count=None):
+    """Output mode for one frame, limited to the formats the client accepts (JPEG always works)"""
+    if mode == 'auto':
+        if color_count is None:
+            return 'jpeg'  # Photo-like content - JPEG is fastest and smallest
+        if 'png' in accepted_formats:
+            return 'png'
+        if 'webp' in accepted_formats:
+            return 'webp'
+        return 'jpeg'
+    return mode if IMAGE_MODES[mode] in accepted_formats else 'jpeg'
+
+
+def create_format_encoder(mode):
+    """Encoder for a non-JPEG output mode ('webp', 'webp-lossless', 'png')"""
+    if mode == 'webp':
+        return WebPEncoder()
+    if mode == 'webp-lossless':
+        return WebPEncoder(lossless=True)
+    if mode == 'png':
+        return PalettePNGEncoder()
+    raise ValueError(f"No format encoder for mode: {mode}")
+
+
+IMAGE_ENCODERS = {
+    'turbojpeg': TurboJPEGEncoder,
+    'pillow': PillowJPEGEncoder,
+}
+
+
+def create_image_encoder(name='auto', **options):
+    """Create an image encoder by name ('auto' prefers turbojpeg and falls back to Pillow)"""
+    if name == 'auto':
+        try:
+            return TurboJPEGEncoder(**options)
+        except Exception as e:
+            logger.warning(f"⚠️ TurboJPEG unavailable ({e}) - falling back to Pillow JPEG")
+            options.pop('fast_dct', None)
+            options.pop('lib_path', None)
+            return PillowJPEGEncoder(**options)
+
+    if name not in IMAGE_ENCODERS:
+        raise ValueError(f"Unknown image encoder: {name} (choose from {', '.join(IMAGE_ENCODERS)})")
+    return IMAGE_ENCODERS[name](**options)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Image Scaler for Slide Capture Extension
+Downscales grabs for the mirroring pipeline. The default 'reduce' filter does the
+integer part of the downscale as a box average (Image.reduce) and only the small
+remainder with a cheap bilinear pass, instead of LANCZOS over the full-resolution grab.
+The box step only exists at scales of 0.5 and below - above that 'reduce' is plain
+bilinear, the cheapest filter for a less than 2x downscale.
+"""
+
+import time
+import logging
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+PIL_FILTERS = {
+    'nearest': Image.Resampling.NEAREST,
+    'box': Image.Resampling.BOX,
+    'bilinear': Image.Resampling.BILINEAR,
+    'hamming': Image.Resampling.HAMMING,
+    'bicubic': Image.Resampling.BICUBIC,
+    'lanczos': Image.Resampling.LANCZOS,  # Previous default - best quality, slowest
+}
+
+# Integer downscale first, then a cheap filter for what is left
+STAGED_FILTERS = ('reduce', 'numpy-box')
+
+RESIZE_FILTERS = tuple(PIL_FILTERS) + STAGED_FILTERS
+
+
+class ResizeGeometry:
+    """Sizes of one (source size, scale) downscale - computed once, reused every frame"""
+
+    def __init__(self, source_size, scale):
+        width, height = source_size
+        self.source_size = source_size
+        self.target_size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        # Largest integer factor that does not go below the target size
+        self.factor = max(1, min(width // self.target_size[0], height // self.target_size[1]))
+        self.reduced_size = (width // self.factor, height // self.factor)
+
+
+class ImageScaler:
+    """Scales grabs with a configurable filter and records resize time per frame"""
+
+    def __init__(self, filter_name='reduce', remainder_filter='bilinear'):
+        self.set_filter(filter_name, remainder_filter)
+        self._geometry = {}  # (source size, scale) -> ResizeGeometry
+        self.frames_scaled = 0
+        self.last_resize_ms = 0.0
+        self.total_resize_ms = 0.0
+        self.max_resize_ms = 0.0
+
+    def set_filter(self, filter_name, remainder_filter=None):
+        """Select the resize filter - a PIL filter name, 'reduce' or 'numpy-box'"""
+        if filter_name not in RESIZE_FILTERS:
+            raise ValueError(f"Unknown resize filter: {filter_name} (choose from {', '.join(RESIZE_FILTERS)})")
+        if filter_name == 'numpy-box':
+            import numpy
+            self._numpy = numpy
+        if remainder_filter is not None and remainder_filter not in PIL_FILTERS:
+            raise ValueError(f"Unknown remainder filter: {remainder_filter} (choose from {', '.join(PIL_FILTERS)})")
+        self.filter_name = filter_name
+        if remainder_filter is not None:
+            self.remainder_filter = remainder_filter
+
+    def geometry(self, source_size, scale):
+        """Cached resize geometry - only recomputed when the grab size or scale changes"""
+        key = (source_size, scale)
+        geometry = self._geometry.get(key)
+        if geometry is None:
+            if len(self._geometry) >= 16:
+                self._geometry.clear()  # Old monitor layouts / scales
+            geometry = self._geometry[key] = ResizeGeometry(source_size, scale)
+        return geometry
+
+    def _numpy_box(self, image, factor):
+        """Integer box average with NumPy - same result as Image.reduce"""
+        numpy = self._numpy
+        width, height = image.width // factor, image.height // factor
+        pixels = numpy.asarray(image)[:height * factor, :width * factor]
+        channels = pixels.shape[2] if pixels.ndim == 3 else 1
+        blocks = pixels.reshape(height, factor, width, factor, channels).mean(axis=(1, 3), dtype=numpy.float32)
+        blocks = (blocks + 0.5).astype(numpy.uint8)
+        return Image.fromarray(blocks if channels > 1 else blocks[:, :, 0], image.mode)
+
+    def _resize(self, image, geometry):
+        if self.filter_name in PIL_FILTERS:
+            return image.resize(geometry.target_size, PIL_FILTERS[self.filter_name])
+        if geometry.factor < 2:
+            # Less than 2x down (e.g. the default 0.6) - no integer step, straight to the remainder filter
+            return image.resize(geometry.target_size, PIL_FILTERS[self.remainder_filter])
+
+        if self.filter_name == 'numpy-box':
+            image = self._numpy_box(image, geometry.factor)
+        else:
+            image = image.reduce(geometry.factor)
+        if image.size != geometry.target_size:
+            image = image.resize(geometry.target_size, PIL_FILTERS[self.remainder_filter])
+        return image
+
+    def scale(self, image, scale):
+        """Return image scaled by scale (the image itself at 1.0)"""
+        if scale == 1.0:
+            return image
+        start = time.perf_counter()
+        scaled = self._resize(image, self.geometry(image.size, scale))
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+
+        self.frames_scaled += 1
+        self.last_resize_ms = elapsed_ms
+        self.total_resize_ms += elapsed_ms
+        self.max_resize_ms = max(self.max_resize_ms, elapsed_ms)
+        return scaled
+
+    def get_stats(self):
+        """Return the filter in use and per-frame resize time"""
+        average = self.total_resize_ms / self.frames_scaled if self.frames_scaled else 0.0
+        return {
+            'filter': self.filter_name,
+            'frames': self.frames_scaled,
+            'last_resize_ms': round(self.last_resize_ms, 2),
+            'avg_resize_ms': round(average, 2),
+            'max_resize_ms': round(self.max_resize_ms, 2),
+        }
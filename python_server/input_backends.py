@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Input Backends for Slide Controller
+Pluggable keyboard/mouse injectors: native SendInput (Windows) and XTest (Linux)
+talk to the OS directly, pyautogui is the portable fallback, and the null backend
+only records events for tests and benchmarks.
+"""
+
+import sys
+import time
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class InputBackend:
+    """Base class for input backends - subclasses implement the _press/_hotkey/_move_to/_click calls"""
+
+    name = 'base'
+
+    def __init__(self):
+        self.call_stats = {}  # call -> [count, total_ms, max_ms]
+
+    def _timed(self, call, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+
+        stats = self.call_stats.get(call)
+        if stats is None:
+            stats = self.call_stats[call] = [0, 0.0, 0.0]
+        stats[0] += 1
+        stats[1] += elapsed_ms
+        stats[2] = max(stats[2], elapsed_ms)
+        return result
+
+    def press(self, key):
+        """Press and release one key (pyautogui key names: 'right', 'f5', 'esc', 'b', ...)"""
+        return self._timed('press', self._press, key)
+
+    def hotkey(self, *keys):
+        """Press keys in order and release them in reverse (e.g. 'ctrl', 'l')"""
+        return self._timed('hotkey', self._hotkey, *keys)
+
+    def move_to(self, x, y):
+        """Move the mouse cursor to absolute screen pixels"""
+        return self._timed('move_to', self._move_to, x, y)
+
+    def click(self, x, y):
+        """Left click at absolute screen pixels"""
+        return self._timed('click', self._click, x, y)
+
+    def _press(self, key):
+        raise NotImplementedError
+
+    def _hotkey(self, *keys):
+        raise NotImplementedError
+
+    def _move_to(self, x, y):
+        raise NotImplementedError
+
+    def _click(self, x, y):
+        raise NotImplementedError
+
+    def screen_size(self):
+        """Return (width, height) of the primary screen in pixels"""
+        raise NotImplementedError
+
+    def active_window(self):
+        """(title, (left, top, right, bottom)) of the focused window, or None when the backend cannot tell"""
+        return None
+
+    def active_window_title(self):
+        """Title of the focused window, or None when the backend cannot tell"""
+        window = self.active_window()
+        return window[0] if window else None
+
+    def get_stats(self):
+        """Return per-call injection timing for this backend"""
+        calls = {}
+        for call, (count, total_ms, max_ms) in self.call_stats.items():
+            calls[call] = {
+                'count': count,
+                'avg_ms': round(total_ms / count, 4),
+                'max_ms': round(max_ms, 4),
+            }
+        return {'backend': self.name, 'calls': calls}
+
+    def close(self):
+        """Release any handles held by the backend"""
+        pass
+
+
+class PyAutoGUIInputBackend(InputBackend):
+    """Portable fallback - pyautogui with its built-in pauses and fail-safe turned off"""
+
+    name = 'pyautogui'
+
+    def __init__(self):
+        super().__init__()
+        import pyautogui
+        # Set once here instead of everywhere pyautogui is used
+        pyautogui.PAUSE = 0.0  # No sleep after every call
+        pyautogui.FAILSAFE = False  # Moving to a corner must not abort a presentation
+        self._pyautogui = pyautogui
+
+    def _press(self, key):
+        self._pyautogui.press(key)
+
+    def _hotkey(self, *keys):
+        self._pyautogui.hotkey(*keys)
+
+    def _move_to(self, x, y):
+        self._pyautogui.moveTo(x, y, duration=0.0)
+
+    def _click(self, x, y):
+        self._pyautogui.click(x, y)
+
+    def screen_size(self):
+        width, height = self._pyautogui.size()
+        return width, height
+
+    def active_window(self):
+        window = self._pyautogui.getActiveWindow()
+        if not window:
+            return None
+        return window.title, (window.left, window.top, window.left + window.width, window.top + window.height)
+
+
+# pyautogui key names -> X keysym names
+XTEST_KEYSYMS = {
+    'right': 'Right', 'left': 'Left', 'up': 'Up', 'down': 'Down',
+    'home': 'Home', 'end': 'End', 'pageup': 'Prior', 'pagedown': 'Next',
+    'esc': 'Escape', 'escape': 'Escape', 'enter': 'Return', 'return': 'Return',
+    'space': 'space', 'tab': 'Tab', 'backspace': 'BackSpace', 'delete': 'Delete',
+    'ctrl': 'Control_L', 'alt': 'Alt_L', 'shift': 'Shift_L',
+    'volumeup': 'XF86_AudioRaiseVolume', 'volumedown': 'XF86_AudioLowerVolume',
+    'volumemute': 'XF86_AudioMute',
+}
+# Keysym names are case-sensitive - 'F5' exists, 'f5' does not
+XTEST_KEYSYMS.update({f'f{number}': f'F{number}' for number in range(1, 25)})
+
+
+class XTestInputBackend(InputBackend):
+    """Linux/X11 backend - XTest fake input through python-xlib, one display connection reused"""
+
+    name = 'xtest'
+
+    def __init__(self, display_name=None):
+        super().__init__()
+        from Xlib import X, XK, display
+        from Xlib.ext import xtest
+        XK.load_keysym_group('xf86')  # Volume keys
+        self._X = X
+        self._XK = XK
+        self._xtest = xtest
+        self._display = display.Display(display_name)
+        if not self._display.has_extension('XTEST'):
+            raise RuntimeError("X server has no XTEST extension")
+        self._keycodes = {}  # key name -> keycode
+
+    def _keycode(self, key):
+        keycode = self._keycodes.get(key)
+        if keycode is None:
+            keysym = self._XK.string_to_keysym(XTEST_KEYSYMS.get(key.lower(), key))
+            if not keysym:
+                raise ValueError(f"Unknown key: {key}")
+            keycode = self._display.keysym_to_keycode(keysym)
+            if not keycode:
+                raise ValueError(f"Key {key} is not on the current keyboard map")
+            self._keycodes[key] = keycode
+        return keycode
+
+    def _press(self, key):
+        keycode = self._keycode(key)
+        self._xtest.fake_input(self._display, self._X.KeyPress, keycode)
+        self._xtest.fake_input(self._display, self._X.KeyRelease, keycode)
+        self._display.sync()
+
+    def _hotkey(self, *keys):
+        keycodes = [self._keycode(key) for key in keys]
+        for keycode in keycodes:
+            self._xtest.fake_input(self._display, self._X.KeyPress, keycode)
+        for keycode in reversed(keycodes):
+            self._xtest.fake_input(self._display, self._X.KeyRelease, keycode)
+        self._display.sync()
+
+    def _move_to(self, x, y):
+        self._xtest.fake_input(self._display, self._X.MotionNotify, x=int(x), y=int(y))
+        self._display.sync()
+
+    def _click(self, x, y):
+        self._xtest.fake_input(self._display, self._X.MotionNotify, x=int(x), y=int(y))
+        self._xtest.fake_input(self._display, self._X.ButtonPress, 1)
+        self._xtest.fake_input(self._display, self._X.ButtonRelease, 1)
+        self._display.sync()
+
+    def screen_size(self):
+        screen = self._display.screen()
+        return screen.width_in_pixels, screen.height_in_pixels
+
+    def active_window(self):
+        root = self._display.screen().root
+        active = root.get_full_property(self._display.intern_atom('_NET_ACTIVE_WINDOW'), self._X.AnyPropertyType)
+        if not active or not active.value:
+            return None
+        window = self._display.create_resource_object('window', active.value[0])
+        name = window.get_wm_name()
+        title = name.decode('utf-8', 'replace') if isinstance(name, bytes) else name
+        # Geometry is relative to the parent (often a WM frame) - translate the origin to root
+        geometry = window.get_geometry()
+        origin = root.translate_coords(window, 0, 0)
+        return title, (origin.x, origin.y, origin.x + geometry.width, origin.y + geometry.height)
+
+    def close(self):
+        try:
+            self._display.close()
+        except Exception as e:
+            logger.debug(f"XTest display close failed: {e}")
+
+
+# pyautogui key names -> Windows virtual-key codes
+WIN32_VK_CODES = {
+    'right': 0x27, 'left': 0x25, 'up': 0x26, 'down': 0x28,
+    'home': 0x24, 'end': 0x23, 'pageup': 0x21, 'pagedown': 0x22,
+    'insert': 0x2D, 'delete': 0x2E,
+    'esc': 0x1B, 'escape': 0x1B, 'enter': 0x0D, 'return': 0x0D,
+    'space': 0x20, 'tab': 0x09, 'backspace': 0x08,
+    'ctrl': 0x11, 'alt': 0x12, 'shift': 0x10,
+    'volumemute': 0xAD, 'volumedown': 0xAE, 'volumeup': 0xAF,
+}
+WIN32_VK_CODES.update({f'f{number}': 0x6F + number for number in range(1, 25)})
+WIN32_EXTENDED_KEYS = {0x21, 0x22, 0x23, 0x24, 0x25, 0x26, 0x27, 0x28, 0x2D, 0x2E}
+
+_win32_types = None
+
+
+def _load_win32_types():
+    """Build the SendInput structures once (ctypes.wintypes is only meaningful on Windows)"""
+    global _win32_types
+    if _win32_types is not None:
+        return _win32_types
+
+    import ctypes
+    from ctypes import wintypes
+
+    class MOUSEINPUT(ctypes.Structure):
+        _fields_ = [('dx', wintypes.LONG), ('dy', wintypes.LONG), ('mouseData', wintypes.DWORD),
+                    ('dwFlags', wintypes.DWORD), ('time', wintypes.DWORD), ('dwExtraInfo', ctypes.c_size_t)]
+
+    class KEYBDINPUT(ctypes.Structure):
+        _fields_ = [('wVk', wintypes.WORD), ('wScan', wintypes.WORD), ('dwFlags', wintypes.DWORD),
+                    ('time', wintypes.DWORD), ('dwExtraInfo', ctypes.c_size_t)]
+
+    class HARDWAREINPUT(ctypes.Structure):
+        _fields_ = [('uMsg', wintypes.DWORD), ('wParamL', wintypes.WORD), ('wParamH', wintypes.WORD)]
+
+    class INPUTUNION(ctypes.Union):
+        _fields_ = [('mi', MOUSEINPUT), ('ki', KEYBDINPUT), ('hi', HARDWAREINPUT)]
+
+    class INPUT(ctypes.Structure):
+        _fields_ = [('type', wintypes.DWORD), ('union', INPUTUNION)]
+
+    _win32_types = (ctypes, INPUT, KEYBDINPUT, MOUSEINPUT)
+    return _win32_types
+
+
+class SendInputBackend(InputBackend):
+    """Windows backend - SendInput/SetCursorPos through ctypes, no per-call Python wrappers"""
+
+    name = 'sendinput'
+
+    INPUT_MOUSE = 0
+    INPUT_KEYBOARD = 1
+    KEYEVENTF_EXTENDEDKEY = 0x0001
+    KEYEVENTF_KEYUP = 0x0002
+    MOUSEEVENTF_LEFTDOWN = 0x0002
+    MOUSEEVENTF_LEFTUP = 0x0004
+
+    def __init__(self):
+        super().__init__()
+        if sys.platform != 'win32':
+            raise OSError("SendInput is only available on Windows")
+        self._ctypes, self._INPUT, self._KEYBDINPUT, self._MOUSEINPUT = _load_win32_types()
+        self._user32 = self._ctypes.windll.user32
+        try:
+            # Same as pyautogui: coordinates in physical pixels on scaled displays
+            self._user32.SetProcessDPIAware()
+        except Exception as e:
+            logger.debug(f"SetProcessDPIAware failed: {e}")
+
+    def _vk_code(self, key):
+        vk_code = WIN32_VK_CODES.get(key.lower())
+        if vk_code is None:
+            if len(key) != 1:
+                raise ValueError(f"Unknown key: {key}")
+            vk_code = self._user32.VkKeyScanW(ord(key)) & 0xFF
+        return vk_code
+
+    def _key_input(self, vk_code, key_up):
+        flags = self.KEYEVENTF_KEYUP if key_up else 0
+        if vk_code in WIN32_EXTENDED_KEYS:
+            flags |= self.KEYEVENTF_EXTENDEDKEY
+        event = self._INPUT(type=self.INPUT_KEYBOARD)
+        event.union.ki = self._KEYBDINPUT(wVk=vk_code, wScan=0, dwFlags=flags, time=0, dwExtraInfo=0)
+        return event
+
+    def _send(self, events):
+        """Submit all events in one SendInput call so they cannot interleave with real input"""
+        array = (self._INPUT * len(events))(*events)
+        sent = self._user32.SendInput(len(events), array, self._ctypes.sizeof(self._INPUT))
+        if sent != len(events):
+            raise OSError(f"SendInput injected {sent} of {len(events)} events")
+
+    def _press(self, key):
+        vk_code = self._vk_code(key)
+        self._send([self._key_input(vk_code, False), self._key_input(vk_code, True)])
+
+    def _hotkey(self, *keys):
+        vk_codes = [self._vk_code(key) for key in keys]
+        events = [self._key_input(vk_code, False) for vk_code in vk_codes]
+        events += [self._key_input(vk_code, True) for vk_code in reversed(vk_codes)]
+        self._send(events)
+
+    def _move_to(self, x, y):
+        self._user32.SetCursorPos(int(x), int(y))
+
+    def _click(self, x, y):
+        self._user32.SetCursorPos(int(x), int(y))
+        events = []
+        for flags in (self.MOUSEEVENTF_LEFTDOWN, self.MOUSEEVENTF_LEFTUP):
+            event = self._INPUT(type=self.INPUT_MOUSE)
+            event.union.mi = self._MOUSEINPUT(dx=0, dy=0, mouseData=0, dwFlags=flags, time=0, dwExtraInfo=0)
+            events.append(event)
+        self._send(events)
+
+    def screen_size(self):
+        return self._user32.GetSystemMetrics(0), self._user32.GetSystemMetrics(1)
+
+    def active_window(self):
+        window = self._user32.GetForegroundWindow()
+        if not window:
+            return None
+        length = self._user32.GetWindowTextLengthW(window)
+        buffer = self._ctypes.create_unicode_buffer(length + 1)
+        self._user32.GetWindowTextW(window, buffer, length + 1)
+        rect = self._ctypes.wintypes.RECT()
+        if not self._user32.GetWindowRect(window, self._ctypes.byref(rect)):
+            return buffer.value, None
+        return buffer.value, (rect.left, rect.top, rect.right, rect.bottom)
+
+
+class NullInputBackend(InputBackend):
+    """Headless backend - records every event instead of injecting it (tests and benchmarks)"""
+
+    name = 'null'
+
+    def __init__(self, screen_size=(1920, 1080), window_title=None, window_bounds=None, max_events=10000):
+        super().__init__()
+        self._screen_size = screen_size
+        self.window_title = window_title
+        self.window_bounds = window_bounds  # (left, top, right, bottom) reported for the focused window
+        self.events = deque(maxlen=max_events)  # (call, args, perf_counter time)
+
+    def _record(self, call, *args):
+        self.events.append((call, args, time.perf_counter()))
+
+    def _press(self, key):
+        self._record('press', key)
+
+    def _hotkey(self, *keys):
+        self._record('hotkey', *keys)
+
+    def _move_to(self, x, y):
+        self._record('move_to', x, y)
+
+    def _click(self, x, y):
+        self._record('click', x, y)
+
+    def screen_size(self):
+        return self._screen_size
+
+    def active_window(self):
+        if self.window_title is None:
+            return None
+        return self.window_title, self.window_bounds
+
+
+INPUT_BACKENDS = {
+    'pyautogui': PyAutoGUIInputBackend,
+    'xtest': XTestInputBackend,
+    'sendinput': SendInputBackend,
+    'null': NullInputBackend,
+}
+
+
+def create_input_backend(name='auto', **options):
+    """Create an input backend by name ('auto' prefers the native backend and falls back to pyautogui)"""
+    if name == 'auto':
+        native = 'sendinput' if sys.platform == 'win32' else 'xtest' if sys.platform.startswith('linux') else None
+        if native is not None:
+            try:
+                return INPUT_BACKENDS[native](**options)
+            except Exception as e:
+                logger.warning(f"⚠️ {native} input unavailable ({e}) - falling back to pyautogui")
+        return PyAutoGUIInputBackend()
+
+    if name not in INPUT_BACKENDS:
+        raise ValueError(f"Unknown input backend: {name} (choose from {', '.join(INPUT_BACKENDS)})")
+    return INPUT_BACKENDS[name](**options)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Input Injection Worker for Slide Controller
+Runs every input injection on one dedicated thread with an ordered priority queue,
+so slow injections (window lookups, hotkeys, test sequences) never block the
+asyncio loop that serves heartbeats and frames.
+"""
+
+import time
+import queue
+import asyncio
+import logging
+import threading
+import itertools
+
+logger = logging.getLogger(__name__)
+
+# Lower runs first; commands of the same priority keep their submission order
+PRIORITY_NAVIGATION = 0  # Slide changes, keystrokes, start/end - what the audience waits for
+PRIORITY_DEFAULT = 1
+PRIORITY_POINTER = 2  # Laser pointer moves/clicks - a late move is better than a late slide
+
+_STOP = object()
+
+
+class InputJob:
+    """One queued injection and the asyncio future waiting for it"""
+
+    def __init__(self, func, args, name, loop, future, coalesce_key=None):
+        self.func = func
+        self.args = args
+        self.name = name
+        self.loop = loop
+        self.future = future
+        self.coalesce_key = coalesce_key
+        self.enqueued_at = time.perf_counter()
+        self.coalesced = 0
+
+
+class InputInjectionWorker:
+    """Single thread draining a priority queue of input injections"""
+
+    def __init__(self):
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._pending = {}  # coalesce_key -> queued InputJob not started yet
+        self._lock = threading.Lock()
+        self._thread = None
+        self.command_stats = {}  # name -> [count, total_wait_ms, total_run_ms, max_run_ms]
+        self.jobs_coalesced = 0
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='input-injection', daemon=True)
+            self._thread.start()
+
+    def submit(self, func, *args, name=None, priority=PRIORITY_DEFAULT, coalesce_key=None):
+        """Queue func(*args) on the worker and return an asyncio future for its result
+
+        With a coalesce_key, a job with the same key that has not started yet is
+        updated to the new arguments instead of queueing another one (pointer moves).
+        """
+        loop = asyncio.get_running_loop()
+        name = name or getattr(func, '__name__', 'input')
+
+        with self._lock:
+            if coalesce_key is not None:
+                job = self._pending.get(coalesce_key)
+                if job is not None:
+                    job.args = args
+                    job.coalesced += 1
+                    self.jobs_coalesced += 1
+                    return job.future
+
+            job = InputJob(func, args, name, loop, loop.create_future(), coalesce_key)
+            if coalesce_key is not None:
+                self._pending[coalesce_key] = job
+            self._ensure_started()
+            self._queue.put((priority, next(self._sequence), job))
+        return job.future
+
+    async def run(self, func, *args, name=None, priority=PRIORITY_DEFAULT, coalesce_key=None):
+        """Run func(*args) on the worker and wait for it without blocking the loop"""
+        return await self.submit(func, *args, name=name, priority=priority, coalesce_key=coalesce_key)
+
+    def _run(self):
+        while True:
+            _, _, job = self._queue.get()
+            if isinstance(job, tuple) and job[0] is _STOP:
+                self._stop(job[1])
+                return
+
+            with self._lock:
+                if job.coalesce_key is not None and self._pending.get(job.coalesce_key) is job:
+                    del self._pending[job.coalesce_key]
+                args = job.args
+
+            started = time.perf_counter()
+            try:
+                result, error = job.func(*args), None
+            except Exception as e:
+                result, error = None, e
+            finished = time.perf_counter()
+
+            self._record(job.name, (started - job.enqueued_at) * 1000.0, (finished - started) * 1000.0)
+            try:
+                job.loop.call_soon_threadsafe(self._resolve, job.future, result, error)
+            except RuntimeError:
+                pass  # Loop already closed (server stopped) - nobody is waiting
+
+    @staticmethod
+    def _resolve(future, result, error):
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _record(self, name, wait_ms, run_ms):
+        stats = self.command_stats.get(name)
+        if stats is None:
+            stats = self.command_stats[name] = [0, 0.0, 0.0, 0.0]
+        stats[0] += 1
+        stats[1] += wait_ms
+        stats[2] += run_ms
+        stats[3] = max(stats[3], run_ms)
+        if run_ms > 100:
+            logger.debug("🐢 Input '%s' took %.0f ms on the injection thread", name, run_ms)
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    @staticmethod
+    def _stop(on_stop):
+        if on_stop is None:
+            return
+        try:
+            on_stop()
+        except Exception as e:
+            logger.error(f"❌ Error stopping input worker: {e}")
+
+    def close(self, on_stop=None):
+        """Stop the worker after the commands already queued - on_stop() runs last, on the worker thread"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put((PRIORITY_POINTER + 1, next(self._sequence), (_STOP, on_stop)))
+            self._thread = None
+        else:
+            self._stop(on_stop)
+
+    def get_stats(self):
+        """Return per-command queue wait and injection time"""
+        commands = {}
+        for name, (count, wait_ms, run_ms, max_run_ms) in self.command_stats.items():
+            commands[name] = {
+                'count': count,
+                'avg_wait_ms': round(wait_ms / count, 3),
+                'avg_run_ms': round(run_ms / count, 3),
+                'max_run_ms': round(max_run_ms, 3),
+            }
+        return {
+            'queue_depth': self.queue_depth,
+            'coalesced': self.jobs_coalesced,
+            'commands': commands,
+        }
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+End-to-end Latency Tracing for Slide Controller Commands
+Stamps each command from the moment its message arrives to the moment the first
+frame showing its effect is written to a phone's socket, and keeps p50/p95/p99
+per command type and stage. LoopLagMonitor measures how long the event loop itself
+was stalled.
+"""
+
+import time
+import asyncio
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Stages in order; each is recorded as ms since 'receive'
+STAGES = ('receive', 'dispatch', 'inject', 'capture', 'encode', 'send')
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class CommandTrace:
+    """Stage timestamps (perf_counter) of one command"""
+
+    def __init__(self, command, command_id, received_at):
+        self.command = command
+        self.command_id = command_id
+        self.stamps = {'receive': received_at}
+        self.frame_id = None  # First frame grabbed after the input was injected
+
+    def stamp(self, stage, at=None):
+        self.stamps[stage] = time.perf_counter() if at is None else at
+
+    def stage_ms(self):
+        received = self.stamps['receive']
+        return {stage: (self.stamps[stage] - received) * 1000.0 for stage in STAGES if stage in self.stamps}
+
+
+class LatencyTracer:
+    """Collects command traces and keeps a sliding window of samples per command and stage"""
+
+    def __init__(self, window=1000, frame_timeout=2.0):
+        self.window = window  # Samples kept per (command, stage)
+        self.frame_timeout = frame_timeout  # Give up waiting for a visible change after this long
+        self.samples = {}  # command -> {stage: deque of ms since receive}
+        self._awaiting_capture = []  # Traces injected, waiting for the next grab
+        self._awaiting_send = {}  # frame_id -> [traces] captured, waiting for the first socket write
+        self.traces_completed = 0
+        self.traces_without_frame = 0
+        self._last_logged = 0
+
+    def begin(self, command, command_id=None, received_at=None):
+        """Start a trace when a command message arrives"""
+        return CommandTrace(command, command_id, time.perf_counter() if received_at is None else received_at)
+
+    def expect_frame(self, trace):
+        """Keep the trace open until a frame grabbed after its 'inject' stamp reaches a client"""
+        self._awaiting_capture.append(trace)
+
+    def finish(self, trace):
+        """Record every stage the trace reached"""
+        samples = self.samples.get(trace.command)
+        if samples is None:
+            samples = self.samples[trace.command] = {}
+        for stage, elapsed_ms in trace.stage_ms().items():
+            if stage == 'receive':
+                continue
+            stage_samples = samples.get(stage)
+            if stage_samples is None:
+                stage_samples = samples[stage] = deque(maxlen=self.window)
+            stage_samples.append(elapsed_ms)
+        self.traces_completed += 1
+
+    def on_frames_captured(self, frames):
+        """Match waiting traces to the first new frame grabbed after their input"""
+        if not self._awaiting_capture:
+            return
+        for frame in frames:
+            if frame is None or not getattr(frame, 'grab_started', 0.0):
+                continue
+            still_waiting = []
+            for trace in self._awaiting_capture:
+                if frame.grab_started >= trace.stamps.get('inject', trace.stamps['receive']):
+                    trace.frame_id = frame.frame_id
+                    trace.stamp('capture', frame.grab_done)
+                    trace.stamp('encode', frame.encode_done)
+                    self._awaiting_send.setdefault(frame.frame_id, []).append(trace)
+                else:
+                    still_waiting.append(trace)
+            self._awaiting_capture = still_waiting
+        self.expire()
+
+    def on_frame_sent(self, frame_id, sent_at):
+        """A frame was written to a socket (broadcaster callback) - completes its traces"""
+        traces = self._awaiting_send.pop(frame_id, None)
+        if not traces:
+            return
+        for trace in traces:
+            trace.stamp('send', sent_at)
+            self.finish(trace)
+
+    def expire(self, now=None):
+        """Record traces that never produced a visible change (or whose frame was replaced)"""
+        now = time.perf_counter() if now is None else now
+        deadline = now - self.frame_timeout
+
+        waiting = []
+        for trace in self._awaiting_capture:
+            if trace.stamps['receive'] < deadline:
+                self.traces_without_frame += 1
+                self.finish(trace)
+            else:
+                waiting.append(trace)
+        self._awaiting_capture = waiting
+
+        for frame_id in list(self._awaiting_send):
+            traces = self._awaiting_send[frame_id]
+            if traces[0].stamps['receive'] < deadline:
+                # Frame was replaced by a newer one in every queue before it was sent
+                del self._awaiting_send[frame_id]
+                for trace in traces:
+                    self.traces_without_frame += 1
+                    self.finish(trace)
+
+    def get_stats(self):
+        """Return count and p50/p95/p99 ms per command and stage"""
+        self.expire()
+        commands = {}
+        for command, stages in self.samples.items():
+            commands[command] = {
+                stage: {
+                    'count': len(stage_samples),
+                    'p50_ms': round(percentile(stage_samples, 0.50), 1),
+                    'p95_ms': round(percentile(stage_samples, 0.95), 1),
+                    'p99_ms': round(percentile(stage_samples, 0.99), 1),
+                }
+                for stage, stage_samples in stages.items()
+            }
+        return {
+            'traces': self.traces_completed,
+            'without_frame': self.traces_without_frame,
+            'pending': len(self._awaiting_capture) + sum(len(traces) for traces in self._awaiting_send.values()),
+            'commands': commands,
+        }
+
+    def summary_line(self):
+        """One log line: p50/p95/p99 of each command's last reached stage, or None if nothing new"""
+        self.expire()
+        if self.traces_completed == self._last_logged:
+            return None
+        self._last_logged = self.traces_completed
+
+        parts = []
+        for command, stages in sorted(self.samples.items()):
+            stage = next(stage for stage in reversed(STAGES) if stage in stages)
+            stage_samples = stages[stage]
+            parts.append(
+                f"{command}→{stage} n={len(stage_samples)} "
+                f"p50={percentile(stage_samples, 0.50):.0f} p95={percentile(stage_samples, 0.95):.0f} "
+                f"p99={percentile(stage_samples, 0.99):.0f}ms"
+            )
+        return " | ".join(parts)
+
+
+class LoopLagMonitor:
+    """Event loop stall meter - a callback due every interval, lag = how late it actually ran
+
+    A stall shorter than the interval may fall between two ticks and be missed, so the
+    numbers are a lower bound on how long the loop was blocked.
+    """
+
+    def __init__(self, interval=0.02, max_samples=512):
+        self.interval = interval
+        self._samples = deque(maxlen=max_samples)  # (tick time, lag ms), perf_counter
+        self._loop = None
+        self._handle = None
+        self._due = 0.0
+        self.ticks = 0
+        self.max_lag_ms = 0.0
+
+    @property
+    def is_running(self):
+        return self._handle is not None
+
+    def start(self):
+        """Start ticking on the running loop (no-op if already running)"""
+        if self._handle is None:
+            self._loop = asyncio.get_running_loop()
+            self._schedule()
+
+    def stop(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _schedule(self):
+        self._due = time.perf_counter() + self.interval
+        self._handle = self._loop.call_later(self.interval, self._tick)
+
+    def _tick(self):
+        now = time.perf_counter()
+        lag_ms = max(0.0, (now - self._due) * 1000.0)
+        self._samples.append((now, lag_ms))
+        self.ticks += 1
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        self._schedule()
+
+    def max_lag_since(self, started):
+        """Worst lag of the ticks that ran after perf_counter time started"""
+        return max((lag_ms for at, lag_ms in self._samples if at >= started), default=0.0)
+
+    def get_stats(self):
+        """Lag percentiles over the recent ticks"""
+        lags = [lag_ms for _, lag_ms in self._samples]
+        if not lags:
+            return {'ticks': self.ticks}
+        return {
+            'ticks': self.ticks,
+            'interval_ms': round(self.interval * 1000.0, 1),
+            'p50_ms': round(percentile(lags, 0.50), 2),
+            'p99_ms': round(percentile(lags, 0.99), 2),
+            'max_ms': round(self.max_lag_ms, 2),
+        }
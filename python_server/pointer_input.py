@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Pointer Input Pipeline for Laser Pointer Moves
+The phone sends laser_pointer_move on every touch update. Moves are coalesced to
+the newest position once per display refresh tick, never acknowledged one by one
+and never broadcast as status updates.
+"""
+
+import time
+import asyncio
+import logging
+
+from broadcaster import MESSAGE_POINTER_ACK
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TICK_INTERVAL = 1.0 / 60.0  # One move per 60 Hz display refresh
+DEFAULT_ACK_INTERVAL = 0.25  # Batched pointer_ack at most 4x per second (clients opt in)
+IDLE_TICKS_BEFORE_SLEEP = 30  # Ticks without a move before the flush task exits
+
+
+class PointerInputCoalescer:
+    """Keeps only the newest pointer position and applies it once per tick"""
+
+    def __init__(self, apply_move, broadcaster=None, tick_interval=DEFAULT_TICK_INTERVAL,
+                 ack_interval=DEFAULT_ACK_INTERVAL):
+        self.apply_move = apply_move  # Called with (x_percent, y_percent)
+        self.broadcaster = broadcaster
+        self.tick_interval = tick_interval
+        self.ack_interval = ack_interval
+
+        self._pending = None  # Newest (x_percent, y_percent) not applied yet
+        self._flush_task = None
+        self._ack_clients = {}  # websocket -> [moves since last ack, last client timestamp, last ack time]
+
+        # Counters
+        self.moves_received = 0
+        self.moves_applied = 0
+        self.acks_sent = 0
+        self.total_apply_ms = 0.0
+
+    def enable_acks(self, websocket, enabled=True):
+        """Client asked for batched pointer_ack messages in its hello"""
+        if enabled:
+            self._ack_clients.setdefault(websocket, [0, None, 0.0])
+        else:
+            self._ack_clients.pop(websocket, None)
+
+    def forget_client(self, websocket):
+        self._ack_clients.pop(websocket, None)
+
+    def submit(self, websocket, x_percent, y_percent, timestamp=None):
+        """Record a move - returns immediately, the position is applied on the next tick"""
+        self.moves_received += 1
+        self._pending = (x_percent, y_percent)
+
+        ack_state = self._ack_clients.get(websocket)
+        if ack_state is not None:
+            ack_state[0] += 1
+            ack_state[1] = timestamp
+
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    def _apply_pending(self):
+        x_percent, y_percent = self._pending
+        self._pending = None
+        start = time.perf_counter()
+        try:
+            self.apply_move(x_percent, y_percent)
+        except Exception as e:
+            logger.error(f"❌ Error applying pointer move: {e}")
+        self.total_apply_ms += (time.perf_counter() - start) * 1000.0
+        self.moves_applied += 1
+
+    def _send_acks(self, now):
+        """One pointer_ack per interval covering every move since the previous one"""
+        if self.broadcaster is None:
+            return
+        for websocket, ack_state in self._ack_clients.items():
+            count, timestamp, last_ack = ack_state
+            if count and now - last_ack >= self.ack_interval:
+                ack = {'type': 'pointer_ack', 'count': count, 'timestamp': timestamp}
+                self.broadcaster.send(websocket, ack, MESSAGE_POINTER_ACK)
+                ack_state[0] = 0
+                ack_state[2] = now
+                self.acks_sent += 1
+
+    async def _flush_loop(self):
+        """Apply the newest position once per tick; exit after a while without moves"""
+        idle_ticks = 0
+        try:
+            while idle_ticks < IDLE_TICKS_BEFORE_SLEEP:
+                if self._pending is not None:
+                    self._apply_pending()
+                    idle_ticks = 0
+                else:
+                    idle_ticks += 1
+                self._send_acks(time.perf_counter())
+                await asyncio.sleep(self.tick_interval)
+        finally:
+            # Flush acks for the tail of the gesture - also when cancelled, which still propagates
+            for ack_state in self._ack_clients.values():
+                ack_state[2] = 0.0
+            self._send_acks(time.perf_counter())
+
+    def close(self):
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+
+    def get_stats(self):
+        """Return how many moves were received, applied and coalesced away"""
+        applied = self.moves_applied
+        return {
+            'received': self.moves_received,
+            'applied': applied,
+            'coalesced': self.moves_received - applied,
+            'acks_sent': self.acks_sent,
+            'avg_apply_ms': round(self.total_apply_ms / applied, 3) if applied else 0.0,
+        }
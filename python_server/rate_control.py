@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Adaptive Rate Control for Live Slide Streaming
+Picks frame rate, JPEG quality and scale per client from measured encode time,
+send-queue backlog and round-trip time, against a configurable latency budget.
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Stream levels from most conservative to richest: (fps, jpeg quality, scale)
+STREAM_LEVELS = [
+    (1.0, 40, 0.3),
+    (2.0, 50, 0.4),
+    (3.3, 60, 0.5),
+    (3.3, 70, 0.6),   # The old fixed settings - every client starts here
+    (5.0, 75, 0.7),
+    (8.0, 80, 0.8),
+]
+DEFAULT_LEVEL = 3
+
+DEFAULT_LATENCY_BUDGET_MS = 250.0
+
+
+class AdaptiveRateController:
+    """Per-client AIMD-style controller: back off at once when over budget, ramp up slowly"""
+
+    def __init__(self, latency_budget_ms=DEFAULT_LATENCY_BUDGET_MS, levels=STREAM_LEVELS,
+                 start_level=DEFAULT_LEVEL, ramp_up_after=5, smoothing=0.3, max_backlog=1):
+        self.latency_budget_ms = latency_budget_ms
+        self.levels = levels
+        self.level = min(start_level, len(levels) - 1)
+        self.ramp_up_after = ramp_up_after  # Consecutive good frames needed before stepping up
+        self.smoothing = smoothing  # EWMA weight of the newest sample
+        self.max_backlog = max_backlog  # Queued/replaced frames tolerated before backing off
+
+        self.rtt_ms = 0.0
+        self.encode_ms = 0.0
+        self.send_ms = 0.0
+        self.backlog = 0
+        self.next_frame_at = 0.0
+        self.level_changes = 0
+        self._good_streak = 0
+        self._last_dropped = 0
+
+    @property
+    def fps(self):
+        return self.levels[self.level][0]
+
+    @property
+    def quality(self):
+        return self.levels[self.level][1]
+
+    @property
+    def scale(self):
+        return self.levels[self.level][2]
+
+    @property
+    def frame_interval(self):
+        return 1.0 / self.fps
+
+    def _smooth(self, current, sample):
+        if current == 0.0:
+            return sample
+        return current + self.smoothing * (sample - current)
+
+    def observe_rtt(self, rtt_ms):
+        """Round trip from heartbeat/pong (or the websocket keepalive ping)"""
+        if rtt_ms and rtt_ms > 0:
+            self.rtt_ms = self._smooth(self.rtt_ms, rtt_ms)
+
+    def observe_encode(self, encode_ms):
+        """Time the worker spent producing this client's rendition"""
+        if encode_ms > 0:
+            self.encode_ms = self._smooth(self.encode_ms, encode_ms)
+
+    def observe_send(self, queue_depth, send_ms, frames_dropped):
+        """Send-queue state of this client's channel (see broadcaster.py)"""
+        self.backlog = queue_depth + (frames_dropped - self._last_dropped)
+        self._last_dropped = frames_dropped
+        if send_ms > 0:
+            self.send_ms = self._smooth(self.send_ms, send_ms)
+
+    def estimated_latency_ms(self):
+        """Capture-to-screen estimate: encode + queue/send + half the round trip"""
+        return self.encode_ms + self.send_ms + self.rtt_ms / 2.0
+
+    def update(self):
+        """Move one level down when over budget or backlogged, one level up after a good streak"""
+        latency = self.estimated_latency_ms()
+        congested = self.backlog > self.max_backlog or latency > self.latency_budget_ms
+
+        if congested:
+            self._good_streak = 0
+            if self.level > 0:
+                self._set_level(self.level - 1, f"latency {latency:.0f} ms, backlog {self.backlog}")
+            return
+
+        self._good_streak += 1
+        if self._good_streak < self.ramp_up_after or self.level >= len(self.levels) - 1:
+            return
+
+        # Only ramp up with headroom: the next level must fit the budget and its frame interval
+        next_fps = self.levels[self.level + 1][0]
+        if latency < 0.6 * self.latency_budget_ms and self.encode_ms < 0.5 * 1000.0 / next_fps:
+            self._good_streak = 0
+            self._set_level(self.level + 1, f"latency {latency:.0f} ms")
+
+    def _set_level(self, level, reason):
+        self.level = level
+        self.level_changes += 1
+        logger.info(f"🎚️ Stream level {level}: {self.fps} fps, quality {self.quality}, scale {self.scale} ({reason})")
+
+    def is_due(self, now):
+        return now >= self.next_frame_at
+
+    def mark_sent(self, now):
+        self.next_frame_at = now + self.frame_interval
+
+    def get_stats(self):
+        return {
+            'level': self.level,
+            'fps': self.fps,
+            'quality': self.quality,
+            'scale': self.scale,
+            'rtt_ms': round(self.rtt_ms, 1),
+            'encode_ms': round(self.encode_ms, 1),
+            'send_ms': round(self.send_ms, 1),
+            'backlog': self.backlog,
+            'estimated_latency_ms': round(self.estimated_latency_ms(), 1),
+            'level_changes': self.level_changes,
+        }
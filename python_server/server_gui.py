@@ -3,17 +3,15 @@ PresenterPro Server - Beautiful GUI Application
 A modern, premium GUI for the PresenterPro server with QR code generation
 """
 
+import startup_profiler
+startup_profiler.start_if_requested()  # Before the imports it should time
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox
-import qrcode
-from PIL import Image, ImageTk
 import socket
 import threading
-import asyncio
-from slide_controller_server import SlideControllerServer
 import sys
-from io import BytesIO
+from server_thread import ServerThread
 
 # Set appearance mode and color theme
 ctk.set_appearance_mode("dark")
@@ -28,12 +26,11 @@ class PresenterProServerGUI:
         self.root.resizable(True, True)
         self.root.minsize(600, 900)
         
-        # Server state
-        self.server = None
-        self.server_thread = None
+        # Server state - the server runs on its own loop thread (see server_thread.py)
+        self.server = ServerThread()
+        self.server_thread = None  # Thread waiting for the server to start listening
         self.is_running = False
         self.local_ip = self.get_local_ip()
-        self.server_task = None
         
         # Setup UI
         self.setup_ui()
@@ -234,7 +231,7 @@ class PresenterProServerGUI:
         self.qr_label.pack(expand=True, pady=10)
         
         # Generate QR code
-        self.generate_qr_code()
+        self.root.after(50, self.generate_qr_code)  # Let the window paint first
         
         qr_instruction = ctk.CTkLabel(
             qr_frame,
@@ -297,6 +294,10 @@ class PresenterProServerGUI:
     def generate_qr_code(self):
         """Generate QR code for the server IP"""
         try:
+            # qrcode and PIL are only needed here - imported after the window is up
+            import qrcode
+            from PIL import Image, ImageTk
+            
             # Create QR code with better settings
             qr = qrcode.QRCode(
                 version=1,
@@ -398,14 +399,11 @@ class PresenterProServerGUI:
             )
             self.status_icon.configure(text="🔴")
             
-            # Stop the server if it exists
-            if self.server:
-                try:
-                    # Try to stop the server gracefully
-                    if hasattr(self.server, 'stop'):
-                        self.server.stop()
-                except Exception as e:
-                    print(f"Error stopping server: {e}")
+            # Closes every connection, ends streaming and frees the port before returning
+            if self.server_thread is not None:
+                self.server_thread.join()  # Still starting - let it finish first
+                self.server_thread = None
+            self.server.stop()
             
             # Re-enable button
             self.start_btn.configure(state="normal")
@@ -418,29 +416,9 @@ class PresenterProServerGUI:
             self.start_btn.configure(state="normal")
     
     def run_server(self):
-        """Run the WebSocket server"""
+        """Start the WebSocket server and wait until it is listening (off the UI thread)"""
         try:
-            # Create new event loop for this thread
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            # Create and run server
-            self.server = SlideControllerServer()
-            
-            # Run server until stopped
-            while self.is_running:
-                try:
-                    loop.run_until_complete(self.server.start_server())
-                    break
-                except Exception as e:
-                    if self.is_running:
-                        print(f"Server error: {e}")
-                        # Wait a bit before retrying
-                        import time
-                        time.sleep(1)
-                    else:
-                        break
-            
+            self.server.start()
         except Exception as e:
             print(f"Server error: {e}")
             self.is_running = False
@@ -471,8 +449,8 @@ class PresenterProServerGUI:
         """Handle window closing"""
         if self.is_running:
             if messagebox.askokcancel("Quit", "Server is still running. Do you want to stop it and quit?"):
-                self.stop_server()
-                self.root.after(1000, self.root.destroy)  # Give time for server to stop
+                self.stop_server()  # Returns once the server is fully stopped
+                self.root.destroy()
         else:
             self.root.destroy()
 
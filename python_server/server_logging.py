@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Logging Setup for Slide Controller Server
+Log records are handed to a queue and written by a background thread, so a slow
+console never blocks the event loop. Levels can be set per category (network,
+input, capture), and per-message or per-frame log lines go through LogThrottle,
+which lets one line through per interval and counts the rest.
+"""
+
+import time
+import queue
+import atexit
+import logging
+import logging.handlers
+
+logger = logging.getLogger(__name__)
+
+# Category -> modules (logger names) it covers
+CATEGORIES = {
+    'network': (
+        'slide_controller_server', 'broadcaster', 'message_codec', 'command_registry',
+        'server_thread', 'latency_tracer', 'startup_profiler',
+    ),
+    'input': ('input_worker', 'input_backends', 'pointer_input'),
+    'capture': (
+        'slide_capture_extension', 'capture_backends', 'capture_scheduler', 'image_encoders',
+        'image_scaler', 'rate_control', 'slide_cache',
+    ),
+}
+
+_listener = None
+_handler = None
+
+
+class LogThrottle:
+    """At most one record per interval for a hot log line - the next one that gets through says how many were skipped"""
+
+    def __init__(self, logger, interval=1.0):
+        self.logger = logger
+        self.interval = interval
+        self.suppressed = 0
+        self._next_at = 0.0
+
+    def log(self, level, msg, *args):
+        """Log msg % args unless the level is off or the last line was less than interval ago"""
+        return self._log(level, msg, args)
+
+    def info(self, msg, *args):
+        return self._log(logging.INFO, msg, args)
+
+    def debug(self, msg, *args):
+        return self._log(logging.DEBUG, msg, args)
+
+    def _log(self, level, msg, args):
+        # Level check first - a disabled line costs one call and no string work
+        if not self.logger.isEnabledFor(level):
+            return False
+        now = time.monotonic()
+        if now < self._next_at:
+            self.suppressed += 1
+            return False
+        self._next_at = now + self.interval
+        if self.suppressed:
+            msg += " (+%d similar)"
+            args += (self.suppressed,)
+            self.suppressed = 0
+        self.logger.log(level, msg, *args, stacklevel=3)
+        return True
+
+
+def set_category_level(category, level):
+    """Set the level of every module in a category ('network', 'input' or 'capture')"""
+    if category not in CATEGORIES:
+        raise ValueError(f"Unknown log category '{category}' - expected one of {', '.join(CATEGORIES)}")
+    for name in CATEGORIES[category]:
+        logging.getLogger(name).setLevel(level)
+
+
+def parse_category_levels(specs):
+    """['capture=WARNING', 'input=DEBUG'] -> {'capture': 'WARNING', 'input': 'DEBUG'}"""
+    levels = {}
+    for spec in specs or ():
+        category, _, level = spec.partition('=')
+        level = level.strip().upper()
+        if not isinstance(logging.getLevelName(level), int):
+            raise ValueError(f"Invalid log level in '{spec}'")
+        levels[category.strip()] = level
+    return levels
+
+
+def setup_logging(level=logging.INFO, category_levels=None):
+    """Log to stderr through a queue and a writer thread (left alone if logging is already configured elsewhere)"""
+    global _listener, _handler
+    root = logging.getLogger()
+    if _listener is None and not root.handlers:
+        log_queue = queue.SimpleQueue()
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+        _listener = logging.handlers.QueueListener(log_queue, stream_handler)
+        _listener.start()
+        _handler = logging.handlers.QueueHandler(log_queue)
+        root.addHandler(_handler)
+        atexit.register(stop_logging)
+
+    if _listener is not None:
+        root.setLevel(level)
+    for category, category_level in (category_levels or {}).items():
+        set_category_level(category, category_level)
+    return _listener
+
+
+def stop_logging():
+    """Write out everything still queued and stop the writer thread"""
+    global _listener, _handler
+    if _listener is not None:
+        logging.getLogger().removeHandler(_handler)
+        _listener.stop()
+        _listener = None
+        _handler = None
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Server Thread for the GUI
+Runs SlideControllerServer on its own event loop in a background thread and lets
+any other thread (the Tk UI) start it, stop it and send it commands. Stop releases
+the port and closes the loop, so a restart never leaks a loop, a socket or a
+streaming task.
+"""
+
+import asyncio
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class ServerThread:
+    """Thread-safe handle on a SlideControllerServer running in its own loop thread"""
+
+    def __init__(self, **server_options):
+        self.server_options = server_options  # SlideControllerServer arguments (host, port, backends)
+        self.server = None
+        self.loop = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+
+    @property
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, timeout=30.0):
+        """Start the server thread and block until the socket is listening (raises if it fails to start)"""
+        if self.is_running:
+            return
+        self._ready.clear()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name='slide-server', daemon=True)
+        self._thread.start()
+
+        if not self._ready.wait(timeout):
+            raise TimeoutError(f"Server did not start listening within {timeout:.0f}s")
+        if self._error is not None:
+            self._thread.join()
+            self._thread = None
+            raise self._error
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self.loop = loop
+        try:
+            loop.run_until_complete(self._serve())
+        finally:
+            # Whatever is still scheduled (fire-and-forget captures, sends) dies with the loop
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.run_until_complete(loop.shutdown_default_executor())
+            self.loop = None
+            loop.close()
+
+    async def _serve(self):
+        try:
+            # Imported here so the server stack loads on this thread, not the UI thread
+            from slide_controller_server import SlideControllerServer
+            self.server = SlideControllerServer(**self.server_options)
+            await self.server.start()
+        except Exception as e:
+            logger.error(f"❌ Server failed to start: {e}")
+            self._error = e
+            self._ready.set()
+            return
+        self._ready.set()
+        await self.server.wait_closed()
+
+    def stop(self, timeout=10.0):
+        """Stop the server and wait for its thread to exit - the port is free when this returns"""
+        thread = self._thread
+        if thread is None:
+            return
+        loop, server = self.loop, self.server
+        if loop is not None and server is not None and thread.is_alive():
+            try:
+                asyncio.run_coroutine_threadsafe(server.stop(), loop).result(timeout)
+            except Exception as e:
+                logger.error(f"❌ Error stopping server: {e}")
+        thread.join(timeout)
+        if thread.is_alive():
+            logger.warning("⚠️ Server thread did not exit in time")
+        self._thread = None
+        self.server = None
+
+    def run_command(self, command, params=None, timeout=10.0):
+        """Run a controller command (e.g. 'next') from another thread and return its response"""
+        loop, server = self.loop, self.server
+        if loop is None or server is None:
+            raise RuntimeError("Server is not running")
+        future = asyncio.run_coroutine_threadsafe(server.controller.handle_command(command, params), loop)
+        return future.result(timeout)
+
+    def get_stats(self, timeout=5.0):
+        """Server stats, read on the server's own loop"""
+        loop, server = self.loop, self.server
+        if loop is None or server is None:
+            raise RuntimeError("Server is not running")
+
+        async def read_stats():
+            return server.get_stats()
+        return asyncio.run_coroutine_threadsafe(read_stats(), loop).result(timeout)
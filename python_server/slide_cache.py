@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Slide Frame Cache for Slide Mirroring
+Keeps the last good frame of every slide (per rendition) in memory, evicting the
+least recently used slides beyond a byte budget, so navigation and newly connected
+phones get a picture instantly instead of waiting for the next capture. Also builds
+a thumbnail strip of the cached slides for a grid view.
+"""
+
+import io
+import base64
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_BYTES = 32 * 1024 * 1024
+THUMBNAIL_HEIGHT = 90
+
+
+def frame_bytes(frame):
+    """Encoded size of a full frame, or of a delta together with the keyframe it needs"""
+    base_frame = getattr(frame, 'base_frame', None)
+    if base_frame is None:
+        return len(frame.image_data)
+    return len(base_frame.image_data) + frame.byte_size
+
+
+def decode_frame(frame):
+    """Full RGB picture of a frame - a delta's tiles are pasted onto its keyframe"""
+    from PIL import Image
+    base_frame = getattr(frame, 'base_frame', None)
+    if base_frame is None:
+        return Image.open(io.BytesIO(frame.image_data))
+    image = Image.open(io.BytesIO(base_frame.image_data)).convert('RGB')
+    for x, y, _, _, data in frame.tiles:
+        image.paste(Image.open(io.BytesIO(data)).convert('RGB'), (x, y))
+    return image
+
+
+class SlideCacheEntry:
+    """Cached frames of one slide, one per rendition key, plus its thumbnail once built"""
+
+    def __init__(self):
+        self.frames = {}  # rendition key -> SlideFrame or DeltaFrame
+        self.thumbnail = None  # (frame_id, small RGB image), built on first thumbnail request
+
+    @property
+    def byte_size(self):
+        return sum(frame_bytes(frame) for frame in self.frames.values())
+
+
+class SlideFrameCache:
+    """LRU of slide number -> last good frames, bounded by total encoded bytes (thumbnails are not counted)"""
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES, thumbnail_height=THUMBNAIL_HEIGHT):
+        self.max_bytes = max_bytes
+        self.thumbnail_height = thumbnail_height
+        self._entries = OrderedDict()  # slide number -> SlideCacheEntry, least recently used first
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._strip = None  # (cache version, message) of the last thumbnail strip
+        self._version = 0
+
+    def put(self, slide_number, key, frame):
+        """Remember frame as the newest picture of slide_number for rendition key"""
+        entry = self._entries.get(slide_number)
+        if entry is None:
+            entry = self._entries[slide_number] = SlideCacheEntry()
+        else:
+            self.total_bytes -= entry.byte_size
+        entry.frames[key] = frame
+        self.total_bytes += entry.byte_size
+        self._entries.move_to_end(slide_number)
+        self._version += 1
+        self._evict()
+
+    def get(self, slide_number, key):
+        """Cached frame of slide_number for rendition key, or None"""
+        entry = self._entries.get(slide_number)
+        frame = entry.frames.get(key) if entry is not None else None
+        if frame is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(slide_number)
+        return frame
+
+    def _evict(self):
+        # Never evict the slide just stored, even if it alone is over budget
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            slide_number, entry = self._entries.popitem(last=False)
+            self.total_bytes -= entry.byte_size
+            self.evictions += 1
+            logger.debug("🗑️ Evicted slide %s from the frame cache", slide_number)
+
+    def clear(self):
+        self._entries.clear()
+        self.total_bytes = 0
+        self._version += 1
+
+    def _thumbnail(self, entry):
+        from PIL import Image
+        # Smallest cached rendition decodes fastest
+        frame = min(list(entry.frames.values()), key=frame_bytes)
+        if entry.thumbnail is None or entry.thumbnail[0] != frame.frame_id:
+            image = decode_frame(frame)
+            width = max(1, image.width * self.thumbnail_height // image.height)
+            image.draft('RGB', (width, self.thumbnail_height))  # JPEG decodes straight at 1/2..1/8 size
+            image = image.convert('RGB').resize((width, self.thumbnail_height), Image.Resampling.BILINEAR)
+            entry.thumbnail = (frame.frame_id, image)
+        return entry.thumbnail[1]
+
+    def thumbnail_strip(self, quality=60):
+        """One JPEG with every cached slide side by side (in slide order) and where each one is"""
+        from PIL import Image
+        version = self._version
+        if self._strip is not None and self._strip[0] == version:
+            return self._strip[1]
+
+        slides = []
+        thumbnails = []
+        x = 0
+        # Snapshot - the strip may be built in a worker thread while frames keep arriving
+        for slide_number, entry in sorted(list(self._entries.items()), key=lambda item: item[0]):
+            if not entry.frames:
+                continue
+            thumbnail = self._thumbnail(entry)
+            thumbnails.append((x, thumbnail))
+            slides.append({'slide_number': slide_number, 'x': x, 'width': thumbnail.width})
+            x += thumbnail.width
+
+        message = {'type': 'thumbnails', 'height': self.thumbnail_height, 'slides': slides, 'image_data': None}
+        if thumbnails:
+            strip = Image.new('RGB', (x, self.thumbnail_height))
+            for offset, thumbnail in thumbnails:
+                strip.paste(thumbnail, (offset, 0))
+            buffer = io.BytesIO()
+            strip.save(buffer, format='JPEG', quality=quality)
+            message['image_data'] = f"data:image/jpeg;base64,{base64.b64encode(buffer.getvalue()).decode('utf-8')}"
+            message['width'] = x
+
+        self._strip = (version, message)
+        return message
+
+    def get_stats(self):
+        """Return cache size and hit rate"""
+        lookups = self.hits + self.misses
+        return {
+            'slides': len(self._entries),
+            'bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'evictions': self.evictions,
+        }
@@ -4,16 +4,151 @@ Slide Capture Extension for Slide Controller Server
 Adds screenshot capture functionality for live slide mirroring.
 """
 
-import io
+import time
 import base64
 import logging
-from PIL import Image, ImageGrab, ImageChops
+from concurrent.futures import ThreadPoolExecutor
 import asyncio
-import json
 import hashlib
+# The capture and imaging stack (PIL, mss, TurboJPEG) is imported when mirroring starts, not at startup
+from frame_protocol import pack_frame, pack_delta_frame
+from broadcaster import MESSAGE_FRAME, MESSAGE_KEYFRAME, MESSAGE_STATUS
+from message_codec import JSON_CODEC
+from rate_control import AdaptiveRateController, DEFAULT_LATENCY_BUDGET_MS
+from capture_scheduler import CaptureScheduler, MODE_BURST
+from slide_cache import SlideFrameCache
+from latency_tracer import LoopLagMonitor
+from server_logging import LogThrottle
 
 logger = logging.getLogger(__name__)
 
+# Lines logged per captured frame or keystroke - at most one per second each
+change_log = LogThrottle(logger)
+unchanged_log = LogThrottle(logger)
+skipped_log = LogThrottle(logger)
+broadcast_log = LogThrottle(logger)
+keystroke_log = LogThrottle(logger)
+
+class SlideFrame:
+    """One encoded frame - raw image bytes plus metadata, serialized lazily per wire format"""
+    
+    def __init__(self, frame_id, image_data, image_format, scale, quality, image_hash, size=None):
+        self.frame_id = frame_id
+        self.image_data = image_data  # Raw encoded bytes (JPEG)
+        self.image_format = image_format
+        self.size = size  # (width, height) of the encoded image
+        self.is_keyframe = False  # Base image for delta clients
+        self.scale = scale
+        self.quality = quality
+        self.image_hash = image_hash
+        self.timestamp = time.time()
+        self.grab_started = self.grab_done = self.encode_done = 0.0  # perf_counter stamps for latency tracing
+        self._data_url = None
+    
+    def data_url(self):
+        """base64 data URL for JSON clients (computed once, only if someone needs it)"""
+        if self._data_url is None:
+            image_base64 = base64.b64encode(self.image_data).decode('utf-8')
+            self._data_url = f"data:image/{self.image_format};base64,{image_base64}"
+        return self._data_url
+    
+    def to_binary(self, slide_number=None):
+        """Binary WebSocket frame - fixed header followed by the raw image bytes"""
+        return pack_frame(
+            self.image_data, self.frame_id, self.timestamp, self.scale, self.quality,
+            image_format=self.image_format, slide_number=slide_number,
+        )
+
+class DeltaFrame:
+    """Tiles that differ from a keyframe - cumulative, so a dropped delta never corrupts the image"""
+    
+    def __init__(self, frame_id, base_frame, tiles, image_format, scale, quality):
+        self.frame_id = frame_id
+        self.base_frame = base_frame  # Keyframe (SlideFrame) these tiles are pasted onto
+        self.tiles = tiles  # [(x, y, w, h, image_bytes), ...]
+        self.image_format = image_format
+        self.scale = scale
+        self.quality = quality
+        self.timestamp = time.time()
+        self.grab_started = self.grab_done = self.encode_done = 0.0  # perf_counter stamps for latency tracing
+    
+    @property
+    def byte_size(self):
+        return sum(len(tile[4]) for tile in self.tiles)
+    
+    def tile_messages(self):
+        """Tiles as JSON-friendly dicts with base64 data URLs"""
+        return [
+            {
+                'x': x, 'y': y, 'w': w, 'h': h,
+                'image_data': f"data:image/{self.image_format};base64,{base64.b64encode(data).decode('utf-8')}",
+            }
+            for x, y, w, h, data in self.tiles
+        ]
+    
+    def to_binary(self, slide_number=None):
+        """Binary delta frame - header, base frame id and the encoded tiles"""
+        return pack_delta_frame(
+            self.tiles, self.frame_id, self.base_frame.frame_id, self.timestamp,
+            self.scale, self.quality, image_format=self.image_format, slide_number=slide_number,
+        )
+
+# Formats every client decodes - old clients never announce any
+LEGACY_FORMATS = ('jpeg',)
+
+# Resolution ladder (name, scale, quality), smallest first - clients share rungs, so
+# encode work grows with the rungs in use, not with the number of viewers
+RENDITION_LADDER = (
+    ('thumb', 0.3, 50),
+    ('medium', 0.6, 70),  # The old fixed settings
+    ('full', 1.0, 80),
+)
+
+class Rendition:
+    """Encoding state for one (scale, quality, accepted formats) output - duplicate hash and delta reference"""
+    
+    def __init__(self, scale, quality, formats=LEGACY_FORMATS):
+        self.scale = scale
+        self.quality = quality
+        self.formats = formats  # Formats the clients of this rendition accept
+        self.encoder = None  # Encoder picked for the frame being encoded (format is chosen per frame)
+        self.last_hash = None  # MD5 of the last full frame, for duplicate detection
+        self.delta_reference = None  # Scaled pixels of the current keyframe
+        self.delta_keyframe = None  # SlideFrame of the current keyframe
+        self.previous_scaled = None  # Last scaled frame, to spot "nothing moved"
+        self.deltas_since_keyframe = 0
+        self.last_encode_ms = 0.0
+        self.frame_encode_ms = 0.0  # Encoder time of the last full frame/keyframe at this scale
+        self.fingerprint = None  # Luma grid of the grab this rendition last encoded
+        self.last_full = None  # Newest SlideFrame, reused while the screen is unchanged
+        self.last_delta = None  # Newest keyframe/delta, reused while the screen is unchanged
+    
+    @property
+    def key(self):
+        return (self.scale, self.quality, self.formats)
+
+class LatestFrameQueue:
+    """Depth-1 queue between capture and send - a new frame replaces one that was not sent yet"""
+    
+    def __init__(self):
+        self._frame = None
+        self._ready = asyncio.Event()
+        self.frames_dropped = 0
+    
+    def put(self, frame):
+        """Store the newest frame, dropping any older frame still waiting"""
+        if self._frame is not None:
+            self.frames_dropped += 1
+        self._frame = frame
+        self._ready.set()
+    
+    async def get(self):
+        """Wait for and take the newest frame"""
+        await self._ready.wait()
+        frame, self._frame = self._frame, None
+        self._ready.clear()
+        return frame
+
 class SlideCaptureExtension:
     def __init__(self):
         self.capture_enabled = False
@@ -21,10 +156,71 @@ class SlideCaptureExtension:
         self.capture_scale = 0.6   # Larger size for better visibility
         self.last_screenshot_time = 0
         self.screenshot_cache = None
-        self.last_screenshot_hash = None  # For duplicate detection
+        self.renditions = {}  # (scale, quality, formats) -> Rendition (duplicate hash + delta state)
         self.last_screenshot_data = None  # Store last screenshot data
         self.streaming_task = None  # Background streaming task
         self.streaming_active = False  # Streaming state
+        self.capture_backend = None  # Screen grabber (see capture_backends.py), created on first use
+        self.capture_backend_config = ('auto', {})  # (name, options) it is created from
+        
+        # Capture region - a monitor, a fixed box or the slideshow window instead of the whole desktop
+        self.capture_monitor = None  # Monitor index (0 = all monitors, 1.. = physical), None = backend default
+        self.capture_bbox = None  # Fixed (left, top, right, bottom) in desktop pixels
+        self.capture_window = False  # Follow the bounds of the focused slideshow window
+        self.window_locator = None  # async () -> slideshow window bounds or None (set by the controller)
+        self.region_refresh_interval = 2.0  # Seconds before the window bounds are looked up again
+        self._window_bounds = None
+        self._window_checked_at = 0.0
+        self.image_scaler = None  # Integer reduce + bilinear by default (see image_scaler.py)
+        self.image_encoder = None  # JPEG encoder (see image_encoders.py)
+        self.image_encoder_name = 'auto'  # Encoder created on first use
+        self.image_mode = 'auto'  # Output format - 'auto' picks palette PNG/WebP for flat slides per frame
+        self.palette_max_colors = 256  # Sampled colors at or below which a frame counts as flat
+        self.format_encoders = {}  # mode -> WebP/PNG encoder, created on first use
+        self.format_stats = {}  # mode -> frames encoded
+        self.offload_encoding = True  # Run grab/resize/encode in a worker thread, not on the event loop
+        self.encode_executor = None
+        self.last_encode_ms = 0.0
+        self.frames_processed = 0
+        self.last_loop_blocked_ms = 0.0
+        self.total_loop_blocked_ms = 0.0
+        self.max_loop_blocked_ms = 0.0
+        self.loop_lag = LoopLagMonitor()  # Real loop stalls while frames are processed in the worker
+        self.frame_counter = 0
+        self.client_options = {}  # websocket -> options negotiated in client_hello
+        self.broadcaster = None  # Per-client send queues (set by the server)
+        self.latency_tracer = None  # Command-to-frame tracing (set by the server)
+        
+        # Dirty-rectangle deltas for clients that negotiated delta_frames
+        self.delta_tile_size = 64  # Tile edge in scaled pixels
+        self.keyframe_interval = 30  # Deltas before a fresh keyframe is forced
+        self.max_delta_area = 0.5  # Changed area above which a keyframe is cheaper than tiles
+        self.delta_stats = {'keyframes': 0, 'deltas': 0, 'unchanged': 0, 'keyframe_bytes': 0, 'delta_bytes': 0}
+        
+        # Adaptive frame rate / quality / scale per client
+        self.adaptive_rate = True
+        self.latency_budget_ms = DEFAULT_LATENCY_BUDGET_MS
+        self.stream_interval = 0.3  # Fixed capture interval when adaptive rate is off
+        self.rate_controllers = {}  # websocket -> AdaptiveRateController
+        
+        # Clients pick a rung in their hello or get the one nearest their stream level
+        self.ladder_enabled = True
+        self.rendition_ladder = RENDITION_LADDER
+        
+        # Capture right after input, slow idle poll otherwise
+        self.capture_scheduler = CaptureScheduler()
+        
+        # Last good frame of each slide - shown at once on navigation and to phones that join mid-show
+        self.current_slide = 0  # Slide the controller navigated to
+        self.slide_anchored = True  # False once the counter may be wrong (after 'last slide') - nothing is cached then
+        self.slide_cache = SlideFrameCache()
+        self.serve_cached_slides = True
+        
+        # Pre-encode change detection on a downsampled luma grid
+        self.fingerprint_enabled = True
+        self.fingerprint_grid = (64, 36)  # Cells across/down - ~30 px cells on a 1080p screen
+        self.fingerprint_tolerance = 2  # Max per-cell luma difference still treated as unchanged
+        self.fingerprint_stats = {'checked': 0, 'skipped': 0, 'fingerprint_ms': 0.0, 'saved_ms': 0.0}
         
         logger.info("⚡ LIVE STREAMING Slide Capture Extension initialized")
     
@@ -32,14 +228,12 @@ class SlideCaptureExtension:
         """Enable or disable slide capture"""
         self.capture_enabled = enabled
         
-        # Reset hash when capture mode changes
+        # Reset hashes and delta references when capture mode changes
+        self.renditions.clear()
         if enabled:
-            self.last_screenshot_hash = None  # Reset to detect first slide as changed
             logger.info("📸 Slide capture ENABLED - Hash reset for fresh start")
         else:
             logger.info("📸 Slide capture DISABLED")
-            # Optionally reset hash when disabled
-            self.last_screenshot_hash = None
     
     def set_capture_quality(self, quality):
         """Set JPEG compression quality (1-100, higher = better quality)"""
@@ -51,112 +245,772 @@ class SlideCaptureExtension:
         self.capture_scale = max(0.1, min(1.0, scale))
         logger.info(f"📏 Capture scale set to {self.capture_scale}x")
     
+    def set_capture_backend(self, backend='auto', **options):
+        """Select the screen grabber by name ('auto', 'mss', 'pil', 'synthetic') or instance"""
+        if isinstance(backend, str):
+            from capture_backends import create_capture_backend
+            backend = create_capture_backend(backend, **options)
+        
+        if self.capture_backend is not None and self.capture_backend is not backend:
+            self.capture_backend.close()
+        self.capture_backend = backend
+        if self.capture_monitor is not None:
+            backend.set_monitor(self.capture_monitor)
+        logger.info(f"🖥️ Capture backend set to '{backend.name}'")
+    
+    def set_capture_region(self, monitor=None, bbox=None, window=False):
+        """Capture one monitor, a fixed (left, top, right, bottom) box, or the slideshow window
+        
+        With window=True the window bounds win while a slideshow window is focused; bbox,
+        then the monitor, are used otherwise. No arguments restore the whole desktop.
+        """
+        self.capture_monitor = monitor
+        self.capture_bbox = tuple(bbox) if bbox is not None else None
+        self.capture_window = window
+        if self.capture_backend is not None:
+            self.capture_backend.set_monitor(0 if monitor is None else monitor)
+        self.invalidate_capture_region()
+        logger.info(f"🖼️ Capture region: monitor={monitor} bbox={self.capture_bbox} window={window}")
+    
+    def invalidate_capture_region(self):
+        """Look the slideshow window up again before the next grab (slideshow started, window moved)"""
+        self._window_checked_at = 0.0
+    
+    async def _resolve_capture_region(self):
+        """Region for the next grab - window bounds are cached and refreshed at most every few seconds"""
+        if self.capture_window and self.window_locator is not None:
+            now = time.monotonic()
+            if now - self._window_checked_at >= self.region_refresh_interval:
+                self._window_checked_at = now
+                try:
+                    bounds = await self.window_locator()
+                except Exception as e:
+                    logger.debug(f"Slideshow window lookup failed: {e}")
+                    bounds = None
+                if bounds != self._window_bounds:
+                    logger.info(f"🪟 Slideshow window bounds: {bounds or 'not found - using configured region'}")
+                    self._window_bounds = bounds
+            if self._window_bounds is not None:
+                return self._window_bounds
+        return self.capture_bbox
+    
+    def get_capture_stats(self):
+        """Return grab timing of the active capture backend"""
+        if self.capture_backend is None:
+            return {}
+        stats = self.capture_backend.get_stats()
+        stats['region'] = {
+            'monitor': self.capture_monitor,
+            'bbox': self.capture_bbox,
+            'window': self._window_bounds if self.capture_window else None,
+        }
+        return stats
+    
+    def set_image_encoder(self, encoder='auto', **options):
+        """Select the JPEG encoder by name ('auto', 'turbojpeg', 'pillow') or instance"""
+        if isinstance(encoder, str):
+            from image_encoders import create_image_encoder
+            encoder = create_image_encoder(encoder, **options)
+        self.image_encoder = encoder
+        # Encoded bytes differ between encoders - drop hashes and delta references
+        self.renditions.clear()
+        logger.info(f"🗜️ Image encoder set to '{encoder.name}'")
+    
+    def set_image_mode(self, mode='auto', palette_max_colors=None):
+        """Select the output format: 'auto', 'jpeg', 'webp', 'webp-lossless' or 'png' (palette)
+        
+        Clients that do not accept the format (see client_hello 'formats') keep getting JPEG.
+        """
+        from image_encoders import IMAGE_MODES
+        if mode not in IMAGE_MODES:
+            raise ValueError(f"Unknown image mode: {mode} (choose from {', '.join(IMAGE_MODES)})")
+        self.image_mode = mode
+        if palette_max_colors is not None:
+            self.palette_max_colors = palette_max_colors
+        self.renditions.clear()
+        logger.info(f"🎨 Image mode set to '{mode}'")
+    
+    def _get_format_encoder(self, mode):
+        if mode == 'jpeg':
+            if self.image_encoder is None:
+                self.set_image_encoder(self.image_encoder_name)
+            return self.image_encoder
+        encoder = self.format_encoders.get(mode)
+        if encoder is None:
+            from image_encoders import create_format_encoder
+            encoder = self.format_encoders[mode] = create_format_encoder(mode)
+        return encoder
+    
+    def _choose_encoder(self, screenshot, rendition):
+        """Pick this frame's encoder from the image mode, the clients' formats and a color estimate"""
+        from image_encoders import estimate_colors, choose_image_mode
+        color_count = None
+        if self.image_mode == 'auto' and len(rendition.formats) > 1:
+            color_count = estimate_colors(screenshot, self.palette_max_colors)
+        mode = choose_image_mode(self.image_mode, rendition.formats, color_count)
+        self.format_stats[mode] = self.format_stats.get(mode, 0) + 1
+        return self._get_format_encoder(mode)
+    
+    def get_encoder_stats(self):
+        """Return encode timing of the active encoders and per frame at each rendition's scale"""
+        if self.image_encoder is None:
+            return {}
+        stats = self.image_encoder.get_stats()
+        stats['image_mode'] = self.image_mode
+        stats['capture_scale'] = self.capture_scale
+        current = self.renditions.get((self.capture_scale, self.capture_quality, LEGACY_FORMATS))
+        stats['frame_encode_ms'] = round(current.frame_encode_ms, 2) if current is not None else None
+        stats['renditions'] = {
+            f"{scale}x q{quality} {'/'.join(formats)}": round(rendition.frame_encode_ms, 2)
+            for (scale, quality, formats), rendition in sorted(self.renditions.items())
+        }
+        stats['frames_by_format'] = dict(self.format_stats)
+        stats['format_encoders'] = {mode: encoder.get_stats() for mode, encoder in self.format_encoders.items()}
+        return stats
+    
+    def attach_broadcaster(self, broadcaster):
+        """Send frames through the server's per-client queues instead of awaiting each client"""
+        self.broadcaster = broadcaster
+    
+    def attach_latency_tracer(self, latency_tracer):
+        """Report grab/encode times of new frames to the server's latency tracer"""
+        self.latency_tracer = latency_tracer
+    
+    def set_client_options(self, websocket, **options):
+        """Store capabilities a client announced in its hello (e.g. binary_frames=True)"""
+        client_options = self.client_options.setdefault(websocket, {})
+        client_options.update(options)
+        # Wire format may have changed - let the next frame through even if the screen is unchanged
+        client_options.pop('frame_id', None)
+        client_options.pop('keyframe_id', None)
+        logger.info(f"🤝 Client options updated: {client_options}")
+    
+    def forget_client(self, websocket):
+        """Drop per-client state when a client disconnects"""
+        self.client_options.pop(websocket, None)
+        self.rate_controllers.pop(websocket, None)
+    
+    def _wants_binary(self, websocket):
+        return self.client_options.get(websocket, {}).get('binary_frames', False)
+    
+    def _wants_delta(self, websocket):
+        return self.client_options.get(websocket, {}).get('delta_frames', False)
+    
+    def set_adaptive_rate(self, enabled=True, latency_budget_ms=None):
+        """Let each client's fps/quality/scale follow its measured latency (False = fixed settings)"""
+        self.adaptive_rate = enabled
+        if latency_budget_ms is not None:
+            self.latency_budget_ms = latency_budget_ms
+            for controller in self.rate_controllers.values():
+                controller.latency_budget_ms = latency_budget_ms
+        logger.info(f"🎚️ Adaptive rate {'ON' if enabled else 'OFF'} - latency budget {self.latency_budget_ms:.0f} ms")
+    
+    def _get_rate_controller(self, websocket):
+        controller = self.rate_controllers.get(websocket)
+        if controller is None:
+            controller = AdaptiveRateController(latency_budget_ms=self.latency_budget_ms)
+            self.rate_controllers[websocket] = controller
+        return controller
+    
+    def observe_client_rtt(self, websocket, rtt_ms):
+        """Feed a round-trip measurement (heartbeat/pong) into the client's rate controller"""
+        self._get_rate_controller(websocket).observe_rtt(rtt_ms)
+    
+    def _update_rate_controller(self, websocket):
+        """Refresh one controller from the broadcaster queue and the websocket keepalive latency"""
+        controller = self._get_rate_controller(websocket)
+        if self.broadcaster is not None:
+            channel = self.broadcaster.channels.get(websocket)
+            if channel is not None:
+                controller.observe_send(channel.queue_depth, channel.last_send_ms, channel.messages_dropped)
+        
+        # websockets measures ping/pong latency itself - use it when the client reports no RTT
+        latency = getattr(websocket, 'latency', 0)
+        if not controller.rtt_ms and latency:
+            controller.observe_rtt(latency * 1000.0)
+        
+        rendition = self.renditions.get(self._rendition_key(websocket))
+        if rendition is not None:
+            controller.observe_encode(rendition.last_encode_ms)
+        controller.update()
+    
+    def get_rate_stats(self):
+        """Return the current stream level of every client"""
+        return {
+            str(getattr(websocket, 'remote_address', websocket)): controller.get_stats()
+            for websocket, controller in self.rate_controllers.items()
+        }
+    
+    def set_rendition_ladder(self, ladder=None, enabled=True):
+        """Set the (name, scale, quality) rungs clients are served from (enabled=False: per-client scale)"""
+        if ladder is not None:
+            self.rendition_ladder = tuple(sorted(ladder, key=lambda rung: rung[1]))
+        self.ladder_enabled = enabled
+        self.renditions.clear()
+        rungs = ', '.join(f"{name} {scale}x q{quality}" for name, scale, quality in self.rendition_ladder)
+        logger.info(f"🪜 Rendition ladder {'ON' if enabled else 'OFF'} - {rungs}")
+    
+    def rung_names(self):
+        return [name for name, _, _ in self.rendition_ladder]
+    
+    def client_rung(self, websocket):
+        """Rung a client is served: its own choice, else the largest rung not above its stream scale"""
+        chosen = self.client_options.get(websocket, {}).get('rung')
+        for rung in self.rendition_ladder:
+            if rung[0] == chosen:
+                return rung
+        scale = self._get_rate_controller(websocket).scale if self.adaptive_rate else self.capture_scale
+        assigned = self.rendition_ladder[0]
+        for rung in self.rendition_ladder:
+            if rung[1] <= scale + 1e-6:
+                assigned = rung
+        return assigned
+    
+    def get_ladder_stats(self):
+        """Return each rung and how many clients it serves"""
+        clients = set(self.client_options) | set(self.rate_controllers)
+        counts = {}
+        for client in clients:
+            name = self.client_rung(client)[0]
+            counts[name] = counts.get(name, 0) + 1
+        return {
+            'enabled': self.ladder_enabled,
+            'rungs': {
+                name: {'scale': scale, 'quality': quality, 'clients': counts.get(name, 0)}
+                for name, scale, quality in self.rendition_ladder
+            },
+        }
+    
+    def _rendition_key(self, websocket):
+        """(scale, quality, formats) a client receives - its ladder rung, rate controller or the global settings"""
+        formats = self.client_options.get(websocket, {}).get('formats', LEGACY_FORMATS)
+        if self.ladder_enabled:
+            _, scale, quality = self.client_rung(websocket)
+            return (scale, quality, formats)
+        if self.adaptive_rate:
+            controller = self._get_rate_controller(websocket)
+            return (controller.scale, controller.quality, formats)
+        return (self.capture_scale, self.capture_quality, formats)
+    
+    def _get_rendition(self, key):
+        rendition = self.renditions.get(key)
+        if rendition is None:
+            rendition = Rendition(*key)
+            self.renditions[key] = rendition
+        return rendition
+    
+    def _prune_renditions(self, websockets_clients):
+        """Forget renditions no client uses any more (keeps their reference images from piling up)"""
+        in_use = {self._rendition_key(client) for client in websockets_clients}
+        in_use.add((self.capture_scale, self.capture_quality, LEGACY_FORMATS))
+        for key in list(self.renditions):
+            if key not in in_use:
+                del self.renditions[key]
+    
+    def get_delta_stats(self):
+        """Return keyframe/delta counts and the bytes the deltas saved"""
+        stats = dict(self.delta_stats)
+        keyframes, deltas = stats['keyframes'], stats['deltas']
+        avg_keyframe = stats['keyframe_bytes'] / keyframes if keyframes else 0
+        stats['avg_keyframe_bytes'] = int(avg_keyframe)
+        stats['avg_delta_bytes'] = int(stats['delta_bytes'] / deltas) if deltas else 0
+        stats['bytes_saved'] = int(deltas * avg_keyframe - stats['delta_bytes'])
+        return stats
+    
     def _calculate_image_hash(self, image_data):
         """Calculate MD5 hash of image data for duplicate detection"""
         return hashlib.md5(image_data).hexdigest()
     
-    def _has_slide_changed(self, new_image_data):
+    def _has_slide_changed(self, new_image_data, rendition):
         """Check if the slide has actually changed by comparing image hashes"""
         new_hash = self._calculate_image_hash(new_image_data)
         
-        if self.last_screenshot_hash is None:
+        if rendition.last_hash is None:
             # First screenshot, always consider it changed
-            self.last_screenshot_hash = new_hash
+            rendition.last_hash = new_hash
             return True
         
-        if new_hash != self.last_screenshot_hash:
+        if new_hash != rendition.last_hash:
             # Slide has changed (including animations)
-            self.last_screenshot_hash = new_hash
-            logger.info("🔄 SLIDE/ANIMATION CHANGE DETECTED - New content found")
+            rendition.last_hash = new_hash
+            change_log.info("🔄 SLIDE/ANIMATION CHANGE DETECTED - New content found")
             return True
         else:
             # Same slide content - but for animations, we might want to force capture
-            logger.info("⏸️  NO VISUAL CHANGE - Same content detected, skipping broadcast")
+            unchanged_log.info("⏸️  NO VISUAL CHANGE - Same content detected, skipping broadcast")
             return False
     
     def force_capture(self):
         """Force a capture even if content appears unchanged (for subtle animations)"""
         # Reset hash to force next capture to be considered changed
-        self.last_screenshot_hash = None
+        for rendition in self.renditions.values():
+            rendition.last_hash = None
+            rendition.fingerprint = None
     
-    async def capture_slide_screenshot(self, force=False):
-        """Capture current screen and return as base64 encoded image"""
-        if not self.capture_enabled:
-            logger.debug("📸 Capture disabled - Slideshow not active")
-            return None
+    def set_change_detection(self, enabled=True, tolerance=None, grid=None):
+        """Configure the pre-encode fingerprint that skips unchanged frames"""
+        self.fingerprint_enabled = enabled
+        if tolerance is not None:
+            self.fingerprint_tolerance = tolerance
+        if grid is not None:
+            self.fingerprint_grid = grid
+        for rendition in self.renditions.values():
+            rendition.fingerprint = None
+        logger.info(f"🔍 Change detection {'ON' if enabled else 'OFF'} - {self.fingerprint_grid[0]}x{self.fingerprint_grid[1]} grid, tolerance {self.fingerprint_tolerance}")
+    
+    def get_change_detection_stats(self):
+        """Return how many frames the fingerprint skipped and the encode time that saved"""
+        stats = dict(self.fingerprint_stats)
+        checked = stats['checked']
+        stats['skip_rate'] = round(stats['skipped'] / checked, 3) if checked else 0.0
+        stats['avg_fingerprint_ms'] = round(stats['fingerprint_ms'] / checked, 3) if checked else 0.0
+        stats['fingerprint_ms'] = round(stats['fingerprint_ms'], 1)
+        stats['saved_ms'] = round(stats['saved_ms'], 1)
+        return stats
+    
+    def _get_encode_executor(self):
+        """Single worker thread for grab/resize/encode (mss handles are thread-bound, PIL releases the GIL)"""
+        if self.encode_executor is None:
+            self.encode_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='slide-capture')
+        return self.encode_executor
+    
+    def set_offload_encoding(self, enabled=True):
+        """Run the capture/encode pipeline in the worker thread (True) or inline on the event loop (False)"""
+        self.offload_encoding = enabled
+        # Start a fresh measurement so before/after numbers are not mixed
+        self.frames_processed = 0
+        self.total_loop_blocked_ms = 0.0
+        self.max_loop_blocked_ms = 0.0
+        logger.info(f"🧵 Capture pipeline running {'in worker thread' if enabled else 'INLINE on event loop'}")
+    
+    def _grab_screen(self, region=None):
+        """Grab the screen (or only region) once for every rendition"""
+        if self.capture_backend is None:
+            name, options = self.capture_backend_config
+            self.set_capture_backend(name, **options)
         
-        try:
-            # Capture screenshot
-            screenshot = ImageGrab.grab()
+        # Capture screenshot (backend records per-frame grab time)
+        return self.capture_backend.grab(region)
+    
+    def _get_image_scaler(self):
+        if self.image_scaler is None:
+            from image_scaler import ImageScaler
+            self.image_scaler = ImageScaler()
+        return self.image_scaler
+    
+    def set_resize_filter(self, filter_name='reduce', remainder_filter=None):
+        """Select the downscale filter ('reduce', 'numpy-box' or a PIL filter like 'lanczos')"""
+        self._get_image_scaler().set_filter(filter_name, remainder_filter)
+        logger.info(f"📐 Resize filter set to '{filter_name}'")
+    
+    def _scale_image(self, screenshot, scale):
+        """Scale down for faster transfer"""
+        return self._get_image_scaler().scale(screenshot, scale)
+    
+    def configure_pipeline(self, backend='auto', encoder='auto', **backend_options):
+        """Choose the capture backend and JPEG encoder - they are created when mirroring first needs them"""
+        self.capture_backend_config = (backend, backend_options)
+        self.image_encoder_name = encoder
+    
+    def load_pipeline(self):
+        """Create the capture backend, encoder and scaler now - imports PIL, mss and TurboJPEG"""
+        if self.capture_backend is not None and self.image_encoder is not None and self.image_scaler is not None:
+            return
+        start = time.perf_counter()
+        if self.capture_backend is None:
+            name, options = self.capture_backend_config
+            self.set_capture_backend(name, **options)
+        if self.image_encoder is None:
+            self.set_image_encoder(self.image_encoder_name)
+        self._get_image_scaler()
+        logger.info(f"🖼️ Capture pipeline loaded in {(time.perf_counter() - start) * 1000.0:.0f} ms")
+    
+    async def preload_pipeline(self):
+        """load_pipeline() in the worker thread, so the imports never stall the event loop"""
+        await asyncio.get_running_loop().run_in_executor(self._get_encode_executor(), self.load_pipeline)
+    
+    def _encode_frame_image(self, screenshot, rendition):
+        """Encode a whole scaled frame and remember how long the encoder took at this scale"""
+        raw_image_data = rendition.encoder.encode(screenshot, rendition.quality)
+        rendition.frame_encode_ms = rendition.encoder.last_encode_ms
+        return raw_image_data
+    
+    def _make_full_frame(self, screenshot, rendition, raw_image_data=None):
+        if raw_image_data is None:
+            raw_image_data = self._encode_frame_image(screenshot, rendition)
+        self.frame_counter += 1
+        return SlideFrame(
+            self.frame_counter, raw_image_data, rendition.encoder.image_format,
+            rendition.scale, rendition.quality, rendition.last_hash, screenshot.size,
+        )
+    
+    def _encode_full_frame(self, screenshot, rendition, force=False):
+        """Full-frame path used by clients without delta support"""
+        # Get raw image data
+        raw_image_data = self._encode_frame_image(screenshot, rendition)
+        
+        # When forced (live streaming), ALWAYS send - no hash check
+        if force:
+            # Update hash for reference
+            rendition.last_hash = self._calculate_image_hash(raw_image_data)
+        elif not self._has_slide_changed(raw_image_data, rendition):
+            return "UNCHANGED"
+        
+        return self._make_full_frame(screenshot, rendition, raw_image_data)
+    
+    def _find_dirty_rects(self, reference, current):
+        """Compare raw scaled pixels tile by tile and merge dirty tiles into rectangles"""
+        from PIL import ImageChops
+        diff = ImageChops.difference(reference, current)
+        bbox = diff.getbbox()
+        if bbox is None:
+            return []
+        
+        tile = self.delta_tile_size
+        width, height = current.size
+        first_col, last_col = bbox[0] // tile, (bbox[2] - 1) // tile
+        first_row, last_row = bbox[1] // tile, (bbox[3] - 1) // tile
+        
+        rects = []
+        open_rects = {}  # (x, w) -> rect growing downwards from the previous row
+        for row in range(first_row, last_row + 1):
+            top = row * tile
+            bottom = min(top + tile, height)
+            row_rects = {}
+            run_start = None
+            # Walk one column past the end so the last run is closed
+            for col in range(first_col, last_col + 2):
+                dirty = col <= last_col and diff.crop(
+                    (col * tile, top, min(col * tile + tile, width), bottom)
+                ).getbbox() is not None
+                if dirty and run_start is None:
+                    run_start = col
+                elif not dirty and run_start is not None:
+                    x = run_start * tile
+                    w = min(col * tile, width) - x
+                    rect = open_rects.get((x, w))
+                    if rect is not None and rect[1] + rect[3] == top:
+                        rect[3] = bottom - rect[1]  # Same span as the row above - extend it
+                    else:
+                        rect = [x, top, w, bottom - top]
+                        rects.append(rect)
+                    row_rects[(x, w)] = rect
+                    run_start = None
+            open_rects = row_rects
+        return rects
+    
+    def _encode_delta_update(self, screenshot, rendition, full_frame=None):
+        """Delta path: tiles changed since the keyframe, a new keyframe, or None if nothing moved"""
+        from PIL import ImageChops
+        keyframe_due = (
+            rendition.delta_reference is None
+            or rendition.delta_reference.size != screenshot.size
+            or rendition.deltas_since_keyframe >= self.keyframe_interval
+        )
+        
+        if not keyframe_due:
+            # Nothing moved since the last update - skip, even when streaming
+            previous = rendition.previous_scaled
+            if previous is not None and ImageChops.difference(previous, screenshot).getbbox() is None:
+                self.delta_stats['unchanged'] += 1
+                return None
+            rendition.previous_scaled = screenshot
             
-            # Scale down for faster transfer
-            if self.capture_scale != 1.0:
-                new_size = (
-                    int(screenshot.width * self.capture_scale),
-                    int(screenshot.height * self.capture_scale)
+            rects = self._find_dirty_rects(rendition.delta_reference, screenshot)
+            changed_area = sum(w * h for _, _, w, h in rects)
+            if changed_area <= self.max_delta_area * screenshot.width * screenshot.height:
+                tiles = [
+                    (x, y, w, h, rendition.encoder.encode(screenshot.crop((x, y, x + w, y + h)), rendition.quality))
+                    for x, y, w, h in rects
+                ]
+                self.frame_counter += 1
+                delta = DeltaFrame(
+                    self.frame_counter, rendition.delta_keyframe, tiles, rendition.encoder.image_format,
+                    rendition.scale, rendition.quality,
                 )
-                screenshot = screenshot.resize(new_size, Image.Resampling.LANCZOS)  # Better quality resize
-            
-            # HIGH QUALITY: Better JPEG with optimization
-            buffer = io.BytesIO()
-            screenshot.save(buffer, format='JPEG', quality=self.capture_quality, optimize=True)
-            buffer.seek(0)
-            
-            # Get raw image data
-            raw_image_data = buffer.getvalue()
+                rendition.deltas_since_keyframe += 1
+                self.delta_stats['deltas'] += 1
+                self.delta_stats['delta_bytes'] += delta.byte_size
+                return delta
+        
+        # Periodic / size change / large change: send a keyframe (reusing the full frame if encoded)
+        keyframe = full_frame if isinstance(full_frame, SlideFrame) else self._make_full_frame(screenshot, rendition)
+        keyframe.is_keyframe = True
+        rendition.delta_reference = screenshot
+        rendition.delta_keyframe = keyframe
+        rendition.previous_scaled = screenshot
+        rendition.deltas_since_keyframe = 0
+        self.delta_stats['keyframes'] += 1
+        self.delta_stats['keyframe_bytes'] += len(keyframe.image_data)
+        return keyframe
+    
+    def _fingerprint(self, screenshot):
+        """Downsampled luma grid of the raw grab - cheap enough to run on every frame"""
+        grid_width, grid_height = self.fingerprint_grid
+        factor = max(1, min(screenshot.width // grid_width, screenshot.height // grid_height))
+        # reduce() is a plain box average in C - far cheaper than the LANCZOS resize
+        return screenshot.reduce(factor).convert('L')
+    
+    def _fingerprint_unchanged(self, fingerprint, rendition):
+        previous = rendition.fingerprint
+        if previous is None or previous.size != fingerprint.size:
+            return False
+        from PIL import ImageChops
+        return ImageChops.difference(previous, fingerprint).getextrema()[1] <= self.fingerprint_tolerance
+    
+    def _reuse_rendition(self, rendition, need_full, need_delta, force):
+        """Result for an unchanged screen - the last frames, or None if the rendition has none yet"""
+        if need_full and rendition.last_full is None:
+            return None
+        if need_delta and rendition.last_delta is None:
+            return None
+        # Same contract as the MD5 check: unforced callers get "UNCHANGED"
+        full_frame = (rendition.last_full if force else "UNCHANGED") if need_full else None
+        return (full_frame, rendition.last_delta if need_delta else None)
+    
+    def _capture_frame_sync(self, force=False, jobs=(), region=None):
+        """Grab once, then scale/encode/hash every requested rendition - blocking, runs in the worker thread
+        
+        jobs is a list of (rendition, need_full, need_delta). Returns {rendition key:
+        (full_frame, delta_update)}: the full frame for legacy clients and the
+        keyframe/delta for clients that negotiated delta_frames.
+        """
+        start = time.perf_counter()
+        screenshot = self._grab_screen(region)
+        grab_done = time.perf_counter()
+        
+        fingerprint = None
+        if self.fingerprint_enabled:
+            fingerprint_start = time.perf_counter()
+            fingerprint = self._fingerprint(screenshot)
+            self.fingerprint_stats['fingerprint_ms'] += (time.perf_counter() - fingerprint_start) * 1000.0
+        
+        results = {}
+        for rendition, need_full, need_delta in jobs:
+            if fingerprint is not None:
+                self.fingerprint_stats['checked'] += 1
+                if self._fingerprint_unchanged(fingerprint, rendition):
+                    reused = self._reuse_rendition(rendition, need_full, need_delta, force)
+                    if reused is not None:
+                        # Nothing visible changed - skip resize, encode and (per client) send
+                        self.fingerprint_stats['skipped'] += 1
+                        self.fingerprint_stats['saved_ms'] += rendition.last_encode_ms
+                        results[rendition.key] = reused
+                        continue
             
-            # When forced (live streaming), ALWAYS send - no hash check
-            if force:
-                # Update hash for reference
-                new_hash = self._calculate_image_hash(raw_image_data)
-                self.last_screenshot_hash = new_hash
-                
-                # Encode to base64
-                image_base64 = base64.b64encode(raw_image_data).decode('utf-8')
-                data_url = f"data:image/jpeg;base64,{image_base64}"
-                
-                return data_url
+            rendition_start = time.perf_counter()
+            scaled = self._scale_image(screenshot, rendition.scale)
+            rendition.encoder = self._choose_encoder(scaled, rendition)
+            full_frame = self._encode_full_frame(scaled, rendition, force) if need_full else None
+            delta_update = self._encode_delta_update(scaled, rendition, full_frame) if need_delta else None
+            results[rendition.key] = (full_frame, delta_update)
+            encode_done = time.perf_counter()
+            rendition.last_encode_ms = (encode_done - rendition_start) * 1000.0
             
-            # For non-forced captures, check if changed
-            if not self._has_slide_changed(raw_image_data):
-                return "UNCHANGED"
+            for frame in (full_frame, delta_update):
+                if isinstance(frame, (SlideFrame, DeltaFrame)) and not frame.grab_started:
+                    frame.grab_started, frame.grab_done, frame.encode_done = start, grab_done, encode_done
             
-            # Encode to base64
-            image_base64 = base64.b64encode(raw_image_data).decode('utf-8')
-            data_url = f"data:image/jpeg;base64,{image_base64}"
+            rendition.fingerprint = fingerprint
+            if isinstance(full_frame, SlideFrame):
+                rendition.last_full = full_frame
+            if delta_update is not None:
+                rendition.last_delta = delta_update
+        
+        self.last_encode_ms = (time.perf_counter() - start) * 1000.0
+        return results
+    
+    def _record_loop_blocked(self, blocked_ms):
+        """Track how long one frame kept the asyncio event loop busy (inline: the whole pipeline, worker: loop lag)"""
+        self.frames_processed += 1
+        self.last_loop_blocked_ms = blocked_ms
+        self.total_loop_blocked_ms += blocked_ms
+        self.max_loop_blocked_ms = max(self.max_loop_blocked_ms, blocked_ms)
+        logger.debug("⏱️ Frame kept event loop busy for %.2f ms (pipeline %.1f ms)", blocked_ms, self.last_encode_ms)
+    
+    def get_pipeline_stats(self):
+        """Return per-frame encode time and event loop blocking for the capture pipeline"""
+        frames = self.frames_processed
+        return {
+            'mode': 'worker' if self.offload_encoding else 'inline',
+            'frames': frames,
+            'last_encode_ms': round(self.last_encode_ms, 2),
+            'last_loop_blocked_ms': round(self.last_loop_blocked_ms, 3),
+            'avg_loop_blocked_ms': round(self.total_loop_blocked_ms / frames, 3) if frames else 0.0,
+            'max_loop_blocked_ms': round(self.max_loop_blocked_ms, 3),
+            'loop_lag': self.loop_lag.get_stats(),
+            'capture': self.get_capture_stats(),
+            'resize': self.image_scaler.get_stats() if self.image_scaler is not None else {},
+            'encoder': self.get_encoder_stats(),
+            'renditions': sorted(self.renditions),
+            'rate': self.get_rate_stats(),
+            'ladder': self.get_ladder_stats(),
+            'slide_cache': self.slide_cache.get_stats(),
+            'scheduler': self.capture_scheduler.get_stats(),
+            'change_detection': self.get_change_detection_stats(),
+        }
+    
+    async def _run_capture_pipeline(self, force=False, jobs=()):
+        """Run the blocking pipeline in the worker (or inline) and return {key: (full_frame, delta_update)}"""
+        if not self.capture_enabled:
+            logger.debug("📸 Capture disabled - Slideshow not active")
+            return {}
+        
+        try:
+            region = await self._resolve_capture_region()
+            if not self.offload_encoding:
+                # Legacy path: the whole pipeline blocks the event loop
+                start = time.perf_counter()
+                results = self._capture_frame_sync(force, jobs, region)
+                self._record_loop_blocked((time.perf_counter() - start) * 1000.0)
+                return results
             
-            return data_url
+            # Image work happens in the worker, but it still competes for the GIL - measure
+            # how late the loop's own ticks ran while this frame was in flight
+            self.loop_lag.start()
+            start = time.perf_counter()
+            results = await asyncio.get_running_loop().run_in_executor(
+                self._get_encode_executor(), self._capture_frame_sync, force, jobs, region
+            )
+            self._record_loop_blocked(self.loop_lag.max_lag_since(start))
+            return results
             
         except Exception as e:
             logger.error(f"❌ Screenshot capture failed: {e}")
-            return None
+            return {}
     
-    async def create_slide_message(self, slide_number=None, force=False):
-        """Create a slide update message with screenshot"""
-        screenshot_data = await self.capture_slide_screenshot(force=force)
+    async def capture_slide_frame(self, force=False):
+        """Capture current screen and return it as an encoded SlideFrame (or "UNCHANGED"/None)"""
+        rendition = self._get_rendition((self.capture_scale, self.capture_quality, LEGACY_FORMATS))
+        results = await self._run_capture_pipeline(force, [(rendition, True, False)])
+        return results.get(rendition.key, (None, None))[0]
+    
+    async def capture_slide_screenshot(self, force=False):
+        """Capture current screen and return as base64 encoded image"""
+        frame = await self.capture_slide_frame(force=force)
+        if isinstance(frame, SlideFrame):
+            return frame.data_url()
+        return frame
+    
+    def _build_slide_message(self, frame, slide_number=None):
+        """JSON slide_update message (fallback for clients without binary frames)"""
+        message = {
+            'type': 'slide_update',
+            'timestamp': asyncio.get_event_loop().time(),
+            'slide_number': slide_number,
+            'has_image': True,
+            'frame_id': frame.frame_id,
+        }
         
-        # When forced, screenshot_data should never be UNCHANGED
+        message['image_data'] = frame.data_url()
+        message['image_format'] = frame.image_format
+        message['image_scale'] = frame.scale
+        message['image_quality'] = frame.quality
+        
+        return message
+    
+    async def create_slide_frame(self, force=False):
+        """Capture a frame for broadcasting, or None when nothing should be sent"""
+        frame = await self.capture_slide_frame(force=force)
+        
+        # When forced, frame should never be UNCHANGED
         # But handle it just in case
-        if not screenshot_data or screenshot_data == "UNCHANGED":
+        if not isinstance(frame, SlideFrame):
             if force:
                 logger.warning("⚠️ Forced capture returned no data - retrying")
                 return None
-            logger.info("🚫 SKIPPING BROADCAST - No slide change detected")
+            skipped_log.info("🚫 SKIPPING BROADCAST - No slide change detected")
             return None
         
-        message = {
-            'type': 'slide_update',
-            'timestamp': asyncio.get_event_loop().time(),
-            'slide_number': slide_number,
-            'has_image': True
-        }
+        return frame
+    
+    async def create_slide_message(self, slide_number=None, force=False):
+        """Create a slide update message with screenshot"""
+        frame = await self.create_slide_frame(force=force)
+        if frame is None:
+            return None
+        return self._build_slide_message(frame, slide_number)
+    
+    def set_current_slide(self, slide_number, anchored=True):
+        """Slide the presentation is on now - anchored=False when the number may be wrong, e.g. after 'last slide'"""
+        self.current_slide = slide_number
+        self.slide_anchored = anchored
+    
+    @property
+    def cache_slide_number(self):
+        """Cache key of the current slide, or None while the counter is not anchored"""
+        return self.current_slide if self.slide_anchored else None
+    
+    def set_slide_cache(self, enabled=True, max_bytes=None):
+        """Enable or disable serving cached slides and set the cache byte budget"""
+        self.serve_cached_slides = enabled
+        if max_bytes is not None:
+            self.slide_cache.max_bytes = max_bytes
+        logger.info(f"🗂️ Slide cache {'enabled' if enabled else 'disabled'} - {self.slide_cache.max_bytes // (1024 * 1024)} MB budget")
+    
+    def _cache_slide_frames(self, slide_number, updates):
+        """Remember the newest frame of each rendition as slide_number's picture"""
+        # Navigation during the capture - the grab may show either slide
+        if not slide_number or slide_number != self.cache_slide_number:
+            return
+        for key, (full_frame, delta_update) in updates.items():
+            # A delta is cached with its keyframe - together they are the whole picture
+            frame = full_frame if full_frame is not None else delta_update
+            if frame is not None:
+                self.slide_cache.put(slide_number, key, frame)
+    
+    async def serve_cached_slide(self, websockets_clients, slide_number=None):
+        """Send each client its rendition of the cached slide right away - False if nothing is cached"""
+        if slide_number is None:
+            slide_number = self.cache_slide_number
+        if not self.serve_cached_slides or not slide_number or not websockets_clients:
+            return False
         
-        message['image_data'] = screenshot_data
-        message['image_format'] = 'jpeg'
-        message['image_scale'] = self.capture_scale
-        message['image_quality'] = self.capture_quality
+        updates = {}
+        for client in websockets_clients:
+            key = self._rendition_key(client)
+            if key not in updates:
+                frame = self.slide_cache.get(slide_number, key)
+                if frame is not None:
+                    # Delta clients take a full frame as their keyframe, or get a delta after its keyframe
+                    updates[key] = (frame if isinstance(frame, SlideFrame) else None, frame)
+        if not updates:
+            return False
         
-        return message
+        clients = {client for client in websockets_clients if self._rendition_key(client) in updates}
+        await self._send_slide_updates(clients, updates, slide_number, force=True)
+        logger.debug("🗂️ Served cached slide %s to %d clients", slide_number, len(clients))
+        return True
+    
+    async def get_thumbnails(self):
+        """Thumbnail strip of every cached slide (built in the worker, reused until the cache changes)"""
+        if not self.offload_encoding:
+            return self.slide_cache.thumbnail_strip()
+        return await asyncio.get_running_loop().run_in_executor(
+            self._get_encode_executor(), self.slide_cache.thumbnail_strip
+        )
+    
+    async def _capture_updates(self, websockets_clients, force=False):
+        """Capture once for everyone: one encode per rendition, full and/or delta as clients need"""
+        needs = {}  # rendition key -> [need_full, need_delta]
+        for client in websockets_clients:
+            flags = needs.setdefault(self._rendition_key(client), [False, False])
+            flags[1 if self._wants_delta(client) else 0] = True
+        
+        slide_number = self.cache_slide_number
+        jobs = [(self._get_rendition(key), need_full, need_delta) for key, (need_full, need_delta) in needs.items()]
+        results = await self._run_capture_pipeline(force, jobs)
+        if self.latency_tracer is not None:
+            self.latency_tracer.on_frames_captured([frame for pair in results.values() for frame in pair])
+        
+        updates = {}
+        for key, (full_frame, delta_update) in results.items():
+            if not isinstance(full_frame, SlideFrame):
+                full_frame = None
+            if full_frame is not None or delta_update is not None:
+                updates[key] = (full_frame, delta_update)
+        self._cache_slide_frames(slide_number, updates)
+        return updates
     
     async def broadcast_slide_update(self, websockets_clients, slide_number=None, force=False):
         """Broadcast slide update to all connected clients"""
@@ -168,62 +1022,259 @@ class SlideCaptureExtension:
             return
         
         try:
-            message = await self.create_slide_message(slide_number, force=force)
+            updates = await self._capture_updates(websockets_clients, force=force)
             
             # Skip broadcast if no change detected (unless forced)
-            if message is None and not force:
-                logger.info("⏸️  BROADCAST SKIPPED - Slide unchanged")
+            if not updates:
+                if not force:
+                    skipped_log.info("⏸️  BROADCAST SKIPPED - Slide unchanged")
                 return
             
-            message_json = json.dumps(message)
-            
-            # Send to all connected clients
-            disconnected_clients = set()
-            for client in websockets_clients:
-                try:
-                    await client.send(message_json)
-                except Exception as e:
-                    logger.warning(f"📱 Failed to send slide update to client: {e}")
-                    disconnected_clients.add(client)
-            
-            # Remove disconnected clients
-            for client in disconnected_clients:
-                websockets_clients.discard(client)
-            
-            logger.info(f"⚡ Broadcast to {len(websockets_clients)} clients (forced={force})")
+            await self._send_slide_updates(websockets_clients, updates, slide_number, force=force)
             
         except Exception as e:
             logger.error(f"❌ Failed to broadcast slide update: {e}")
     
-    async def start_live_streaming(self, websockets_clients):
-        """Start continuous live streaming of slides"""
-        self.streaming_active = True
-        logger.info("🎥 LIVE STREAMING STARTED - Capturing every 300ms (3.3 fps)")
+    def _build_delta_message(self, delta, slide_number=None):
+        """JSON slide_delta message - tiles to paste onto keyframe base_frame_id"""
+        return {
+            'type': 'slide_delta',
+            'timestamp': asyncio.get_event_loop().time(),
+            'slide_number': slide_number,
+            'frame_id': delta.frame_id,
+            'base_frame_id': delta.base_frame.frame_id,
+            'tiles': delta.tile_messages(),
+            'image_format': delta.image_format,
+            'image_scale': delta.scale,
+            'image_quality': delta.quality,
+        }
+    
+    def _serialize_update(self, update, binary, codec, slide_number, cache):
+        """Serialize a frame or delta for one wire format and codec, at most once per broadcast"""
+        key = (id(update), None if binary else codec.name)
+        if key not in cache:
+            if binary:
+                cache[key] = update.to_binary(slide_number)
+            elif isinstance(update, DeltaFrame):
+                cache[key] = codec.encode(self._build_delta_message(update, slide_number))
+            else:
+                message = self._build_slide_message(update, slide_number)
+                if update.is_keyframe:
+                    message['keyframe'] = True
+                    message['width'], message['height'] = update.size
+                cache[key] = codec.encode(message)
+        return cache[key]
+    
+    def _updates_for_client(self, client, full_frame, delta_update):
+        """Pick what one client receives: (update, message_class) pairs in send order"""
+        options = self.client_options.setdefault(client, {})
+        if not self._wants_delta(client):
+            if full_frame is None or options.get('frame_id') == full_frame.frame_id:
+                return []  # Unchanged screen - the client already has this frame
+            options['frame_id'] = full_frame.frame_id
+            return [(full_frame, MESSAGE_FRAME)]
+        if delta_update is None:
+            return []
         
-        while self.streaming_active and self.capture_enabled:
+        if isinstance(delta_update, DeltaFrame):
+            if options.get('frame_id') == delta_update.frame_id:
+                return []
+            options['frame_id'] = delta_update.frame_id
+            updates = []
+            if options.get('keyframe_id') != delta_update.base_frame.frame_id:
+                # Client joined late or missed the keyframe - send the base first
+                updates.append((delta_update.base_frame, MESSAGE_KEYFRAME))
+                options['keyframe_id'] = delta_update.base_frame.frame_id
+            updates.append((delta_update, MESSAGE_FRAME))
+            return updates
+        
+        if options.get('keyframe_id') == delta_update.frame_id and options.get('frame_id') is None:
+            return []
+        options['keyframe_id'] = delta_update.frame_id
+        options['frame_id'] = None
+        return [(delta_update, MESSAGE_KEYFRAME)]
+    
+    async def _send_slide_updates(self, websockets_clients, updates, slide_number=None, force=False):
+        """Send each client its rendition's frame/delta in the format it negotiated"""
+        # Serialize each wire format at most once per frame
+        payloads = {}
+        
+        # Send to all connected clients
+        disconnected_clients = set()
+        for client in list(websockets_clients):
+            full_frame, delta_update = updates.get(self._rendition_key(client), (None, None))
             try:
-                # Capture and broadcast with force (always send, no hash check)
-                await self.broadcast_slide_update(websockets_clients, force=True)
-                
-                # Wait 300ms before next capture (3.3 fps - faster updates)
-                await asyncio.sleep(0.3)
-                
+                binary = self._wants_binary(client)
+                codec = self.broadcaster.codec_for(client) if self.broadcaster is not None else JSON_CODEC
+                for update, message_class in self._updates_for_client(client, full_frame, delta_update):
+                    payload = self._serialize_update(update, binary, codec, slide_number, payloads)
+                    
+                    if self.broadcaster is not None:
+                        # Latest-wins queue - a slow client just skips stale frames
+                        self.broadcaster.send(client, payload, message_class, tag=update.frame_id)
+                    else:
+                        await client.send(payload)
             except Exception as e:
-                logger.error(f"❌ Streaming error: {e}")
-                await asyncio.sleep(1)  # Wait before retry
+                logger.warning(f"📱 Failed to send slide update to client: {e}")
+                disconnected_clients.add(client)
+        
+        # Remove disconnected clients
+        for client in disconnected_clients:
+            websockets_clients.discard(client)
+        
+        broadcast_log.info("⚡ Broadcast to %d clients (forced=%s)", len(websockets_clients), force)
+    
+    async def _send_latest_frames(self, frames, websockets_clients):
+        """Sender side of the stream - always sends the newest frame, never a backlog"""
+        while True:
+            updates, due_clients = await frames.get()
+            try:
+                clients = {client for client in due_clients if client in websockets_clients}
+                if clients:
+                    await self._send_slide_updates(clients, updates, force=True)
+            except Exception as e:
+                logger.error(f"❌ Failed to send streamed frame: {e}")
+    
+    def _due_clients(self, websockets_clients, now):
+        """Clients whose frame interval has elapsed (all of them when adaptive rate is off)"""
+        if not self.adaptive_rate:
+            return set(websockets_clients)
+        return {client for client in websockets_clients if self._get_rate_controller(client).is_due(now)}
+    
+    def _next_capture_delay(self, websockets_clients, now):
+        """Sleep until the next client is due"""
+        if not self.adaptive_rate or not websockets_clients:
+            return self.stream_interval
+        next_due = min(self._get_rate_controller(client).next_frame_at for client in websockets_clients)
+        return max(0.01, next_due - now)
+    
+    def set_capture_schedule(self, burst_offsets_ms=None, idle_interval=None, active_hold=None):
+        """Configure the capture burst after input, the idle poll and how long pointer activity counts"""
+        scheduler = self.capture_scheduler
+        if burst_offsets_ms is not None:
+            scheduler.burst_offsets = [offset / 1000.0 for offset in sorted(burst_offsets_ms)]
+        if idle_interval is not None:
+            scheduler.idle_interval = idle_interval
+        if active_hold is not None:
+            scheduler.active_hold = active_hold
+        offsets = ', '.join(f"{offset * 1000:.0f}" for offset in scheduler.burst_offsets)
+        logger.info(f"⏱️ Capture burst at {offsets} ms after input, idle poll every {scheduler.idle_interval}s")
+    
+    def trigger_capture(self, reason='input'):
+        """Wake the streaming loop for a capture burst - False when not streaming"""
+        if not self.streaming_active:
+            return False
+        self.capture_scheduler.trigger(reason)
+        return True
+    
+    def note_activity(self):
+        """Keep streaming at the client frame rate (pointer movement) - False when not streaming"""
+        if not self.streaming_active:
+            return False
+        self.capture_scheduler.note_activity()
+        return True
+    
+    async def start_live_streaming(self, websockets_clients):
+        """Start live streaming of slides - bursts after input, idle poll in between"""
+        self.streaming_active = True
+        scheduler = self.capture_scheduler
+        if self.adaptive_rate:
+            logger.info(f"🎥 LIVE STREAMING STARTED - Adaptive rate, {self.latency_budget_ms:.0f} ms latency budget")
+        else:
+            logger.info(f"🎥 LIVE STREAMING STARTED - Capturing every {self.stream_interval * 1000:.0f}ms while active")
+        
+        # Capture and send are decoupled: a slow send never delays the next capture
+        frames = LatestFrameQueue()
+        sender_task = asyncio.create_task(self._send_latest_frames(frames, websockets_clients))
+        loop = asyncio.get_running_loop()
+        
+        # Entering the slideshow is itself a transition worth a burst
+        scheduler.start()
+        scheduler.trigger('presentation start')
+        
+        try:
+            while self.streaming_active and self.capture_enabled:
+                try:
+                    now = loop.time()
+                    burst = scheduler.burst_due(now)
+                    mode = MODE_BURST if burst else scheduler.mode(now)
+                    
+                    # Burst captures go to everyone at once - that is the swipe-to-phone latency
+                    due_clients = set(websockets_clients) if burst else self._due_clients(websockets_clients, now)
+                    if due_clients:
+                        if self.adaptive_rate:
+                            # Re-tune each due client from its latest encode/backlog/RTT numbers
+                            for client in due_clients:
+                                self._update_rate_controller(client)
+                                self._get_rate_controller(client).mark_sent(now)
+                            self._prune_renditions(websockets_clients)
+                        
+                        # Capture with force (always send, no hash check) - encode runs in the worker
+                        # Delta clients only get tiles that changed (deltas are safe to replace)
+                        updates = await self._capture_updates(due_clients, force=True)
+                        scheduler.record_capture(mode)
+                        if updates:
+                            frames.put((updates, due_clients))
+                    
+                    # Sleep until the next burst point, client frame or idle poll - input wakes us early
+                    now = loop.time()
+                    await scheduler.wait(scheduler.next_delay(now, self._next_capture_delay(websockets_clients, now)))
+                    
+                except Exception as e:
+                    logger.error(f"❌ Streaming error: {e}")
+                    await asyncio.sleep(1)  # Wait before retry
+        finally:
+            sender_task.cancel()
+            self.loop_lag.stop()  # No ticks between slideshows
+            if frames.frames_dropped:
+                logger.info(f"🗑️ {frames.frames_dropped} stale frames replaced before send")
         
         logger.info("🛑 LIVE STREAMING STOPPED")
     
     def stop_live_streaming(self):
         """Stop continuous live streaming"""
         self.streaming_active = False
+        self.capture_scheduler.wake()  # Don't sit out the idle poll
+    
+    async def shutdown(self):
+        """Stop streaming and release the worker thread and grabber handle (server stop)"""
+        self.stop_live_streaming()
+        self.loop_lag.stop()
+        task, self.streaming_task = self.streaming_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        
+        executor, self.encode_executor = self.encode_executor, None
+        if executor is not None:
+            if self.capture_backend is not None:
+                # mss handles belong to the worker thread - close there; reopened on the next grab
+                await asyncio.get_running_loop().run_in_executor(executor, self.capture_backend.close)
+            executor.shutdown(wait=True)
+        elif self.capture_backend is not None:
+            self.capture_backend.close()
+        
+        self.client_options.clear()
+        self.rate_controllers.clear()
+        self.renditions.clear()
+        self.set_current_slide(0)
+        logger.info("🛑 Slide capture shut down")
 
 # Global instance for easy integration
 slide_capture = SlideCaptureExtension()
 
 # Integration functions for the main server
-def init_slide_capture():
-    """Initialize slide capture (call this in main server startup)"""
+def init_slide_capture(backend='auto', encoder='auto', capture_region=None, **backend_options):
+    """Initialize slide capture (call this in main server startup)
+
+    capture_region holds set_capture_region() arguments (monitor, bbox, window) - None grabs the whole desktop.
+    """
+    slide_capture.configure_pipeline(backend, encoder, **backend_options)  # Loaded when the slideshow starts
+    if capture_region:
+        slide_capture.set_capture_region(**capture_region)
     slide_capture.enable_capture(True)
     slide_capture.set_capture_quality(70)  # Better quality for readable text
     slide_capture.set_capture_scale(0.6)   # 60% size for better visibility
@@ -235,19 +1286,29 @@ async def on_slide_change(websockets_clients, slide_number):
 
 async def on_keystroke(websockets_clients, slide_number):
     """Call this after any keystroke to capture animations and slide changes"""
-    logger.info("⌨️  Keystroke detected - Capturing for animations/slide changes")
+    keystroke_log.info("⌨️  Keystroke detected - Capturing for animations/slide changes")
     await slide_capture.broadcast_slide_update(websockets_clients, slide_number)
 
 async def on_keystroke_force(websockets_clients, slide_number):
-    """Call this after any keystroke - but with live streaming, this is just a fallback"""
-    # With live streaming active, captures happen automatically every 400ms
-    # This is just a fallback for immediate capture
-    pass  # Live streaming handles everything!
+    """Call this after any input event - starts a capture burst in the live stream"""
+    if slide_capture.trigger_capture('input'):
+        return
+    
+    # Not streaming: fall back to a single capture (skipped if the slide is unchanged)
+    await slide_capture.broadcast_slide_update(websockets_clients, slide_number)
 
 async def on_presentation_start(websockets_clients):
     """Call this when presentation starts"""
     logger.info("🎬 SLIDESHOW STARTED - Starting LIVE STREAMING")
     slide_capture.enable_capture(True)
+    slide_capture.invalidate_capture_region()  # The slideshow window just appeared or went full screen
+    slide_capture.slide_cache.clear()  # May be a different deck - never show pictures from the last one
+    
+    # First slideshow: import and create the capture stack off the event loop
+    try:
+        await slide_capture.preload_pipeline()
+    except Exception as e:
+        logger.error(f"❌ Capture pipeline failed to load: {e}")
     
     # Start continuous live streaming in background
     slide_capture.streaming_task = asyncio.create_task(
@@ -256,6 +1317,11 @@ async def on_presentation_start(websockets_clients):
     
     logger.info("🎥 LIVE STREAMING ACTIVE - Phone will show real-time PC screen")
 
+async def shutdown_slide_capture():
+    """Call this when the server stops - ends streaming and frees the capture worker"""
+    slide_capture.enable_capture(False)
+    await slide_capture.shutdown()
+
 async def on_presentation_end(websockets_clients):
     """Call this when presentation ends"""
     logger.info("🛑 SLIDESHOW ENDED - Stopping live streaming")
@@ -276,8 +1342,13 @@ async def on_presentation_end(websockets_clients):
         'type': 'presentation_end',
         'timestamp': asyncio.get_event_loop().time()
     }
-    message_json = json.dumps(end_message)
+    if slide_capture.broadcaster is not None:
+        # Encoded once per codec in use
+        slide_capture.broadcaster.publish(end_message, MESSAGE_STATUS, clients=websockets_clients)
+        logger.info(f"📱 {len(websockets_clients)} clients notified: Slideshow ended")
+        return
     
+    message_json = JSON_CODEC.encode(end_message)
     for client in list(websockets_clients):
         try:
             await client.send(message_json)
@@ -1,26 +1,74 @@
+import startup_profiler
+startup_profiler.start_if_requested()  # Before the imports it should time
 import asyncio
-import json
 import logging
+import time
 import socket
-import pyautogui
+import argparse
 from websockets.server import serve
 from websockets.exceptions import ConnectionClosed
-from slide_capture_extension import slide_capture, init_slide_capture, on_slide_change, on_keystroke, on_keystroke_force, on_presentation_start, on_presentation_end
+from slide_capture_extension import slide_capture, init_slide_capture, on_slide_change, on_keystroke, on_keystroke_force, on_presentation_start, on_presentation_end, shutdown_slide_capture
+from frame_protocol import get_capabilities, IMAGE_FORMAT_CODES
+from broadcaster import Broadcaster, MESSAGE_ACK, MESSAGE_STATUS
+from pointer_input import PointerInputCoalescer
+from input_worker import InputInjectionWorker, PRIORITY_NAVIGATION, PRIORITY_DEFAULT, PRIORITY_POINTER
+from input_backends import create_input_backend, INPUT_BACKENDS
+from latency_tracer import LatencyTracer
+from command_registry import CommandRegistry, CommandError, Param
+from message_codec import CodecError, decode_message, get_codec, available_codecs
+from server_logging import LogThrottle, setup_logging, parse_category_levels, CATEGORIES
 
-# Optimize pyautogui for zero latency
-pyautogui.PAUSE = 0.0  # No pause between actions
-pyautogui.FAILSAFE = False  # Disable failsafe for maximum speed
+# Configure logging - queued, written by a background thread
+setup_logging()
+# Module name, not __name__ - the 'network' log category must also match when run as a script
+logger = logging.getLogger('slide_controller_server')
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+# Sync commands that change what is on screen - followed by a capture burst
+CAPTURE_TRIGGER_COMMANDS = ('laser_pointer_click', 'black_screen', 'white_screen', 'first_slide', 'last_slide')
+
+# Keystrokes that never move the slideshow - any other key (space, enter, page keys, digits...)
+# may, so the slide counter stops being trusted for the slide cache after it
+SLIDE_NEUTRAL_KEYS = (
+    'b', 'w', '.', ',', 'period', 'comma', 'volumeup', 'volumedown', 'volumemute',
+    'shift', 'ctrl', 'alt',
+)
+
+# Commands whose trace stays open until the first frame grabbed after them reaches a phone
+FRAME_TRACED_COMMANDS = (
+    'next', 'previous', 'next_slide', 'previous_slide', 'keystroke', 'start_presentation',
+    'first_slide', 'last_slide', 'black_screen', 'white_screen', 'laser_pointer_click',
+)
+
+LATENCY_LOG_INTERVAL = 60  # Seconds between latency summary log lines
+
+# Navigation names answered at once and run in the background (no status broadcast)
+FIRE_AND_FORGET_COMMANDS = ('next_slide', 'previous_slide')
+
+# Pointer position in percent of the screen (laser_pointer_move / laser_pointer_click)
+POINTER_PARAMS = (Param('x_percent', float, 50, 0, 100), Param('y_percent', float, 50, 0, 100))
+
+# Injection priority of sync commands (anything else runs at PRIORITY_DEFAULT)
+COMMAND_PRIORITIES = {
+    'first_slide': PRIORITY_NAVIGATION,
+    'last_slide': PRIORITY_NAVIGATION,
+    'black_screen': PRIORITY_NAVIGATION,
+    'white_screen': PRIORITY_NAVIGATION,
+    'laser_pointer': PRIORITY_POINTER,
+    'laser_pointer_move': PRIORITY_POINTER,
+    'laser_pointer_click': PRIORITY_POINTER,
+    'test_laser_pointer': PRIORITY_POINTER,
+}
+
+# Window title fragments of a presentation (focus check and slideshow window capture)
+PRESENTATION_WINDOW_KEYWORDS = ('powerpoint', 'microsoft powerpoint', 'presentation', '.pptx', '.ppt')
 
 class LaserPointer:
     """Simple laser pointer implementation using mouse cursor"""
     
-    def __init__(self):
+    def __init__(self, input_backend):
+        self.input_backend = input_backend
         self.is_visible = False
-        self.screen_width, self.screen_height = pyautogui.size()
+        self.screen_width, self.screen_height = input_backend.screen_size()
         self.current_x = 0
         self.current_y = 0
         
@@ -33,7 +81,7 @@ class LaserPointer:
         try:
             if not self.is_visible:
                 # Enable PowerPoint laser pointer mode
-                pyautogui.hotkey('ctrl', 'l')
+                self.input_backend.hotkey('ctrl', 'l')
                 self.is_visible = True
                 logger.info("🔴 Laser pointer shown (PowerPoint mode)")
         except Exception as e:
@@ -44,7 +92,7 @@ class LaserPointer:
         try:
             if self.is_visible:
                 # Disable PowerPoint laser pointer mode
-                pyautogui.hotkey('ctrl', 'l')
+                self.input_backend.hotkey('ctrl', 'l')
                 self.is_visible = False
                 logger.info("🔴 Laser pointer hidden")
         except Exception as e:
@@ -58,7 +106,7 @@ class LaserPointer:
             y = int(y_percent * self.screen_height * 0.01)
             
             # Move mouse cursor to position (this will show the laser dot in PowerPoint)
-            pyautogui.moveTo(x, y, duration=0.0)  # Instant movement
+            self.input_backend.move_to(x, y)  # Instant movement
             
         except Exception as e:
             logger.error(f"❌ Error moving laser pointer: {e}")
@@ -72,42 +120,49 @@ class LaserPointer:
         except Exception as e:
             logger.error(f"❌ Error during laser pointer cleanup: {e}")
 
+def is_presentation_window(title):
+    """True if a window title looks like PowerPoint or a presentation"""
+    window_title = title.lower()
+    return any(keyword in window_title for keyword in PRESENTATION_WINDOW_KEYWORDS)
+
 class SlideController:
-    def __init__(self):
+    def __init__(self, input_backend='auto', capture_backend='auto', image_encoder='auto', capture_region=None):
         self.presentation_mode = False
         self.current_slide = 0
         self.connected_clients = set()
         
-        # Disable pyautogui's fail-safe feature for presentations
-        pyautogui.FAILSAFE = False
+        # Native keyboard/mouse injection (SendInput/XTest), pyautogui as fallback
+        if isinstance(input_backend, str):
+            input_backend = create_input_backend(input_backend)
+        self.input_backend = input_backend
+        logger.info(f"⌨️ Input backend: {self.input_backend.name}")
         
-        # ZERO LATENCY: Absolute zero pause for maximum speed
-        pyautogui.PAUSE = 0.0
+        # All input injection runs on one thread, never on the event loop
+        self.input_worker = InputInjectionWorker()
         
         # Initialize laser pointer
-        self.laser_pointer = LaserPointer()
+        self.laser_pointer = LaserPointer(self.input_backend)
         self.laser_pointer.init_laser_pointer()
         
+        # Every phone command, resolved with one dict lookup
+        self.commands = self._build_command_registry()
+        
         # Initialize slide capture
-        init_slide_capture()
+        init_slide_capture(capture_backend, image_encoder, capture_region)
+        slide_capture.window_locator = self.locate_slideshow_window
         logger.info("🖼️ Slide capture system initialized")
     
     def _is_powerpoint_focused(self):
         """Check if PowerPoint is the active window"""
         try:
             # Try to get active window (this may require additional dependencies)
-            active_window = pyautogui.getActiveWindow()
-            if active_window:
-                window_title = active_window.title.lower()
-                # Check if PowerPoint is in the window title
-                is_ppt = any(keyword in window_title for keyword in [
-                    'powerpoint', 'microsoft powerpoint', 'presentation', '.pptx', '.ppt'
-                ])
-                if is_ppt:
+            active_title = self.input_backend.active_window_title()
+            if active_title:
+                if is_presentation_window(active_title):
                     logger.info("✅ PowerPoint window is active and focused")
                     return True
                 else:
-                    logger.warning(f"⚠️  PowerPoint not focused - Active window: '{active_window.title}'")
+                    logger.warning(f"⚠️  PowerPoint not focused - Active window: '{active_title}'")
                     return False
             else:
                 logger.warning("⚠️  Could not detect active window")
@@ -117,11 +172,45 @@ class SlideController:
             logger.debug(f"Focus detection failed: {e} - Continuing anyway")
             return True
     
+    def _find_slideshow_window(self):
+        """Bounds (left, top, right, bottom) of the focused presentation window, or None"""
+        window = self.input_backend.active_window()
+        if window is None:
+            return None
+        title, bounds = window
+        if not title or bounds is None or not is_presentation_window(title):
+            return None
+        return bounds
+    
+    async def locate_slideshow_window(self):
+        """Slideshow window bounds for region capture - looked up on the input thread, which owns the display"""
+        return await self.input_worker.run(self._find_slideshow_window, name='find_window')
+    
+    async def _move_to_slide(self, slide_number, anchored=True):
+        """Update the slide counter and show the cached picture of that slide until a fresh capture lands"""
+        if not self.presentation_mode:
+            return
+        # One step per key press, so an animation build gets its own cached picture
+        self.current_slide = slide_number
+        slide_capture.set_current_slide(slide_number, anchored)
+        await slide_capture.serve_cached_slide(self.connected_clients)
+    
+    def _unanchor_slide(self):
+        """Input moved the slideshow by an unknown amount - nothing is cached until first_slide or a new slideshow"""
+        if self.presentation_mode:
+            slide_capture.set_current_slide(self.current_slide, anchored=False)
+    
+    def _trigger_capture(self):
+        """Start a capture burst after an input event (slideshow only)"""
+        if self.presentation_mode:
+            asyncio.create_task(on_keystroke_force(self.connected_clients, self.current_slide))
+    
     async def next_slide(self):
         """Move to the next slide using keyboard shortcut"""
         try:
-            # Send keystroke immediately - NO DELAYS
-            pyautogui.press('right')
+            # Send keystroke on the injection thread - jumps ahead of queued pointer moves
+            await self.input_worker.run(self.input_backend.press, 'right', name='next_slide', priority=PRIORITY_NAVIGATION)
+            await self._move_to_slide(self.current_slide + 1, slide_capture.slide_anchored)
             
             # SLIDESHOW-ONLY MIRRORING: Only capture during active presentation
             if self.presentation_mode:
@@ -134,8 +223,9 @@ class SlideController:
     async def previous_slide(self):
         """Move to the previous slide using keyboard shortcut"""
         try:
-            # Send keystroke immediately - NO DELAYS
-            pyautogui.press('left')
+            # Send keystroke on the injection thread - jumps ahead of queued pointer moves
+            await self.input_worker.run(self.input_backend.press, 'left', name='previous_slide', priority=PRIORITY_NAVIGATION)
+            await self._move_to_slide(max(1, self.current_slide - 1), slide_capture.slide_anchored)
             
             # SLIDESHOW-ONLY MIRRORING: Only capture during active presentation
             if self.presentation_mode:
@@ -148,8 +238,10 @@ class SlideController:
     async def handle_keystroke(self, key):
         """Handle any keystroke that might trigger animations or slide changes"""
         try:
-            # Send keystroke immediately - NO DELAYS
-            pyautogui.press(key)
+            # Send keystroke on the injection thread - jumps ahead of queued pointer moves
+            await self.input_worker.run(self.input_backend.press, key, name='keystroke', priority=PRIORITY_NAVIGATION)
+            if key.lower() not in SLIDE_NEUTRAL_KEYS:
+                self._unanchor_slide()
             
             # SLIDESHOW-ONLY MIRRORING: Only capture during active presentation
             if self.presentation_mode:
@@ -164,12 +256,14 @@ class SlideController:
         logger.info("🎯 START PRESENTATION command received")
         try:
             logger.info("📡 Sending F5 key...")
-            pyautogui.press('f5')  # F5 to start slideshow
+            # F5 to start slideshow
+            await self.input_worker.run(self.input_backend.press, 'f5', name='start_presentation', priority=PRIORITY_NAVIGATION)
             logger.info("✅ F5 key sent successfully")
             
             # PROPER SLIDESHOW RESET: Always start fresh
             self.presentation_mode = True
             self.current_slide = 1  # Always reset to slide 1 when starting
+            slide_capture.set_current_slide(self.current_slide)
             logger.info(f"🎮 Presentation mode activated - RESET to slide {self.current_slide}")
             
             # ZERO LATENCY: Instant presentation capture
@@ -185,12 +279,14 @@ class SlideController:
         logger.info("🎯 END PRESENTATION command received")
         try:
             logger.info("📡 Sending Escape key...")
-            pyautogui.press('esc')  # Escape to end slideshow
+            # Escape to end slideshow
+            await self.input_worker.run(self.input_backend.press, 'esc', name='end_presentation', priority=PRIORITY_NAVIGATION)
             logger.info("✅ Escape key sent successfully")
             
             # PROPER SLIDESHOW CLEANUP: Complete reset
             self.presentation_mode = False
             self.current_slide = 0  # Reset counter completely
+            slide_capture.set_current_slide(self.current_slide)
             logger.info("🛑 SLIDESHOW ENDED - Presentation mode deactivated, counter RESET")
             
             # Stop slide capture and notify clients
@@ -200,7 +296,7 @@ class SlideController:
         except Exception as e:
             logger.error(f"❌ Error ending presentation: {e}")
     
-    def laser_pointer(self):
+    def toggle_laser_pointer(self):
         """Toggle laser pointer visibility"""
         logger.info("🔴 LASER POINTER toggle command received")
         try:
@@ -228,6 +324,17 @@ class SlideController:
         except Exception as e:
             logger.error(f"❌ Error moving laser pointer: {e}")
     
+    def queue_pointer_move(self, x_percent, y_percent):
+        """Queue a pointer move on the injection thread - replaces a move that has not run yet"""
+        self.input_worker.submit(
+            self.laser_pointer_move, x_percent, y_percent,
+            name='laser_pointer_move', priority=PRIORITY_POINTER, coalesce_key='laser_pointer_move'
+        )
+        
+        # Keep mirroring at full frame rate while the pointer moves
+        if self.presentation_mode:
+            slide_capture.note_activity()
+    
     def test_laser_pointer(self):
         """Test the laser pointer by moving it around the screen"""
         logger.info("🧪 Testing laser pointer...")
@@ -247,7 +354,7 @@ class SlideController:
             for x, y in test_positions:
                 self.laser_pointer.move(x, y)
                 logger.info(f"🧪 Test position: {x}%, {y}%")
-                pyautogui.sleep(0.5)  # Wait between movements
+                time.sleep(0.5)  # Wait between movements (runs on the injection thread)
             
             logger.info("🧪 Laser pointer test completed")
             
@@ -258,14 +365,14 @@ class SlideController:
         """Click at specific coordinates (useful for highlighting)"""
         try:
             # Get screen dimensions
-            screen_width, screen_height = pyautogui.size()
+            screen_width, screen_height = self.input_backend.screen_size()
             
             # Convert percentages to actual coordinates
             x = int((x_percent / 100.0) * screen_width)
             y = int((y_percent / 100.0) * screen_height)
             
             # Click at the position
-            pyautogui.click(x, y)
+            self.input_backend.click(x, y)
             logger.info(f"👆 Laser pointer clicked at ({x}, {y}) - {x_percent:.1f}%, {y_percent:.1f}%")
             
         except Exception as e:
@@ -275,7 +382,7 @@ class SlideController:
         """Black out the screen (B key in most presentation software)"""
         logger.info("⚫ BLACK SCREEN command received")
         try:
-            pyautogui.press('b')  # B key for black screen
+            self.input_backend.press('b')  # B key for black screen
             logger.info("✅ Black screen toggled")
         except Exception as e:
             logger.error(f"❌ Error toggling black screen: {e}")
@@ -284,7 +391,7 @@ class SlideController:
         """White out the screen (W key in most presentation software)"""
         logger.info("⚪ WHITE SCREEN command received")
         try:
-            pyautogui.press('w')  # W key for white screen
+            self.input_backend.press('w')  # W key for white screen
             logger.info("✅ White screen toggled")
         except Exception as e:
             logger.error(f"❌ Error toggling white screen: {e}")
@@ -293,7 +400,7 @@ class SlideController:
         """Toggle presentation view (Alt+F5 or Ctrl+F5)"""
         logger.info("📺 PRESENTATION VIEW command received")
         try:
-            pyautogui.hotkey('alt', 'f5')  # Alt+F5 for presenter view
+            self.input_backend.hotkey('alt', 'f5')  # Alt+F5 for presenter view
             logger.info("✅ Presentation view toggled")
         except Exception as e:
             logger.error(f"❌ Error toggling presentation view: {e}")
@@ -302,7 +409,7 @@ class SlideController:
         """Increase system volume"""
         logger.info("🔊 VOLUME UP command received")
         try:
-            pyautogui.press('volumeup')
+            self.input_backend.press('volumeup')
             logger.info("✅ Volume increased")
         except Exception as e:
             logger.error(f"❌ Error increasing volume: {e}")
@@ -311,7 +418,7 @@ class SlideController:
         """Decrease system volume"""
         logger.info("🔉 VOLUME DOWN command received")
         try:
-            pyautogui.press('volumedown')
+            self.input_backend.press('volumedown')
             logger.info("✅ Volume decreased")
         except Exception as e:
             logger.error(f"❌ Error decreasing volume: {e}")
@@ -320,7 +427,7 @@ class SlideController:
         """Toggle system mute"""
         logger.info("🔇 MUTE command received")
         try:
-            pyautogui.press('volumemute')
+            self.input_backend.press('volumemute')
             logger.info("✅ Mute toggled")
         except Exception as e:
             logger.error(f"❌ Error toggling mute: {e}")
@@ -329,7 +436,7 @@ class SlideController:
         """Go to first slide (Home key)"""
         logger.info("⏮️ FIRST SLIDE command received")
         try:
-            pyautogui.press('home')
+            self.input_backend.press('home')
             logger.info("✅ Moved to first slide")
         except Exception as e:
             logger.error(f"❌ Error going to first slide: {e}")
@@ -338,7 +445,7 @@ class SlideController:
         """Go to last slide (End key)"""
         logger.info("⏭️ LAST SLIDE command received")
         try:
-            pyautogui.press('end')
+            self.input_backend.press('end')
             logger.info("✅ Moved to last slide")
         except Exception as e:
             logger.error(f"❌ Error going to last slide: {e}")
@@ -347,7 +454,7 @@ class SlideController:
         """Enter full screen mode (F11)"""
         logger.info("🖥️ FULL SCREEN command received")
         try:
-            pyautogui.press('f11')
+            self.input_backend.press('f11')
             logger.info("✅ Entered full screen")
         except Exception as e:
             logger.error(f"❌ Error entering full screen: {e}")
@@ -356,76 +463,108 @@ class SlideController:
         """Exit full screen mode (F11 or Esc)"""
         logger.info("🖥️ EXIT FULL SCREEN command received")
         try:
-            pyautogui.press('f11')  # F11 toggles, or use Esc
+            self.input_backend.press('f11')  # F11 toggles, or use Esc
             logger.info("✅ Exited full screen")
         except Exception as e:
             logger.error(f"❌ Error exiting full screen: {e}")
         
-    async def handle_command(self, command, params=None):
-        """Handle incoming commands from the mobile app"""
-        # Async commands that need slide capture
-        async_commands = {
-            'next': self.next_slide,
-            'previous': self.previous_slide,
-            'start_presentation': self.start_presentation,
-            'end_presentation': self.end_presentation,
-            'keystroke': self.handle_keystroke,
-        }
+    def _build_command_registry(self):
+        """Name -> handler, parameter schema and injection priority, built once"""
+        commands = CommandRegistry()
         
-        # Sync commands
-        sync_commands = {
-            'laser_pointer': self.laser_pointer,
-            'laser_pointer_move': self.laser_pointer_move,
-            'laser_pointer_click': self.laser_pointer_click,
-            'test_laser_pointer': self.test_laser_pointer,
-            'black_screen': self.black_screen,
-            'white_screen': self.white_screen,
-            'presentation_view': self.presentation_view,
-            'volume_up': self.volume_up,
-            'volume_down': self.volume_down,
-            'mute': self.mute,
-            'first_slide': self.first_slide,
-            'last_slide': self.last_slide,
-            'full_screen': self.full_screen,
-            'exit_full_screen': self.exit_full_screen,
-        }
+        # Async commands that need slide capture
+        commands.register('next', self.next_slide, run_async=True, aliases=('next_slide',))
+        commands.register('previous', self.previous_slide, run_async=True, aliases=('previous_slide',))
+        commands.register('start_presentation', self.start_presentation, run_async=True)
+        commands.register('end_presentation', self.end_presentation, run_async=True)
+        commands.register('keystroke', self.handle_keystroke, (Param('key', str, 'space', max_length=16),), run_async=True)
         
-        if command in async_commands:
-            try:
-                # Handle commands that need parameters
-                if command == 'keystroke' and params:
-                    key = params.get('key', 'space')
-                    await async_commands[command](key)
-                else:
-                    await async_commands[command]()
-                return {'status': 'success', 'command': command}
-            except Exception as e:
-                logger.error(f"Error executing async command {command}: {e}")
-                return {'status': 'error', 'message': str(e)}
-        elif command in sync_commands:
-            try:
-                # Handle commands that need parameters
-                if command in ['laser_pointer_move', 'laser_pointer_click'] and params:
-                    x_percent = params.get('x_percent', 50)
-                    y_percent = params.get('y_percent', 50)
-                    sync_commands[command](x_percent, y_percent)
-                else:
-                    sync_commands[command]()
-                return {'status': 'success', 'command': command}
-            except Exception as e:
-                logger.error(f"Error executing sync command {command}: {e}")
-                return {'status': 'error', 'message': str(e)}
-        else:
-            return {'status': 'error', 'message': f'Unknown command: {command}'}
+        # Sync commands - blocking input injection runs on the injection thread
+        sync_commands = (
+            ('laser_pointer', self.toggle_laser_pointer, ()),
+            ('laser_pointer_move', self.laser_pointer_move, POINTER_PARAMS),
+            ('laser_pointer_click', self.laser_pointer_click, POINTER_PARAMS),
+            ('test_laser_pointer', self.test_laser_pointer, ()),
+            ('black_screen', self.black_screen, ()),
+            ('white_screen', self.white_screen, ()),
+            ('presentation_view', self.presentation_view, ()),
+            ('volume_up', self.volume_up, ()),
+            ('volume_down', self.volume_down, ()),
+            ('mute', self.mute, ()),
+            ('first_slide', self.first_slide, ()),
+            ('last_slide', self.last_slide, ()),
+            ('full_screen', self.full_screen, ()),
+            ('exit_full_screen', self.exit_full_screen, ()),
+        )
+        for name, handler, params in sync_commands:
+            commands.register(name, handler, params, priority=COMMAND_PRIORITIES.get(name, PRIORITY_DEFAULT))
+        return commands
+    
+    async def handle_command(self, command, params=None):
+        """Handle incoming commands from the mobile app"""
+        try:
+            spec, args = self.commands.resolve(command, params)
+        except CommandError as e:
+            return {'status': 'error', 'message': str(e)}
+        return await self.execute_command(spec, args, command)
+    
+    async def execute_command(self, spec, args, command=None):
+        """Run a resolved command - coroutine on the loop, or injection on the input thread"""
+        started = time.perf_counter()
+        try:
+            if spec.run_async:
+                await spec.handler(*args)
+            else:
+                await self.input_worker.run(spec.handler, *args, name=spec.name, priority=spec.priority)
+                
+                if spec.name == 'first_slide':
+                    await self._move_to_slide(1)
+                elif spec.name in ('last_slide', 'laser_pointer_click'):
+                    # Deck length unknown / a click may advance - the counter keeps counting, but
+                    # nothing is cached until re-anchored
+                    self._unanchor_slide()
+                if spec.name in CAPTURE_TRIGGER_COMMANDS:
+                    self._trigger_capture()
+            spec.record(started)
+            return {'status': 'success', 'command': command or spec.name}
+        except Exception as e:
+            spec.record(started, ok=False)
+            logger.error(f"Error executing command {spec.name}: {e}")
+            return {'status': 'error', 'message': str(e)}
 
 class SlideControllerServer:
-    def __init__(self, host='0.0.0.0', port=8080):
+    def __init__(self, host='0.0.0.0', port=8080, input_backend='auto', capture_backend='auto', image_encoder='auto',
+                 capture_region=None):
         self.host = host
         self.port = port
-        self.controller = SlideController()
+        self.controller = SlideController(input_backend, capture_backend, image_encoder, capture_region)
         self.connected_clients = set()
         # Share connected clients with controller for slide capture
         self.controller.connected_clients = self.connected_clients
+        # One send queue + writer task per client, shared with slide capture
+        self.broadcaster = Broadcaster()
+        slide_capture.attach_broadcaster(self.broadcaster)
+        # Receive -> dispatch -> inject -> capture -> encode -> send, per command
+        self.latency_tracer = LatencyTracer()
+        self.broadcaster.on_sent = self.latency_tracer.on_frame_sent
+        slide_capture.attach_latency_tracer(self.latency_tracer)
+        # Laser pointer moves bypass the command path: coalesced per refresh tick, no acks
+        self.pointer_input = PointerInputCoalescer(self.controller.queue_pointer_move, self.broadcaster)
+        # One 'Received message' line per second at most, however fast phones send
+        self.message_log = LogThrottle(logger)
+        # Dispatch tables, built once - message 'type' -> handler, server-answered command -> handler
+        self.message_handlers = {
+            'heartbeat': self.handle_heartbeat,
+            'client_hello': self.handle_client_hello,
+        }
+        self.server_commands = {
+            'stats': self.send_stats,
+            'get_thumbnails': self.send_thumbnails,
+        }
+        # Lifecycle - see start()/stop()/wait_closed()
+        self.websocket_server = None
+        self.latency_log_task = None
+        self.closed_event = None
         
     def get_local_ip(self):
         """Get the local IP address of the machine - Works WITHOUT internet"""
@@ -473,6 +612,7 @@ class SlideControllerServer:
         client_address = websocket.remote_address
         logger.info(f"New client connected: {client_address}")
         self.connected_clients.add(websocket)
+        self.broadcaster.register(websocket)
         
         try:
             # Send welcome message
@@ -483,64 +623,50 @@ class SlideControllerServer:
                     'version': '1.0.0',
                     'presentation_mode': self.controller.presentation_mode,
                     'current_slide': self.controller.current_slide
-                }
+                },
+                # Clients opt in with {'type': 'client_hello', 'binary_frames': true, 'codec': 'msgpack'}
+                'capabilities': dict(get_capabilities(), codecs=available_codecs())
             }
-            await websocket.send(json.dumps(welcome_message))
+            self.send_to_client(websocket, welcome_message)
+            
+            # Joining mid-show: the cached current slide now, the live stream catches up after
+            if self.controller.presentation_mode:
+                await slide_capture.serve_cached_slide({websocket})
             
             async for message in websocket:
+                received_at = time.perf_counter()
                 try:
-                    data = json.loads(message)
-                    logger.info(f"📱 Received message from {client_address}: {data}")
+                    data = decode_message(message)  # Text frames are JSON, binary frames MessagePack
+                    
+                    # Pointer fast path - no log line, no response, no status broadcast per move
+                    if data.get('command') == 'laser_pointer_move':
+                        try:
+                            _, (x_percent, y_percent) = self.controller.commands.resolve('laser_pointer_move', data.get('params'))
+                        except CommandError:
+                            continue  # Counted as invalid; a bad move is dropped, not answered
+                        self.pointer_input.submit(websocket, x_percent, y_percent, data.get('timestamp'))
+                        continue
+                    
+                    self.message_log.info("📱 Received message from %s: %s", client_address, data)
                     
                     # Handle different message types
-                    if data.get('type') == 'heartbeat':
-                        # Respond to heartbeat with pong
-                        pong_response = {
-                            'type': 'pong',
-                            'timestamp': data.get('timestamp'),
-                            'server_time': asyncio.get_event_loop().time()
-                        }
-                        await websocket.send(json.dumps(pong_response))
+                    handler = self.message_handlers.get(data.get('type'))
+                    if handler is not None:
+                        await handler(websocket, data)
                     elif 'command' in data:
-                        command = data['command']
-                        params = data.get('params', {})
-                        
+                        server_command = self.server_commands.get(data['command'])
+                        if server_command is not None:
+                            await server_command(websocket, data)
                         # Skip heartbeat commands completely
-                        if not data.get('heartbeat', False):
-                            # For slide navigation commands, execute immediately without waiting
-                            if command in ['next_slide', 'previous_slide']:
-                                # Execute in background - NO WAITING
-                                asyncio.create_task(self.controller.handle_command(command, params))
-                                
-                                # Send immediate success response
-                                response = {
-                                    'status': 'success',
-                                    'message': f'{command} executed',
-                                    'timestamp': data.get('timestamp')
-                                }
-                                await websocket.send(json.dumps(response))
-                            else:
-                                # For other commands, wait for response
-                                response = await self.controller.handle_command(command, params)
-                                response['timestamp'] = data.get('timestamp')
-                                await websocket.send(json.dumps(response))
-                                
-                                # Broadcast status to all connected clients
-                                if response['status'] == 'success':
-                                    status_update = {
-                                        'type': 'status_update',
-                                        'presentation_mode': self.controller.presentation_mode,
-                                        'current_slide': self.controller.current_slide,
-                                        'last_command': data['command']
-                                    }
-                                    await self.broadcast_to_clients(status_update, exclude=websocket)
+                        elif not data.get('heartbeat', False):
+                            await self.handle_command_message(websocket, data, received_at)
                     
-                except json.JSONDecodeError:
-                    error_response = {'status': 'error', 'message': 'Invalid JSON format'}
-                    await websocket.send(json.dumps(error_response))
+                except CodecError as e:
+                    error_response = {'status': 'error', 'message': str(e)}
+                    self.send_to_client(websocket, error_response)
                 except Exception as e:
                     error_response = {'status': 'error', 'message': str(e)}
-                    await websocket.send(json.dumps(error_response))
+                    self.send_to_client(websocket, error_response)
                     logger.error(f"Error handling message: {e}")
                     
         except ConnectionClosed:
@@ -549,36 +675,164 @@ class SlideControllerServer:
             logger.error(f"Error with client {client_address}: {e}")
         finally:
             self.connected_clients.discard(websocket)
+            self.broadcaster.unregister(websocket)
+            slide_capture.forget_client(websocket)
+            self.pointer_input.forget_client(websocket)
             
+    async def handle_heartbeat(self, websocket, data):
+        """Respond to heartbeat with pong"""
+        pong_response = {
+            'type': 'pong',
+            'timestamp': data.get('timestamp'),
+            'server_time': asyncio.get_event_loop().time()
+        }
+        self.send_to_client(websocket, pong_response)
+        
+        # Clients may report the RTT of their previous heartbeat for adaptive streaming
+        if data.get('rtt_ms') is not None:
+            slide_capture.observe_client_rtt(websocket, float(data['rtt_ms']))
+    
+    async def handle_client_hello(self, websocket, data):
+        """Capability negotiation - old clients never send this and keep JSON frames"""
+        binary_frames = bool(data.get('binary_frames', False))
+        delta_frames = bool(data.get('delta_frames', False))
+        pointer_acks = bool(data.get('pointer_acks', False))
+        # Image formats the client decodes, e.g. ['png', 'webp', 'jpeg'] - JPEG is always allowed
+        formats = tuple(sorted(
+            {name for name in data.get('formats') or () if name in IMAGE_FORMAT_CODES} | {'jpeg'}
+        ))
+        # Resolution rung ('thumb', 'medium', 'full'); anything else lets the server assign one
+        rung = data.get('rung') if data.get('rung') in slide_capture.rung_names() else None
+        slide_capture.set_client_options(
+            websocket, binary_frames=binary_frames, delta_frames=delta_frames, formats=formats, rung=rung
+        )
+        self.pointer_input.enable_acks(websocket, pointer_acks)
+        # Wire encoding of everything after the hello_ack - JSON unless the client asks for an available codec
+        codec = get_codec(data.get('codec'))
+        hello_ack = {
+            'type': 'hello_ack',
+            'binary_frames': binary_frames,
+            'delta_frames': delta_frames,
+            'pointer_acks': pointer_acks,
+            'formats': list(formats),
+            'rung': slide_capture.client_rung(websocket)[0],
+            'rungs': slide_capture.rung_names(),
+            'codec': codec.name
+        }
+        self.send_to_client(websocket, hello_ack)
+        self.broadcaster.set_codec(websocket, codec)
+        
+        # Resend in the negotiated format/rung (skipped if the client already has this frame)
+        if self.controller.presentation_mode:
+            await slide_capture.serve_cached_slide({websocket})
+    
+    async def send_stats(self, websocket, data):
+        """Latency percentiles and pipeline counters"""
+        self.send_to_client(websocket, self.get_stats())
+    
+    async def send_thumbnails(self, websocket, data):
+        """Strip of cached slide thumbnails for the grid view"""
+        thumbnails = await slide_capture.get_thumbnails()
+        self.send_to_client(websocket, dict(thumbnails, current_slide=self.controller.current_slide))
+    
+    async def handle_command_message(self, websocket, data, received_at):
+        """Validate a controller command, run it and answer the client"""
+        command = data['command']
+        try:
+            # Unknown commands and bad params are answered here - no trace, no injection queued
+            spec, args = self.controller.commands.resolve(command, data.get('params'))
+        except CommandError as e:
+            self.send_to_client(websocket, {'status': 'error', 'message': str(e), 'timestamp': data.get('timestamp')})
+            return
+        
+        trace = self.latency_tracer.begin(command, data.get('id', data.get('timestamp')), received_at)
+        
+        # For slide navigation commands, execute immediately without waiting
+        if command in FIRE_AND_FORGET_COMMANDS:
+            # Execute in background - NO WAITING
+            asyncio.create_task(self.run_command(spec, args, command, trace))
+            
+            # Send immediate success response
+            response = {
+                'status': 'success',
+                'message': f'{command} executed',
+                'timestamp': data.get('timestamp')
+            }
+            self.send_to_client(websocket, response)
+        else:
+            # For other commands, wait for response
+            response = await self.run_command(spec, args, command, trace)
+            response['timestamp'] = data.get('timestamp')
+            self.send_to_client(websocket, response)
+            
+            # Broadcast status to all connected clients
+            if response['status'] == 'success':
+                status_update = {
+                    'type': 'status_update',
+                    'presentation_mode': self.controller.presentation_mode,
+                    'current_slide': self.controller.current_slide,
+                    'last_command': command
+                }
+                await self.broadcast_to_clients(status_update, exclude=websocket)
+    
+    async def run_command(self, spec, args, command, trace):
+        """Execute a resolved command and stamp its dispatch/inject stages"""
+        trace.stamp('dispatch')
+        response = await self.controller.execute_command(spec, args, command)
+        trace.stamp('inject')
+        
+        if response['status'] == 'success' and command in FRAME_TRACED_COMMANDS and self.controller.presentation_mode:
+            # Finished by the capture pipeline and broadcaster once a frame shows the change
+            self.latency_tracer.expect_frame(trace)
+        else:
+            self.latency_tracer.finish(trace)
+        return response
+    
+    def get_stats(self):
+        """Everything the 'stats' command reports"""
+        return {
+            'type': 'stats',
+            'latency': self.latency_tracer.get_stats(),
+            'input': self.controller.input_worker.get_stats(),
+            'input_backend': self.controller.input_backend.get_stats(),
+            'pointer': self.pointer_input.get_stats(),
+            'pipeline': slide_capture.get_pipeline_stats(),
+            'clients': self.broadcaster.get_stats(),
+            'commands': self.controller.commands.get_stats(),
+        }
+    
+    async def log_latency_periodically(self):
+        """Log a latency summary line every LATENCY_LOG_INTERVAL seconds while commands arrive"""
+        while True:
+            await asyncio.sleep(LATENCY_LOG_INTERVAL)
+            summary = self.latency_tracer.summary_line()
+            if summary:
+                logger.info(f"⏱️ Latency: {summary}")
+    
+    def send_to_client(self, websocket, message, message_class=MESSAGE_ACK):
+        """Queue a message for one client - its writer task does the actual send"""
+        self.broadcaster.send(websocket, message, message_class)
+    
     async def broadcast_to_clients(self, message, exclude=None):
         """Broadcast a message to all connected clients"""
         if not self.connected_clients:
             return
-            
-        message_str = json.dumps(message)
-        disconnected_clients = set()
-        
-        for client in self.connected_clients:
-            if client == exclude:
-                continue
-                
-            try:
-                await client.send(message_str)
-            except ConnectionClosed:
-                disconnected_clients.add(client)
-            except Exception as e:
-                logger.error(f"Error broadcasting to client: {e}")
-                disconnected_clients.add(client)
         
-        # Remove disconnected clients
-        self.connected_clients -= disconnected_clients
+        # Serialized once, then queued per client - a slow client never blocks this call
+        self.broadcaster.publish(message, MESSAGE_STATUS, exclude=exclude)
     
     def cleanup(self):
         """Clean up resources when server shuts down"""
+        controller = self.controller
+        
+        def release_input():
+            # Runs on the input-injection thread after queued input - hiding the pointer injects
+            # a hotkey, and the backend (XTest display connection) is not thread-safe
+            controller.laser_pointer.cleanup()
+            controller.input_backend.close()
+        
         try:
-            if hasattr(self, 'laser_pointer'):
-                self.laser_pointer.cleanup()
-                logger.info("🔴 Laser pointer cleaned up")
+            controller.input_worker.close(on_stop=release_input)
         except Exception as e:
             logger.error(f"❌ Error during cleanup: {e}")
     
@@ -625,31 +879,110 @@ class SlideControllerServer:
         logger.info("=" * 60)
         
         try:
-            async with serve(self.handle_client, self.host, self.port):
-                logger.info("Server started successfully!")
-                # Create a future that runs forever until cancelled
-                await asyncio.Future()  # Run forever
+            await self.start()
+            try:
+                await self.wait_closed()  # Until stop() - or cancelled by Ctrl+C
+            finally:
+                await self.stop()
         except asyncio.CancelledError:
             logger.info("Server shutdown requested")
             raise
         except Exception as e:
             logger.error(f"Server error: {e}")
             raise
+    
+    @property
+    def is_serving(self):
+        return self.websocket_server is not None
+    
+    async def start(self):
+        """Bind the port and start serving - returns as soon as the socket is listening"""
+        if self.websocket_server is not None:
+            return
+        self.closed_event = asyncio.Event()
+        self.websocket_server = await serve(self.handle_client, self.host, self.port)
+        self.latency_log_task = asyncio.create_task(self.log_latency_periodically())
+        logger.info("Server started successfully!")
+        startup_profiler.log_startup_report()
+    
+    async def stop(self):
+        """Release the port, disconnect every client and stop streaming, capture and input work"""
+        websocket_server, self.websocket_server = self.websocket_server, None
+        if websocket_server is None:
+            return
+        logger.info("🛑 Stopping server...")
+        
+        # Stop accepting and close every connection (their handlers unregister themselves)
+        websocket_server.close()
+        if self.latency_log_task is not None:
+            self.latency_log_task.cancel()
+            self.latency_log_task = None
+        self.pointer_input.close()
+        
+        # No streaming loop, capture worker or grabber handle outlives the server
+        self.controller.presentation_mode = False
+        self.controller.current_slide = 0
+        await shutdown_slide_capture()
+        
+        await websocket_server.wait_closed()
+        for websocket in list(self.broadcaster.channels):
+            self.broadcaster.unregister(websocket)
+        self.cleanup()
+        self.closed_event.set()
+        logger.info("✅ Server stopped - port released")
+    
+    async def wait_closed(self):
+        """Wait until the server has been stopped"""
+        if self.closed_event is not None:
+            await self.closed_event.wait()
 
 def main():
     """Main function to start the server"""
-    server = SlideControllerServer()
+    parser = argparse.ArgumentParser(description="PresenterPro slide controller server")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--input-backend', default='auto', choices=['auto'] + list(INPUT_BACKENDS))
+    parser.add_argument('--capture-backend', default='auto', help="auto, mss, pil or synthetic")
+    parser.add_argument('--image-encoder', default='auto', help="auto, turbojpeg or pillow")
+    parser.add_argument('--monitor', type=int, help="Capture one monitor (mss numbering: 0 is all monitors)")
+    parser.add_argument('--bbox', type=int, nargs=4, metavar=('LEFT', 'TOP', 'RIGHT', 'BOTTOM'),
+                        help="Capture a fixed box in desktop pixels")
+    parser.add_argument('--capture-window', action='store_true',
+                        help="Capture the focused slideshow window (falls back to --bbox or --monitor)")
+    parser.add_argument(startup_profiler.PROFILE_IMPORTS_FLAG, action='store_true',
+                        help="Log how long each module took to import once the server is listening")
+    parser.add_argument('--log-level', default='INFO', type=str.upper, help="DEBUG, INFO, WARNING or ERROR")
+    parser.add_argument('--log-category', action='append', metavar='CATEGORY=LEVEL',
+                        help=f"Level for one category ({', '.join(CATEGORIES)}), e.g. capture=WARNING - repeatable")
+    args = parser.parse_args()
+    
+    try:
+        setup_logging(args.log_level, parse_category_levels(args.log_category))
+    except ValueError as e:
+        parser.error(str(e))
+    
+    if args.monitor is not None and args.monitor < 0:
+        parser.error("--monitor must be 0 or more")
+    if args.bbox is not None and (args.bbox[2] <= args.bbox[0] or args.bbox[3] <= args.bbox[1]):
+        parser.error("--bbox needs RIGHT > LEFT and BOTTOM > TOP")
+    capture_region = None
+    if args.monitor is not None or args.bbox is not None or args.capture_window:
+        capture_region = {'monitor': args.monitor, 'bbox': args.bbox, 'window': args.capture_window}
+    
+    server = SlideControllerServer(
+        args.host, args.port, args.input_backend, args.capture_backend, args.image_encoder, capture_region
+    )
     
     try:
         asyncio.run(server.start_server())
     except KeyboardInterrupt:
+        # start_server() already stopped everything on its way out
         logger.info("\n" + "=" * 60)
         logger.info("🛑 Server stopped by user")
         logger.info("=" * 60)
-        server.controller.cleanup()
     except Exception as e:
         logger.error(f"Server error: {e}")
-        server.controller.cleanup()
+        server.cleanup()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Startup Profiler for the Server and GUI Executables
+Times the first import of every module, like `python -X importtime`, but switched on
+with --profile-imports so it also works in the PyInstaller build, where interpreter
+flags cannot be passed. The server logs the report once it is listening.
+"""
+
+import sys
+import time
+import builtins
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# As early as the entry scripts can get - they import this module first
+STARTED_AT = time.perf_counter()
+
+PROFILE_IMPORTS_FLAG = '--profile-imports'
+
+
+class ImportProfiler:
+    """Wraps builtins.__import__ and records self/cumulative ms of every first import"""
+
+    def __init__(self):
+        self.records = []  # (module, self ms, cumulative ms, nesting depth) in completion order
+        self._local = threading.local()  # Per-thread stack of child time - the GUI imports on two threads
+        self._original_import = None
+
+    def install(self):
+        if self._original_import is None:
+            self._original_import = builtins.__import__
+            builtins.__import__ = self._import
+
+    def uninstall(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _label(self, name, fromlist, level):
+        """Module name if this import loads something new, else None"""
+        if level:
+            return None  # Relative imports only happen inside packages - counted in the package
+        module = sys.modules.get(name)
+        if module is None:
+            return name
+        # 'from PIL import ImageChops' loads the submodule without a new top-level name
+        missing = [
+            f"{name}.{item}" for item in fromlist or ()
+            if item != '*' and not hasattr(module, item) and f"{name}.{item}" not in sys.modules
+        ]
+        return ', '.join(missing) or None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        label = self._label(name, fromlist, level)
+        if label is None:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000.0
+            children_ms = stack.pop()
+            if stack:
+                stack[-1] += elapsed_ms
+            self.records.append((label, elapsed_ms - children_ms, elapsed_ms, len(stack)))
+
+    def total_ms(self):
+        """Time spent importing, counted once per top-level import"""
+        return sum(cumulative for _, _, cumulative, depth in self.records if depth == 0)
+
+    def report(self, limit=25):
+        """Lines of the slowest imports by cumulative time"""
+        lines = [f"📦 Imports took {self.total_ms():.1f} ms ({len(self.records)} modules) - slowest {limit}:"]
+        lines.append(f"{'self ms':>10}{'cumul ms':>10}  module")
+        for name, self_ms, cumulative_ms, _ in sorted(self.records, key=lambda record: -record[2])[:limit]:
+            lines.append(f"{self_ms:>10.1f}{cumulative_ms:>10.1f}  {name}")
+        return lines
+
+
+_profiler = None
+
+
+def start_if_requested(argv=None):
+    """Start profiling imports if --profile-imports is on the command line (call before the imports to time)"""
+    global _profiler
+    argv = sys.argv if argv is None else argv
+    if _profiler is None and PROFILE_IMPORTS_FLAG in argv:
+        _profiler = ImportProfiler()
+        _profiler.install()
+    return _profiler
+
+
+def log_startup_report(limit=25):
+    """Log the time since process start and, when profiling, the slowest imports"""
+    global _profiler
+    logger.info(f"🚀 Listening {(time.perf_counter() - STARTED_AT) * 1000.0:.0f} ms after start")
+    if _profiler is not None:
+        _profiler.uninstall()
+        for line in _profiler.report(limit):
+            logger.info(line)
+        _profiler = None
@@ -4,6 +4,7 @@ Quick test script to verify the server is running and accepting connections
 """
 
 import asyncio
+import json
 import websockets
 import sys
 
@@ -23,7 +24,7 @@ async def test_connection(ip, port=8080):
                 "timestamp": 1234567890
             }
             
-            await websocket.send(str(test_message))
+            await websocket.send(json.dumps(test_message))
             print("✅ Test message sent!")
             
             # Wait for response
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test script for the slide frame cache
+Runs offline with the null input backend and synthetic capture: after a key that may
+move the slideshow (space), 'previous' must not serve a cached picture that could
+be the wrong slide. A key that never moves it (b) keeps the cache in use.
+"""
+
+import sys
+import asyncio
+import logging
+
+logging.basicConfig(level=logging.WARNING)
+
+from slide_controller_server import SlideController
+from slide_capture_extension import slide_capture
+
+
+class FakeClient:
+    """Stands in for a phone's websocket - records what the server sends"""
+
+    def __init__(self):
+        self.remote_address = ('test', 0)
+        self.sent = []
+
+    async def send(self, payload):
+        self.sent.append(payload)
+
+
+async def cache_slides(controller, client, count):
+    """Capture slides 1..count into the cache, ending on slide count"""
+    for slide_number in range(1, count + 1):
+        controller.current_slide = slide_number
+        slide_capture.set_current_slide(slide_number)
+        slide_capture.capture_backend.show_slide(slide_number - 1)
+        await slide_capture._capture_updates({client}, force=True)
+
+
+async def previous_after_key(controller, key):
+    """Press key on slide 2, go back and return how many cached frames were served"""
+    client = FakeClient()
+    await cache_slides(controller, client, 2)
+    await controller.handle_keystroke(key)
+
+    controller.connected_clients.add(client)
+    await controller.previous_slide()
+    served = len(client.sent)  # Before the capture burst task gets to run
+    controller.connected_clients.discard(client)
+    return served
+
+
+async def run_tests():
+    controller = SlideController('null', 'synthetic', 'pillow')
+    slide_capture.set_capture_backend('synthetic', frames_per_slide=None)
+    slide_capture.slide_cache.clear()
+    controller.presentation_mode = True
+
+    results = []
+
+    served = await previous_after_key(controller, 'b')
+    ok = served == 1 and slide_capture.slide_anchored
+    print(f"{'✅' if ok else '❌'} 'b' then previous: {served} cached frame(s) served, anchored={slide_capture.slide_anchored}")
+    results.append(ok)
+
+    served = await previous_after_key(controller, 'space')
+    ok = served == 0 and not slide_capture.slide_anchored
+    print(f"{'✅' if ok else '❌'} 'space' then previous: {served} cached frame(s) served, anchored={slide_capture.slide_anchored}")
+    results.append(ok)
+
+    await controller.handle_command('first_slide')
+    ok = slide_capture.slide_anchored and controller.current_slide == 1
+    print(f"{'✅' if ok else '❌'} first_slide re-anchors: slide {controller.current_slide}, anchored={slide_capture.slide_anchored}")
+    results.append(ok)
+
+    controller.presentation_mode = False
+    for task in asyncio.all_tasks() - {asyncio.current_task()}:
+        task.cancel()
+    controller.input_worker.close(on_stop=controller.input_backend.close)
+    return all(results)
+
+
+def main():
+    print("=" * 50)
+    print("🗂️ SLIDE CACHE TEST")
+    print("=" * 50)
+    passed = asyncio.run(run_tests())
+    print("=" * 50)
+    print("✅ All checks passed" if passed else "❌ Some checks failed")
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())